@@ -0,0 +1,165 @@
+"""
+Token authentication with a two-level cache, expiry and last-used tracking.
+
+Token -> user lookups are served from a small per-process LRU first, then
+from the shared Django cache, and only hit the database on a miss. The
+shared cache holds just the user id and the token's creation time, so no
+password hash or personal data leaves the process; a hit there costs one
+primary-key lookup of the user instead of the Token JOIN User query.
+Entries are dropped when the token is deleted (logout, password
+change/reset, rotation) or the user is saved; other processes' LRUs
+converge within AUTH_TOKEN_LOCAL_CACHE_TTL seconds.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from mondodoro.metrics import record_cache_lookup
+
+from .models import User
+
+
+class LocalLRUCache:
+    """Thread-safe in-process LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_token_cache = LocalLRUCache(
+    maxsize=settings.AUTH_TOKEN_LOCAL_CACHE_SIZE,
+    ttl=settings.AUTH_TOKEN_LOCAL_CACHE_TTL,
+)
+
+
+def token_cache_key(key):
+    # Hash the key so raw tokens never appear in the shared cache
+    return 'auth:token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_token(key):
+    cache_key = token_cache_key(key)
+    local_token_cache.delete(cache_key)
+    cache.delete(cache_key)
+
+
+def token_expires_at(created):
+    if not settings.AUTH_TOKEN_TTL_HOURS:
+        return None
+    return created + timedelta(hours=settings.AUTH_TOKEN_TTL_HOURS)
+
+
+def token_is_expired(created):
+    expires_at = token_expires_at(created)
+    return expires_at is not None and expires_at <= timezone.now()
+
+
+def issue_token(user):
+    """Return the user's token, replacing it if it has expired."""
+    token, created = Token.objects.get_or_create(user=user)
+    if not created and token_is_expired(token.created):
+        token.delete()
+        token = Token.objects.create(user=user)
+    return token
+
+
+def rotate_token(user):
+    """Replace the user's token with a new one, revoking the old key."""
+    Token.objects.filter(user=user).delete()
+    return Token.objects.create(user=user)
+
+
+def touch_last_used(user_id, key):
+    """Record token use at most once per AUTH_TOKEN_LAST_USED_INTERVAL seconds."""
+    interval = settings.AUTH_TOKEN_LAST_USED_INTERVAL
+    # cache.add is atomic, so only one request per interval performs the write
+    if cache.add(token_cache_key(key) + ':touched', 1, interval):
+        User.objects.filter(pk=user_id).update(token_last_used_at=timezone.now())
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for DRF's TokenAuthentication that avoids the
+    Token JOIN User query on cache hits.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        entry = local_token_cache.get(cache_key)
+        record_cache_lookup('auth_token_local', entry is not None)
+        if entry is None:
+            entry = self._load_entry(key, cache_key)
+            local_token_cache.set(cache_key, entry)
+
+        cached_user, created = entry
+        # Hand each request its own instance so in-view mutations never leak
+        user = copy.copy(cached_user)
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        if token_is_expired(created):
+            Token.objects.filter(key=key).delete()
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+
+        touch_last_used(user.pk, key)
+        return (user, Token(key=key, user=user, created=created))
+
+    def _load_entry(self, key, cache_key):
+        """(user, token created) from the shared cache's (user id, created), or the database."""
+        shared = cache.get(cache_key)
+        record_cache_lookup('auth_token', shared is not None)
+        if shared is not None:
+            user_id, created = shared
+            user = User.objects.filter(pk=user_id).first()
+            if user is not None:
+                return (user, created)
+        try:
+            token = Token.objects.select_related('user').get(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        cache.set(cache_key, (token.user_id, token.created), settings.AUTH_TOKEN_CACHE_TTL)
+        return (token.user, token.created)
@@ -1,11 +1,14 @@
 from django.contrib.auth.backends import ModelBackend
-from django.db.models import Q
 from .models import User
 
 
 class EmailOrUsernameBackend(ModelBackend):
     """
     Custom authentication backend that allows login with either email or username.
+
+    User.save() stores the email lowercased and mirrors it into username, so
+    both identifiers resolve to a single equality lookup on the unique email
+    index.
     """
     
     def authenticate(self, request, username=None, password=None, **kwargs):
@@ -13,20 +16,11 @@ class EmailOrUsernameBackend(ModelBackend):
             return None
         
         try:
-            user = User.objects.get(
-                Q(email__iexact=username) | Q(username__iexact=username),
-                is_active=True,
-            )
+            user = User.objects.get(email=username.strip().lower(), is_active=True)
         except User.DoesNotExist:
+            # Run the hasher anyway so response time does not reveal unknown accounts
             User().set_password(password)
             return None
-        except User.MultipleObjectsReturned:
-            user = User.objects.filter(
-                Q(email__iexact=username) | Q(username__iexact=username),
-                is_active=True,
-            ).order_by('date_joined').first()
-            if not user:
-                return None
         
         if user.check_password(password) and self.user_can_authenticate(user):
             return user
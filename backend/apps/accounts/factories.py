@@ -0,0 +1,43 @@
+"""
+factory-boy factories for accounts (tests and `generate_load_data`).
+"""
+from functools import lru_cache
+
+import factory
+from django.contrib.auth.hashers import make_password
+
+from mondodoro.factories import pooled, random_past_datetime
+from .models import User
+
+LOAD_EMAIL_DOMAIN = 'load.mondodoro.test'
+DEFAULT_PASSWORD = 'LoadTest123!'
+
+
+@lru_cache(maxsize=None)
+def default_password_hash():
+    # Hashing is deliberately slow; every generated user shares one hash
+    return make_password(DEFAULT_PASSWORD)
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+
+    first_name = factory.LazyFunction(lambda: pooled('first_name'))
+    last_name = factory.LazyFunction(lambda: pooled('last_name'))
+    email = factory.Sequence(lambda n: f'user{n}@{LOAD_EMAIL_DOMAIN}')
+    # User.save() copies the email into username, bulk_create does not
+    username = factory.SelfAttribute('email')
+    password = factory.LazyFunction(default_password_hash)
+    role = User.UserRole.GUEST
+    date_joined = factory.LazyFunction(lambda: random_past_datetime(730))
+    created_at = factory.SelfAttribute('date_joined')
+    updated_at = factory.SelfAttribute('date_joined')
+
+
+class JewelerFactory(UserFactory):
+    email = factory.Sequence(lambda n: f'jeweler{n}@{LOAD_EMAIL_DOMAIN}')
+    role = User.UserRole.JEWELER
+    business_name = factory.LazyAttribute(lambda o: f'Gioielleria {o.last_name}')
+    business_address = factory.LazyFunction(lambda: f"{pooled('street_address')}, {pooled('city')}")
+    phone = factory.LazyFunction(lambda: pooled('phone_number'))
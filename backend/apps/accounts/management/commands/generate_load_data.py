@@ -0,0 +1,240 @@
+"""
+Bulk-insert synthetic jewelers, gift lists, contributions, events, slots
+and bookings for scale testing.
+
+Rows are built with the factory-boy factories and written with
+`bulk_create` in batches, one transaction per batch. Each batch is seeded
+from `--seed` and its own index, so the data set is reproducible for any
+`--workers` count. Use several workers on PostgreSQL only; SQLite
+serializes writers.
+
+Generated users share the LOAD_EMAIL_DOMAIN email domain so the data set
+can be removed with `--clear`. Signals do not fire for bulk inserts; pass
+`--rollup` to rebuild the analytics daily stats afterwards.
+
+    python manage.py generate_load_data --jewelers 2000 --lists 200000 \
+        --contributions 2000000 --events 40000 --seed 42 --workers 8
+"""
+import multiprocessing
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import factory.random
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from apps.accounts.factories import LOAD_EMAIL_DOMAIN, JewelerFactory, UserFactory
+from apps.accounts.models import User
+from apps.analytics.rollups import rollup_platform_stats
+from apps.events.factories import BookingFactory, EventFactory, EventSlotFactory
+from apps.events.models import Booking, Event, EventSlot
+from apps.gift_lists.factories import ContributionFactory, GiftListFactory
+from apps.gift_lists.models import Contribution, GiftList
+
+# Share of a slot's capacity that ends up booked
+PAST_FILL = (0.4, 1.0)
+UPCOMING_FILL = (0.0, 1.0)
+CANCELLED_BOOKING_SHARE = 0.1
+SLOTS_PER_EVENT = (2, 8)
+SLOT_MINUTES = 45
+# Events per job; their slots and bookings come to roughly ten times as many rows
+EVENTS_PER_BATCH_DIVISOR = 10
+
+Job = namedtuple('Job', 'kind index size contributions jeweler_ids seed batch_size')
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep factory-supplied created_at/updated_at values."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def load_users():
+    return User.objects.filter(email__endswith='@' + LOAD_EMAIL_DOMAIN)
+
+
+def insert(model, objects, batch_size):
+    if objects:
+        with transaction.atomic():
+            model.objects.bulk_create(objects, batch_size=batch_size)
+    return len(objects)
+
+
+def build_contributions(lists, count):
+    if not lists or count <= 0:
+        return []
+    rng = factory.random.randgen
+    # Heavy-tailed popularity: a few lists collect most contributions
+    weights = [rng.paretovariate(1.5) for _ in lists]
+    return [ContributionFactory.build(gift_list=gift_list) for gift_list in rng.choices(lists, weights, k=count)]
+
+
+def build_slots(event):
+    rng = factory.random.randgen
+    opening = datetime.combine(event.date, datetime.min.time()).replace(hour=10)
+    return [
+        EventSlotFactory.build(
+            event=event,
+            start_time=(opening + timedelta(minutes=SLOT_MINUTES * i)).time(),
+            end_time=(opening + timedelta(minutes=SLOT_MINUTES * (i + 1))).time(),
+        )
+        for i in range(rng.randint(*SLOTS_PER_EVENT))
+    ]
+
+
+def build_bookings(slot):
+    event = slot.event
+    if event.status == Event.Status.DRAFT:
+        return []
+    rng = factory.random.randgen
+    past = event.date < timezone.localdate()
+    low, high = PAST_FILL if past else UPCOMING_FILL
+    occupied = round(slot.max_attendees * rng.uniform(low, high))
+
+    bookings = []
+    for _ in range(occupied):
+        booking = BookingFactory.build(slot=slot)
+        # Upcoming in-person bookings are settled at the shop
+        if not past and booking.payment_method == Booking.PaymentMethod.IN_PERSON and rng.random() < 0.5:
+            booking.payment_status = Booking.PaymentStatus.PENDING
+        bookings.append(booking)
+    # Cancelled bookings free their spot, so they come on top of capacity
+    cancelled = sum(1 for _ in range(occupied) if rng.random() < CANCELLED_BOOKING_SHARE)
+    if event.status == Event.Status.CANCELLED:
+        cancelled, bookings = occupied, []
+    bookings.extend(
+        BookingFactory.build(slot=slot, payment_status=Booking.PaymentStatus.CANCELLED)
+        for _ in range(cancelled)
+    )
+    return bookings
+
+
+def run_job(job):
+    """Build and insert one batch; returns row counts per model."""
+    if job.seed is not None:
+        factory.random.reseed_random(f'{job.seed}:{job.kind}:{job.index}')
+    rng = factory.random.randgen
+
+    def jeweler():
+        return User(pk=rng.choice(job.jeweler_ids))
+
+    counts = Counter()
+    if job.kind == 'lists':
+        lists = [GiftListFactory.build(jeweler=jeweler()) for _ in range(job.size)]
+        counts['Gift lists'] += insert(GiftList, lists, job.batch_size)
+        open_lists = [gift_list for gift_list in lists if gift_list.status != GiftList.Status.DRAFT]
+        contributions = build_contributions(open_lists, job.contributions)
+        counts['Contributions'] += insert(Contribution, contributions, job.batch_size)
+    else:
+        events = [EventFactory.build(jeweler=jeweler()) for _ in range(job.size)]
+        slots = [slot for event in events for slot in build_slots(event)]
+        bookings = [booking for slot in slots for booking in build_bookings(slot)]
+        counts['Events'] += insert(Event, events, job.batch_size)
+        counts['Slots'] += insert(EventSlot, slots, job.batch_size)
+        counts['Bookings'] += insert(Booking, bookings, job.batch_size)
+    return counts
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic jewelers, gift lists, contributions, events and bookings for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jewelers', type=int, default=2000)
+        parser.add_argument('--lists', type=int, default=200000, help='Gift lists across all jewelers')
+        parser.add_argument('--contributions', type=int, default=2000000,
+                            help='Contributions spread over non-draft lists')
+        parser.add_argument('--events', type=int, default=40000,
+                            help='Events; each gets %d-%d slots, bookings follow slot capacity' % SLOTS_PER_EVENT)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--workers', type=int, default=1, help='Parallel processes (PostgreSQL)')
+        parser.add_argument('--seed', type=int, default=None, help='Make the generated data reproducible')
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated data first')
+        parser.add_argument('--rollup', action='store_true', help='Rebuild analytics daily stats afterwards')
+
+    def handle(self, *args, **options):
+        if options['seed'] is not None:
+            factory.random.reseed_random(options['seed'])
+
+        if options['clear']:
+            self.clear()
+        elif load_users().exists():
+            raise CommandError('Load data already exists; rerun with --clear to replace it.')
+
+        started = time.monotonic()
+        with explicit_timestamps(User, GiftList, Contribution, Event, EventSlot, Booking):
+            jeweler_ids = self.create_jewelers(options['jewelers'], options['batch_size'])
+            if jeweler_ids:
+                self.run_jobs(self.jobs(jeweler_ids, options), options['workers'])
+
+        if options['rollup']:
+            days = rollup_platform_stats(start=timezone.localdate() - timedelta(days=730))
+            self.stdout.write(f'Rolled up {days} days of platform stats')
+        self.stdout.write(self.style.SUCCESS(f'Done in {time.monotonic() - started:.1f}s'))
+
+    def clear(self):
+        ids = list(load_users().values_list('pk', flat=True))
+        # Per-chunk deletes keep the cascade collector's memory bounded
+        chunk = 20
+        for i in range(0, len(ids), chunk):
+            with transaction.atomic():
+                User.objects.filter(pk__in=ids[i:i + chunk]).delete()
+        self.stdout.write(f'Deleted {len(ids)} generated jewelers and their data')
+
+    def create_jewelers(self, count, batch_size):
+        started = time.monotonic()
+        UserFactory.reset_sequence(0)
+        for done in range(0, count, batch_size):
+            insert(User, JewelerFactory.build_batch(min(batch_size, count - done)), batch_size)
+        # SQLite does not return primary keys from bulk_create; read them back
+        jeweler_ids = list(load_users().filter(role=User.UserRole.JEWELER).values_list('pk', flat=True))
+        self.report(Counter({'Jewelers': len(jeweler_ids)}), started)
+        return jeweler_ids
+
+    def jobs(self, jeweler_ids, options):
+        batch_size, seed = options['batch_size'], options['seed']
+        lists, contributions = options['lists'], options['contributions']
+        for index, done in enumerate(range(0, lists, batch_size)):
+            size = min(batch_size, lists - done)
+            # Proportional share of the contributions, so the total is exact
+            share = round(contributions * (done + size) / lists) - round(contributions * done / lists)
+            yield Job('lists', index, size, share, jeweler_ids, seed, batch_size)
+
+        per_batch = max(1, batch_size // EVENTS_PER_BATCH_DIVISOR)
+        events = options['events']
+        for index, done in enumerate(range(0, events, per_batch)):
+            yield Job('events', index, min(per_batch, events - done), 0, jeweler_ids, seed, batch_size)
+
+    def run_jobs(self, jobs, workers):
+        started = time.monotonic()
+        totals = Counter()
+        if workers <= 1:
+            for job in jobs:
+                totals += run_job(job)
+        else:
+            # Forked children must open their own database connections
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                for counts in executor.map(run_job, jobs):
+                    totals += counts
+        self.report(totals, started)
+
+    def report(self, totals, started):
+        elapsed = time.monotonic() - started
+        for label, count in totals.items():
+            rate = count / elapsed if elapsed else count
+            self.stdout.write(f'{label}: {count} rows in {elapsed:.1f}s ({rate:,.0f}/s)')
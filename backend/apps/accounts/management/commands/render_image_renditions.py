@@ -0,0 +1,52 @@
+"""
+Queue rendition tasks for uploaded images whose renditions are missing or stale.
+
+Uploads made before renditions existed, or whose task was lost while the
+broker was down (mondodoro/publisher.py), keep serving the original image
+until this runs. Each image needing work gets one task on the worker; rows
+already up to date are skipped, so the command can be rerun safely.
+
+    python manage.py render_image_renditions --model cover --dry-run
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.accounts.models import User
+from apps.accounts.tasks import render_avatar
+from apps.gift_lists.models import GiftList, GiftListItem
+from apps.gift_lists.tasks import render_cover_image, render_item_image
+from mondodoro.images import needs_renditions, renditions_attr
+
+# --model name: (model, image field, task)
+TARGETS = {
+    'cover': (GiftList, 'cover_image', render_cover_image),
+    'item': (GiftListItem, 'image', render_item_image),
+    'avatar': (User, 'avatar', render_avatar),
+}
+
+
+def pending_ids(model, field_name):
+    """Primary keys of rows whose renditions do not match their image."""
+    attr = renditions_attr(field_name)
+    no_image = Q(**{f'{field_name}__isnull': True}) | Q(**{field_name: ''})
+    rows = model.objects.exclude(no_image & Q(**{attr: {}})).only('pk', field_name, attr).order_by('pk')
+    return [row.pk for row in rows.iterator(chunk_size=2000) if needs_renditions(row, field_name)]
+
+
+class Command(BaseCommand):
+    help = 'Queue rendition tasks for images whose renditions are missing or stale.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=sorted(TARGETS), action='append',
+                            help='Only these images (repeatable); default: all')
+        parser.add_argument('--dry-run', action='store_true', help='Count the images without queueing tasks')
+
+    def handle(self, *args, **options):
+        for name in options['model'] or TARGETS:
+            model, field_name, task = TARGETS[name]
+            ids = pending_ids(model, field_name)
+            if not options['dry_run']:
+                for pk in ids:
+                    task.delay(pk)
+            verb = 'need renditions' if options['dry_run'] else 'queued'
+            self.stdout.write(f'{name}: {len(ids)} images {verb}')
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_last_used_at',
+            field=models.DateTimeField(blank=True, help_text='Last API request made with the auth token (updated at most every few minutes)', null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def normalize_emails(apps, schema_editor):
+    """
+    Lowercase emails stored before User.save() normalized them and mirror
+    them into username, so login can use a plain equality lookup.
+
+    When two accounts differ only by case, the oldest one keeps the
+    address (the previous backend picked the oldest on ambiguous matches).
+    """
+    User = apps.get_model('accounts', 'User')
+    taken = set(User.objects.values_list('email', flat=True))
+    users = User.objects.order_by('date_joined').only('id', 'email', 'username')
+    for user in users.iterator():
+        email = user.email.lower()
+        if user.email == email and user.username == email:
+            continue
+        if email != user.email and email in taken:
+            continue
+        taken.add(email)
+        User.objects.filter(pk=user.pk).update(email=email, username=email)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_token_last_used_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+    ]
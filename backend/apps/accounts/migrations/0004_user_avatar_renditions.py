@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:41
+
+from django.db import migrations, models
+import mondodoro.images
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_normalize_user_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized versions of the avatar, written by the image worker'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='avatar',
+            field=models.ImageField(blank=True, help_text='User avatar', null=True, upload_to='avatars/', validators=[mondodoro.images.validate_image_upload]),
+        ),
+    ]
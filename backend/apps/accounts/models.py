@@ -2,6 +2,8 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from mondodoro.images import validate_image_upload
+
 
 class User(AbstractUser):
     """
@@ -55,8 +57,20 @@ class User(AbstractUser):
         upload_to='avatars/',
         blank=True,
         null=True,
+        validators=[validate_image_upload],
         help_text=_('User avatar')
     )
+    avatar_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text=_('Resized versions of the avatar, written by the image worker')
+    )
+    token_last_used_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text=_('Last API request made with the auth token (updated at most every few minutes)')
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
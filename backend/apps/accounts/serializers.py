@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from mondodoro.images import ImageRenditionsField
 from .models import User
 
 
@@ -8,6 +9,7 @@ class UserSerializer(serializers.ModelSerializer):
     """
     Serializer for User model
     """
+    avatar_renditions = ImageRenditionsField('avatar')
     
     class Meta:
         model = User
@@ -15,7 +17,7 @@ class UserSerializer(serializers.ModelSerializer):
             'id', 'username', 'email', 'first_name', 'last_name',
             'role', 'phone', 'business_name', 'business_address',
             'stripe_account_id', 'stripe_onboarding_completed',
-            'avatar', 'is_active', 'created_at', 'updated_at'
+            'avatar', 'avatar_renditions', 'is_active', 'created_at', 'updated_at'
         ]
         read_only_fields = [
             'id', 'stripe_account_id', 'stripe_onboarding_completed',
@@ -25,9 +27,10 @@ class UserSerializer(serializers.ModelSerializer):
     def validate_email(self, value):
         """Validate email uniqueness"""
         user = self.instance
-        if User.objects.exclude(pk=user.pk if user else None).filter(email__iexact=value).exists():
+        value = value.lower()
+        if User.objects.exclude(pk=user.pk if user else None).filter(email=value).exists():
             raise serializers.ValidationError("Esiste già un account con questa email.")
-        return value.lower()
+        return value
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -52,10 +55,11 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return attrs
     
     def validate_email(self, value):
-        """Validate email uniqueness case-insensitive"""
-        if User.objects.filter(email__iexact=value).exists():
+        """Validate email uniqueness case-insensitive (emails are stored lowercased)"""
+        value = value.lower()
+        if User.objects.filter(email=value).exists():
             raise serializers.ValidationError("Esiste già un account con questa email.")
-        return value.lower()
+        return value
     
     def validate_role(self, value):
         """Validate role assignment"""
@@ -167,6 +171,7 @@ class JewelerProfileSerializer(serializers.ModelSerializer):
     """
     Serializer for jeweler profile management
     """
+    avatar_renditions = ImageRenditionsField('avatar')
     
     class Meta:
         model = User
@@ -174,7 +179,7 @@ class JewelerProfileSerializer(serializers.ModelSerializer):
             'id', 'username', 'email', 'first_name', 'last_name',
             'phone', 'business_name', 'business_address',
             'stripe_account_id', 'stripe_onboarding_completed',
-            'avatar', 'created_at', 'updated_at'
+            'avatar', 'avatar_renditions', 'created_at', 'updated_at'
         ]
         read_only_fields = [
             'id', 'username', 'email', 'stripe_account_id', 
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from mondodoro.http_cache import JEWELERS_SCOPE, bump_versions
+from mondodoro.images import delete_renditions, needs_renditions
+from mondodoro.publisher import publish_on_commit
+
+from .authentication import invalidate_token
+from .models import User
+from .tasks import render_avatar
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    # Logout, password change/reset and rotation all delete the token
+    invalidate_token(instance.key)
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Cached entries carry a copy of the user (role, is_active, profile)
+    for key in Token.objects.filter(user_id=instance.pk).values_list('key', flat=True):
+        invalidate_token(key)
+    # Public list and event pages show the jeweler's name; logins don't change it
+    update_fields = kwargs.get('update_fields')
+    if instance.role == User.UserRole.JEWELER and not (update_fields and set(update_fields) <= {'last_login'}):
+        bump_versions(JEWELERS_SCOPE)
+
+
+@receiver(post_save, sender=User)
+def avatar_saved(sender, instance, **kwargs):
+    if needs_renditions(instance, 'avatar'):
+        publish_on_commit(render_avatar, instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def avatar_deleted(sender, instance, **kwargs):
+    delete_renditions(instance, 'avatar')
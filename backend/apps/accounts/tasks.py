@@ -0,0 +1,13 @@
+from celery import shared_task
+
+from mondodoro.images import refresh_renditions
+
+from .models import User
+
+AVATAR_SIZES = ('thumbnail', 'card')
+
+
+@shared_task(ignore_result=True)
+def render_avatar(user_id):
+    """Resize an avatar into its thumbnail and card renditions."""
+    return refresh_renditions(User, user_id, 'avatar', AVATAR_SIZES)
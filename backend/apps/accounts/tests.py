@@ -1,17 +1,41 @@
 """
-Tests for the accounts app: registration, login, profile, password change, password reset.
+Tests for the accounts app: registration, login, profile, password change, password reset,
+token authentication, load data generation.
 """
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.core import mail
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.auth.tokens import default_token_generator
+from django.utils import timezone
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-
+from PIL import Image
+
+from apps.events.models import Booking, Event, EventSlot
+from apps.gift_lists.models import Contribution, GiftList, GiftListItem
+from apps.gift_lists.tasks import render_cover_image, render_item_image
+from apps.notifications.models import OutboundEmail
+from apps.notifications.outbox import deliver_pending
+from mondodoro import publisher
+
+from .authentication import local_token_cache, token_cache_key
+from .factories import LOAD_EMAIL_DOMAIN
+from .backends import EmailOrUsernameBackend
 from .models import User
+from .tasks import render_avatar
 
 
 def make_user(email='test@example.com', password='TestPass123!', role='jeweler', **kwargs):
@@ -84,6 +108,8 @@ class RegisterViewTests(TestCase):
 class LoginViewTests(TestCase):
 
     def setUp(self):
+        # Login is rate limited per IP through the cache
+        cache.clear()
         self.client = APIClient()
         self.url = reverse('accounts:login')
         self.user = make_user(email='login@test.com', password='TestPass123!')
@@ -105,6 +131,19 @@ class LoginViewTests(TestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_login_email_case_insensitive(self):
+        response = self.client.post(
+            self.url,
+            {'email': '  Login@Test.COM ', 'password': 'TestPass123!'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_backend_uses_single_lookup(self):
+        with self.assertNumQueries(1):
+            user = EmailOrUsernameBackend().authenticate(None, username='LOGIN@test.com', password='TestPass123!')
+        self.assertEqual(user, self.user)
+
     def test_login_wrong_password(self):
         response = self.client.post(
             self.url,
@@ -160,6 +199,38 @@ class ProfileViewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['first_name'], 'Giulia')
 
+    def upload_avatar(self):
+        buffer = BytesIO()
+        Image.new('RGBA', (900, 900), (200, 160, 40, 128)).save(buffer, 'PNG')
+        upload = SimpleUploadedFile('avatar.png', buffer.getvalue(), content_type='image/png')
+        with mock.patch.object(render_avatar, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(self.url, {'avatar': upload}, format='multipart')
+            publisher.flush()
+        return response, apply_async
+
+    def test_avatar_renditions(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with self.settings(MEDIA_ROOT=media_root):
+            response, apply_async = self.upload_avatar()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIsNone(response.data['avatar_renditions'])
+            apply_async.assert_called_once_with((self.user.pk,), retry=False)
+
+            self.assertTrue(render_avatar(self.user.pk))
+            # The worker's save drops the cached copy of the user
+            renditions = self.client.get(self.url).data['avatar_renditions']
+        self.assertEqual(set(renditions), {'thumbnail', 'card', 'srcset'})
+        self.assertEqual((renditions['card']['width'], renditions['card']['height']), (640, 640))
+
+    @override_settings(IMAGE_UPLOAD_MAX_BYTES=1024)
+    def test_avatar_too_large(self):
+        response, apply_async = self.upload_avatar()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('avatar', response.data)
+        apply_async.assert_not_called()
+
 
 class ChangePasswordViewTests(TestCase):
 
@@ -209,6 +280,10 @@ class ForgotPasswordViewTests(TestCase):
     def test_forgot_password_sends_email(self):
         response = self.client.post(self.url, {'email': 'forgot@test.com'}, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Queued in the outbox, delivered by the worker
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(OutboundEmail.objects.filter(to_email='forgot@test.com', template='password_reset').exists())
+        deliver_pending()
         self.assertEqual(len(mail.outbox), 1)
         self.assertIn('forgot@test.com', mail.outbox[0].to)
         self.assertIn('reset', mail.outbox[0].body.lower())
@@ -304,3 +379,179 @@ class MeViewTests(TestCase):
     def test_me_unauthenticated(self):
         response = self.client.get(reverse('accounts:me'))
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_token_cache.clear()
+        self.client = APIClient()
+        self.user = make_user(email='cached@test.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('accounts:me')
+
+    def _age_token(self, hours):
+        Token.objects.filter(pk=self.token.pk).update(created=self.token.created - timedelta(hours=hours))
+
+    def test_cached_token_skips_auth_queries(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_shared_cache_serves_other_processes(self):
+        self.client.get(self.url)
+        local_token_cache.clear()
+        # Only the user's primary-key lookup
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], 'cached@test.com')
+
+    def test_shared_cache_holds_no_user_data(self):
+        self.client.get(self.url)
+        user_id, created = cache.get(token_cache_key(self.token.key))
+        self.assertEqual((user_id, created), (self.user.pk, self.token.created))
+
+    def test_logout_invalidates_cached_token(self):
+        self.client.get(self.url)
+        self.client.post(reverse('accounts:logout'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_TTL_HOURS=24)
+    def test_expired_token_rejected_and_deleted(self):
+        self._age_token(25)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+
+    def test_tokens_never_expire_by_default(self):
+        self._age_token(24 * 365)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(AUTH_TOKEN_TTL_HOURS=24)
+    def test_login_replaces_expired_token(self):
+        self._age_token(25)
+        response = APIClient().post(
+            reverse('accounts:login'),
+            {'email': 'cached@test.com', 'password': 'TestPass123!'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data['token'], self.token.key)
+
+    def test_rotate_token(self):
+        response = self.client.post(reverse('accounts:token_rotate'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data['token'], self.token.key)
+        self.assertIn('expires_at', response.data)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_last_used_written_once_per_interval(self):
+        self.client.get(self.url)
+        self.user.refresh_from_db()
+        first_seen = self.user.token_last_used_at
+        self.assertIsNotNone(first_seen)
+        self.client.get(self.url)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_last_used_at, first_seen)
+
+
+class GenerateLoadDataCommandTests(TestCase):
+
+    def generate(self, *args):
+        out = StringIO()
+        call_command(
+            'generate_load_data', '--jewelers', '5', '--lists', '40', '--contributions', '300',
+            '--events', '12', '--batch-size', '16', '--seed', '7', *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def test_generates_requested_volumes(self):
+        self.generate()
+        self.assertEqual(User.objects.filter(email__endswith=LOAD_EMAIL_DOMAIN, role='jeweler').count(), 5)
+        self.assertEqual(GiftList.objects.count(), 40)
+        self.assertEqual(Event.objects.count(), 12)
+        self.assertGreaterEqual(EventSlot.objects.count(), 24)
+        # Drafts never receive contributions; the rest share the exact total
+        self.assertFalse(Contribution.objects.filter(gift_list__status=GiftList.Status.DRAFT).exists())
+        self.assertEqual(Contribution.objects.count(), 300)
+
+    def test_data_is_realistic(self):
+        self.generate()
+        statuses = set(Contribution.objects.values_list('payment_status', flat=True))
+        self.assertIn(Contribution.PaymentStatus.COMPLETED, statuses)
+        self.assertFalse(Contribution.objects.filter(payment_status='completed', completed_at__isnull=True).exists())
+        # Factory timestamps survive bulk_create instead of all being "now"
+        self.assertLess(GiftList.objects.order_by('created_at').first().created_at,
+                        timezone.now() - timedelta(days=1))
+        for slot in EventSlot.objects.all():
+            active = slot.bookings.exclude(payment_status=Booking.PaymentStatus.CANCELLED).count()
+            self.assertLessEqual(active, slot.max_attendees)
+
+    def test_same_seed_same_data(self):
+        self.generate()
+        first = list(GiftList.objects.order_by('title', 'target_amount').values_list('title', 'target_amount'))
+        self.generate('--clear')
+        second = list(GiftList.objects.order_by('title', 'target_amount').values_list('title', 'target_amount'))
+        self.assertEqual(first, second)
+
+    def test_refuses_to_duplicate_and_clear_keeps_real_users(self):
+        real = make_user('real@example.com')
+        self.generate()
+        with self.assertRaises(CommandError):
+            self.generate()
+        self.generate('--clear')
+        self.assertTrue(User.objects.filter(pk=real.pk).exists())
+        self.assertEqual(GiftList.objects.count(), 40)
+
+
+class RenderImageRenditionsCommandTests(TestCase):
+
+    def setUp(self):
+        jeweler = make_user('renditions@example.com')
+        lists = [GiftList.objects.create(jeweler=jeweler, title=f'Lista {i}', target_amount=100) for i in range(4)]
+        # update() skips the signals that would queue the tasks
+        GiftList.objects.filter(pk=lists[0].pk).update(cover_image='gift_lists/covers/new.jpg')
+        GiftList.objects.filter(pk=lists[1].pk).update(
+            cover_image='gift_lists/covers/done.jpg',
+            cover_image_renditions={'source': 'gift_lists/covers/done.jpg', 'sizes': {}},
+        )
+        # Image removed, old renditions still to be cleaned up
+        GiftList.objects.filter(pk=lists[2].pk).update(
+            cover_image_renditions={'source': 'gift_lists/covers/old.jpg', 'sizes': {}},
+        )
+        item = GiftListItem.objects.create(gift_list=lists[3], name='Anello', price=200)
+        GiftListItem.objects.filter(pk=item.pk).update(image='gift_lists/items/ring.jpg')
+        self.pending_covers = [lists[0].pk, lists[2].pk]
+
+    def run_command(self, *args):
+        out = StringIO()
+        with mock.patch.object(render_cover_image, 'delay') as cover_delay, \
+                mock.patch.object(render_item_image, 'delay') as item_delay:
+            call_command('render_image_renditions', *args, stdout=out)
+        return out.getvalue(), cover_delay, item_delay
+
+    def test_dry_run_counts_without_queueing(self):
+        output, cover_delay, item_delay = self.run_command('--dry-run')
+        self.assertIn('cover: 2 images need renditions', output)
+        self.assertIn('item: 1 images need renditions', output)
+        self.assertIn('avatar: 0 images need renditions', output)
+        cover_delay.assert_not_called()
+        item_delay.assert_not_called()
+
+    def test_queues_only_the_selected_model(self):
+        output, cover_delay, item_delay = self.run_command('--model', 'cover')
+        self.assertEqual(output.strip(), 'cover: 2 images queued')
+        self.assertCountEqual([call.args for call in cover_delay.call_args_list], [(pk,) for pk in self.pending_covers])
+        item_delay.assert_not_called()
@@ -10,6 +10,7 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('me/', views.me_view, name='me'),
     path('csrf/', views.csrf_token_view, name='csrf'),
+    path('token/rotate/', views.rotate_token_view, name='token_rotate'),
     
     # Profile management
     path('profile/', views.ProfileView.as_view(), name='profile'),
@@ -12,9 +12,12 @@ from django.middleware.csrf import get_token
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.core.mail import send_mail
 from django.conf import settings
 from drf_spectacular.utils import extend_schema, extend_schema_view
+from mondodoro.instrumentation import query_budget
+from apps.notifications.emails import queue_password_reset
+
+from .authentication import issue_token, rotate_token, token_expires_at
 from .models import User
 from .serializers import (
     UserSerializer, UserRegistrationSerializer, LoginSerializer,
@@ -23,6 +26,7 @@ from .serializers import (
 )
 
 
+@query_budget(queries=12)
 @extend_schema_view(
     post=extend_schema(
         summary="Register new user",
@@ -44,7 +48,7 @@ class RegisterView(generics.CreateAPIView):
         user = serializer.save()
         
         # Create token for the user
-        token, created = Token.objects.get_or_create(user=user)
+        token = issue_token(user)
         
         return Response({
             'user': UserSerializer(user).data,
@@ -53,6 +57,7 @@ class RegisterView(generics.CreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
+@query_budget(queries=16)
 @extend_schema(
     summary="Login user",
     description="Authenticate user and return token",
@@ -73,8 +78,8 @@ def login_view(request):
     user = serializer.validated_data['user']
     login(request, user)
     
-    # Get or create token
-    token, created = Token.objects.get_or_create(user=user)
+    # Get or create token (expired tokens are replaced)
+    token = issue_token(user)
     
     return Response({
         'user': UserSerializer(user).data,
@@ -104,6 +109,7 @@ def logout_view(request):
     return Response({'message': 'Logout successful'})
 
 
+@query_budget(queries=6)
 @extend_schema_view(
     get=extend_schema(
         summary="Get current user profile",
@@ -151,12 +157,7 @@ def change_password_view(request):
     user.save()
     
     # Invalidate current token and create new one
-    try:
-        request.user.auth_token.delete()
-    except:
-        pass
-    
-    token = Token.objects.create(user=user)
+    token = rotate_token(user)
     
     return Response({
         'token': token.key,
@@ -164,6 +165,24 @@ def change_password_view(request):
     })
 
 
+@extend_schema(
+    summary="Rotate auth token",
+    description="Replace the current token with a new one; the old token stops working immediately",
+    tags=["Authentication"]
+)
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def rotate_token_view(request):
+    """
+    Token rotation endpoint
+    """
+    token = rotate_token(request.user)
+    return Response({
+        'token': token.key,
+        'expires_at': token_expires_at(token.created),
+    })
+
+
 @extend_schema_view(
     get=extend_schema(
         summary="Get jeweler profile",
@@ -195,6 +214,7 @@ class JewelerProfileView(generics.RetrieveUpdateAPIView):
         return user
 
 
+@query_budget(queries=4)
 @extend_schema(
     summary="Get current user info",
     description="Get basic information about the current authenticated user",
@@ -248,20 +268,7 @@ def forgot_password_view(request):
         token = default_token_generator.make_token(user)
         reset_url = f"{settings.FRONTEND_URL}/reset-password?uid={uid}&token={token}"
 
-        send_mail(
-            subject="Reset della tua password – ListDreams",
-            message=(
-                f"Ciao {user.first_name},\n\n"
-                f"Hai richiesto il reset della password per il tuo account ListDreams.\n\n"
-                f"Clicca sul link seguente per impostare una nuova password (valido per 24 ore):\n"
-                f"{reset_url}\n\n"
-                f"Se non hai richiesto il reset, ignora questa email.\n\n"
-                f"Il team ListDreams"
-            ),
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=True,
-        )
+        queue_password_reset(user, reset_url)
     except User.DoesNotExist:
         pass  # Do not reveal if the email exists
 
@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import PlatformDailyStats
+
+
+@admin.register(PlatformDailyStats)
+class PlatformDailyStatsAdmin(admin.ModelAdmin):
+    list_display = [
+        'date', 'gmv', 'platform_fees', 'contribution_count',
+        'new_users', 'new_jewelers', 'bookings_count', 'computed_at',
+    ]
+    date_hierarchy = 'date'
+    ordering = ['-date']
+
+    def has_add_permission(self, request):
+        # Rows are written by the rollup task
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:31
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('gmv', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('platform_fees', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('contribution_count', models.PositiveIntegerField(default=0)),
+                ('new_users', models.PositiveIntegerField(default=0)),
+                ('new_jewelers', models.PositiveIntegerField(default=0)),
+                ('bookings_count', models.PositiveIntegerField(default=0)),
+                ('total_gmv', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('total_platform_fees', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('total_contributions', models.PositiveIntegerField(default=0)),
+                ('total_users', models.PositiveIntegerField(default=0)),
+                ('total_jewelers', models.PositiveIntegerField(default=0)),
+                ('total_bookings', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Platform Daily Stats',
+                'verbose_name_plural': 'Platform Daily Stats',
+                'ordering': ['-date'],
+            },
+        ),
+    ]
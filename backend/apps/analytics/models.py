@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class PlatformDailyStats(models.Model):
+    """
+    Platform KPIs for one calendar day (Europe/Rome), filled by
+    `rollup_platform_stats()` from the `rollup_daily_stats` task. The `total_*` columns are running totals
+    up to and including `date`, so all-time figures come from a single row.
+    """
+
+    date = models.DateField(unique=True)
+
+    gmv = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    platform_fees = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    contribution_count = models.PositiveIntegerField(default=0)
+    new_users = models.PositiveIntegerField(default=0)
+    new_jewelers = models.PositiveIntegerField(default=0)
+    bookings_count = models.PositiveIntegerField(default=0)
+
+    total_gmv = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    total_platform_fees = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    total_contributions = models.PositiveIntegerField(default=0)
+    total_users = models.PositiveIntegerField(default=0)
+    total_jewelers = models.PositiveIntegerField(default=0)
+    total_bookings = models.PositiveIntegerField(default=0)
+
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name = _('Platform Daily Stats')
+        verbose_name_plural = _('Platform Daily Stats')
+
+    def __str__(self):
+        return f"KPI {self.date} — €{self.gmv} ({self.contribution_count})"
@@ -0,0 +1,130 @@
+"""
+Daily platform KPI rollup.
+
+Each run recomputes the last ANALYTICS_ROLLUP_LOOKBACK_DAYS days up to today
+(late payment confirmations and cancellations can still change them), using
+one grouped query per source table for the whole range.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from mondodoro.routers import use_replica
+
+from apps.accounts.models import User
+from apps.events.models import Booking
+from apps.gift_lists.models import Contribution
+from apps.payments.models import PaymentIntent
+
+from .models import PlatformDailyStats
+
+DAILY_FIELDS = ['gmv', 'platform_fees', 'contribution_count', 'new_users', 'new_jewelers', 'bookings_count']
+RUNNING_TOTALS = {
+    'gmv': 'total_gmv',
+    'platform_fees': 'total_platform_fees',
+    'contribution_count': 'total_contributions',
+    'new_users': 'total_users',
+    'new_jewelers': 'total_jewelers',
+    'bookings_count': 'total_bookings',
+}
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _per_day(queryset, date_field, start, end, **aggregates):
+    """Group `queryset` by local day of `date_field` over [start, end]."""
+    rows = (
+        queryset
+        .filter(**{
+            f'{date_field}__gte': _day_start(start),
+            f'{date_field}__lt': _day_start(end + timedelta(days=1)),
+        })
+        .annotate(day=TruncDate(date_field))
+        .values('day')
+        .annotate(**aggregates)
+        .order_by('day')
+    )
+    return {row.pop('day'): row for row in rows}
+
+
+def compute_daily_stats(start, end):
+    """Return {date: {field: value}} for every day in [start, end]."""
+    completed = Contribution.objects.filter(payment_status=Contribution.PaymentStatus.COMPLETED)
+    contributions = _per_day(
+        completed, 'completed_at', start, end,
+        gmv=Sum('amount'), contribution_count=Count('id'),
+    )
+    fees = _per_day(
+        PaymentIntent.objects.filter(contribution__payment_status=Contribution.PaymentStatus.COMPLETED),
+        'contribution__completed_at', start, end,
+        platform_fees=Sum('application_fee_amount'),
+    )
+    users = _per_day(
+        User.objects.all(), 'date_joined', start, end,
+        new_users=Count('id'),
+        new_jewelers=Count('id', filter=Q(role=User.UserRole.JEWELER)),
+    )
+    bookings = _per_day(
+        Booking.objects.exclude(payment_status=Booking.PaymentStatus.CANCELLED),
+        'created_at', start, end,
+        bookings_count=Count('id'),
+    )
+
+    stats = {}
+    day = start
+    while day <= end:
+        values = {'gmv': Decimal('0.00'), 'platform_fees': Decimal('0.00')}
+        for source in (contributions, fees, users, bookings):
+            values.update({key: value for key, value in source.get(day, {}).items() if value is not None})
+        stats[day] = {field: values.get(field, 0) for field in DAILY_FIELDS}
+        day += timedelta(days=1)
+    return stats
+
+
+def _first_activity_date():
+    first_joined = User.objects.aggregate(first=Min('date_joined'))['first']
+    return timezone.localdate(first_joined) if first_joined else None
+
+
+def rollup_platform_stats(start=None, today=None):
+    """
+    Recompute PlatformDailyStats rows from `start` through today. Returns the
+    number of days written. Later running totals depend on earlier days, so
+    a rollup always extends to today.
+    """
+    end = today or timezone.localdate()
+    if start is None:
+        last = PlatformDailyStats.objects.order_by('-date').values_list('date', flat=True).first()
+        if last is not None:
+            start = min(last, end) - timedelta(days=settings.ANALYTICS_ROLLUP_LOOKBACK_DAYS)
+        else:
+            start = _first_activity_date()
+            if start is None:
+                return 0
+
+    # The heavy aggregation reads from the replica; the rollup is written to the primary
+    with use_replica():
+        stats = compute_daily_stats(start, end)
+
+    with transaction.atomic():
+        previous = PlatformDailyStats.objects.filter(date__lt=start).order_by('-date').first()
+        totals = {
+            total: getattr(previous, total) if previous else 0
+            for total in RUNNING_TOTALS.values()
+        }
+        rows = []
+        for day, values in stats.items():
+            for field, total in RUNNING_TOTALS.items():
+                totals[total] += values[field]
+            rows.append(PlatformDailyStats(date=day, **values, **totals))
+
+        PlatformDailyStats.objects.filter(date__gte=start).delete()
+        PlatformDailyStats.objects.bulk_create(rows)
+    return len(rows)
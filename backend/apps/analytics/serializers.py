@@ -0,0 +1,12 @@
+from rest_framework import serializers
+from .models import PlatformDailyStats
+
+
+class PlatformDailyStatsSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = PlatformDailyStats
+        fields = [
+            'date', 'gmv', 'platform_fees', 'contribution_count',
+            'new_users', 'new_jewelers', 'bookings_count',
+        ]
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .rollups import rollup_platform_stats
+
+
+@shared_task
+def rollup_daily_stats():
+    """Refresh the platform KPI rollup for recent days."""
+    return rollup_platform_stats()
@@ -0,0 +1,175 @@
+"""
+Tests for the analytics app: daily KPI rollup and superadmin KPI endpoints.
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.models import User
+from apps.gift_lists.models import GiftList, Contribution
+from apps.payments.models import PaymentIntent
+from .models import PlatformDailyStats
+from .rollups import rollup_platform_stats
+
+TODAY = date(2026, 5, 10)
+
+
+def at(day, hour=12):
+    return timezone.make_aware(datetime.combine(day, time(hour)))
+
+
+def make_user(email, role='jeweler', password='TestPass123!', joined=None):
+    user = User.objects.create_user(
+        username=email.split('@')[0],
+        email=email,
+        password=password,
+        first_name='Test',
+        last_name='User',
+        role=role,
+        business_name='Gioielleria Test' if role == 'jeweler' else None,
+    )
+    if joined:
+        User.objects.filter(pk=user.pk).update(date_joined=joined)
+    return user
+
+
+def auth_client(user):
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+def make_contribution(gift_list, amount, completed_at, fee):
+    contribution = Contribution.objects.create(
+        gift_list=gift_list,
+        contributor_name='Anna',
+        contributor_email='anna@test.com',
+        amount=Decimal(amount),
+        payment_status=Contribution.PaymentStatus.COMPLETED,
+        completed_at=completed_at,
+    )
+    PaymentIntent.objects.create(
+        contribution=contribution,
+        stripe_payment_intent_id=f'pi_{contribution.id}',
+        amount=contribution.amount,
+        status=PaymentIntent.Status.SUCCEEDED,
+        client_secret='secret',
+        application_fee_amount=Decimal(fee),
+    )
+    return contribution
+
+
+class RollupTests(TestCase):
+
+    def setUp(self):
+        self.jeweler = make_user('kpi@test.com', joined=at(TODAY - timedelta(days=2)))
+        make_user('guest@test.com', role='guest', joined=at(TODAY - timedelta(days=1)))
+        self.gift_list = GiftList.objects.create(
+            jeweler=self.jeweler, title='Lista', target_amount=Decimal('1000.00'),
+        )
+        make_contribution(self.gift_list, '100.00', at(TODAY - timedelta(days=1)), '3.00')
+        make_contribution(self.gift_list, '50.00', at(TODAY - timedelta(days=1), 23), '1.50')
+        make_contribution(self.gift_list, '20.00', at(TODAY), '0.60')
+
+    def test_backfill_from_first_signup(self):
+        self.assertEqual(rollup_platform_stats(today=TODAY), 3)
+        yesterday = PlatformDailyStats.objects.get(date=TODAY - timedelta(days=1))
+        self.assertEqual(yesterday.gmv, Decimal('150.00'))
+        self.assertEqual(yesterday.platform_fees, Decimal('4.50'))
+        self.assertEqual(yesterday.contribution_count, 2)
+        self.assertEqual(yesterday.new_users, 1)
+        self.assertEqual(yesterday.new_jewelers, 0)
+
+        today = PlatformDailyStats.objects.get(date=TODAY)
+        self.assertEqual(today.total_gmv, Decimal('170.00'))
+        self.assertEqual(today.total_users, 2)
+        self.assertEqual(today.total_jewelers, 1)
+
+    def test_incremental_run_recomputes_recent_days(self):
+        rollup_platform_stats(today=TODAY)
+        make_contribution(self.gift_list, '30.00', at(TODAY), '0.90')
+        # Default lookback: today and the two previous days
+        self.assertEqual(rollup_platform_stats(today=TODAY), 3)
+        today = PlatformDailyStats.objects.get(date=TODAY)
+        self.assertEqual(today.gmv, Decimal('50.00'))
+        self.assertEqual(today.total_gmv, Decimal('200.00'))
+
+    def test_running_totals_carry_over_untouched_days(self):
+        rollup_platform_stats(today=TODAY)
+        later = TODAY + timedelta(days=10)
+        rollup_platform_stats(today=later)
+        self.assertEqual(PlatformDailyStats.objects.get(date=later).total_gmv, Decimal('170.00'))
+        self.assertEqual(PlatformDailyStats.objects.count(), 13)
+
+
+class KpiEndpointTests(TestCase):
+
+    def setUp(self):
+        self.admin = make_user('admin@test.com', role=User.UserRole.SUPERADMIN)
+        self.client = auth_client(self.admin)
+
+    def _add_days(self, count):
+        start = PlatformDailyStats.objects.count()
+        PlatformDailyStats.objects.bulk_create([
+            PlatformDailyStats(
+                date=TODAY - timedelta(days=start + i),
+                gmv=Decimal('10.00'), contribution_count=1,
+                total_gmv=Decimal('10.00') * (1000 - start - i), total_contributions=1000 - start - i,
+            )
+            for i in range(count)
+        ])
+
+    def test_summary_windows(self):
+        self._add_days(40)
+        response = self.client.get('/api/analytics/kpi/summary/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['date'], TODAY)
+        self.assertEqual(response.data['last_7_days']['gmv'], Decimal('70.00'))
+        self.assertEqual(response.data['last_30_days']['contribution_count'], 30)
+        self.assertEqual(response.data['all_time']['contribution_count'], 1000)
+
+    def test_summary_cost_independent_of_history(self):
+        self._add_days(5)
+        # Warm the token cache so both measurements skip authentication queries
+        self.client.get('/api/analytics/kpi/summary/')
+        with CaptureQueriesContext(connection) as short_history:
+            self.client.get('/api/analytics/kpi/summary/')
+        self._add_days(400)
+        with CaptureQueriesContext(connection) as long_history:
+            self.client.get('/api/analytics/kpi/summary/')
+        self.assertEqual(len(long_history), len(short_history))
+
+    def test_daily_series(self):
+        self._add_days(10)
+        response = self.client.get('/api/analytics/kpi/daily/', {'date_to': TODAY, 'date_from': TODAY - timedelta(days=2)})
+        self.assertEqual([row['date'] for row in response.data['results']], [
+            str(TODAY - timedelta(days=2)), str(TODAY - timedelta(days=1)), str(TODAY),
+        ])
+
+    def test_daily_series_rejects_invalid_range(self):
+        response = self.client.get('/api/analytics/kpi/daily/', {'date_from': 'ieri'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/analytics/kpi/daily/', {'date_from': '2020-01-01', 'date_to': '2026-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_daily_series_rejects_impossible_date(self):
+        response = self.client.get('/api/analytics/kpi/daily/', {'date_to': '2024-02-30'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('date_to', response.data['error'])
+
+    def test_daily_series_rejects_reversed_range(self):
+        response = self.client.get('/api/analytics/kpi/daily/', {'date_from': '2026-02-10', 'date_to': '2026-02-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_jeweler_forbidden(self):
+        client = auth_client(make_user('jeweler@test.com'))
+        response = client.get('/api/analytics/kpi/summary/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
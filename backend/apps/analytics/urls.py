@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'analytics'
+
+urlpatterns = [
+    path('kpi/summary/', views.kpi_summary_view, name='kpi-summary'),
+    path('kpi/daily/', views.kpi_daily_view, name='kpi-daily'),
+]
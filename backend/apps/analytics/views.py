@@ -0,0 +1,95 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema
+from mondodoro.instrumentation import query_budget
+from mondodoro.routers import replica_reads
+
+from .models import PlatformDailyStats
+from .rollups import DAILY_FIELDS, RUNNING_TOTALS
+from .serializers import PlatformDailyStatsSerializer
+
+# Longest range the daily series endpoint returns in one response
+MAX_SERIES_DAYS = 366
+
+
+class IsPlatformAdmin(permissions.BasePermission):
+    def has_permission(self, request, view):
+        user = request.user
+        return user.is_authenticated and (user.is_superuser or user.can_manage_platform())
+
+
+def _window_totals(rows, days, latest):
+    since = latest - timedelta(days=days - 1)
+    window = [row for row in rows if row.date >= since]
+    totals = {field: sum(getattr(row, field) for row in window) for field in DAILY_FIELDS}
+    totals['gmv'] = totals['gmv'] or Decimal('0.00')
+    totals['platform_fees'] = totals['platform_fees'] or Decimal('0.00')
+    return totals
+
+
+@replica_reads
+@query_budget(queries=4)
+@extend_schema(summary="Platform KPI summary", tags=["Analytics"])
+@api_view(['GET'])
+@permission_classes([IsPlatformAdmin])
+def kpi_summary_view(request):
+    """Latest day, last 7 and 30 days and all-time KPIs, read from the daily rollup (at most 30 rows)."""
+    rows = list(PlatformDailyStats.objects.order_by('-date')[:30])
+    if not rows:
+        return Response({'as_of': None, 'date': None, 'today': None, 'last_7_days': None, 'last_30_days': None, 'all_time': None})
+
+    latest = rows[0]
+    return Response({
+        'as_of': latest.computed_at,
+        'date': latest.date,
+        'today': PlatformDailyStatsSerializer(latest).data,
+        'last_7_days': _window_totals(rows, 7, latest.date),
+        'last_30_days': _window_totals(rows, 30, latest.date),
+        'all_time': {field: getattr(latest, total) for field, total in RUNNING_TOTALS.items()},
+    })
+
+
+@replica_reads
+@query_budget(queries=4)
+@extend_schema(summary="Platform KPI daily series", tags=["Analytics"])
+@api_view(['GET'])
+@permission_classes([IsPlatformAdmin])
+def kpi_daily_view(request):
+    """Daily KPIs between ?date_from= and ?date_to= (YYYY-MM-DD); defaults to the last 30 days."""
+    bounds = {}
+    for param in ('date_from', 'date_to'):
+        raw = request.query_params.get(param)
+        if not raw:
+            continue
+        try:
+            value = parse_date(raw)
+        except ValueError:
+            # Well-formed but not a real date, e.g. 2024-02-30
+            value = None
+        if value is None:
+            return Response({'error': f'{param} non valido (formato YYYY-MM-DD).'}, status=status.HTTP_400_BAD_REQUEST)
+        bounds[param] = value
+
+    date_to = bounds.get('date_to', timezone.localdate())
+    date_from = bounds.get('date_from', date_to - timedelta(days=29))
+    if date_from > date_to:
+        return Response({'error': 'date_from deve precedere date_to.'}, status=status.HTTP_400_BAD_REQUEST)
+    if (date_to - date_from).days >= MAX_SERIES_DAYS:
+        return Response(
+            {'error': f'Intervallo massimo {MAX_SERIES_DAYS} giorni.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    rows = PlatformDailyStats.objects.filter(date__range=(date_from, date_to)).order_by('date')
+    return Response({
+        'date_from': date_from,
+        'date_to': date_to,
+        'results': PlatformDailyStatsSerializer(rows, many=True).data,
+    })
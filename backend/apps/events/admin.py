@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Event, EventSlot, Booking
+from .models import Event, EventSlot, Booking, WaitlistEntry, CalendarFeed
 
 
 class EventSlotInline(admin.TabularInline):
@@ -11,6 +11,7 @@ class EventSlotInline(admin.TabularInline):
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ['title', 'jeweler', 'date', 'status']
+    list_select_related = ['jeweler']
     list_filter = ['status', 'date']
     search_fields = ['title', 'jeweler__email', 'jeweler__business_name']
     ordering = ['-date']
@@ -20,6 +21,7 @@ class EventAdmin(admin.ModelAdmin):
 @admin.register(EventSlot)
 class EventSlotAdmin(admin.ModelAdmin):
     list_display = ['event', 'start_time', 'end_time', 'price', 'max_attendees']
+    list_select_related = ['event']
     list_filter = ['event__date']
     search_fields = ['event__title']
     ordering = ['event__date', 'start_time']
@@ -28,5 +30,22 @@ class EventSlotAdmin(admin.ModelAdmin):
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = ['guest_name', 'guest_email', 'slot', 'payment_method', 'payment_status']
+    list_select_related = ['slot__event']
     list_filter = ['payment_status', 'payment_method']
     search_fields = ['guest_name', 'guest_email', 'slot__event__title']
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ['guest_name', 'guest_email', 'slot', 'status', 'hold_expires_at', 'created_at']
+    list_select_related = ['slot__event']
+    list_filter = ['status']
+    search_fields = ['guest_name', 'guest_email', 'slot__event__title']
+
+
+@admin.register(CalendarFeed)
+class CalendarFeedAdmin(admin.ModelAdmin):
+    list_display = ['jeweler', 'created_at', 'updated_at']
+    list_select_related = ['jeweler']
+    search_fields = ['jeweler__email', 'jeweler__business_name']
+    readonly_fields = ['token', 'created_at', 'updated_at']
@@ -5,3 +5,6 @@ class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.events'
     verbose_name = 'Events'
+
+    def ready(self):
+        from . import signals  # noqa: F401
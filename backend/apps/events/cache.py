@@ -0,0 +1,79 @@
+"""
+Short-TTL cache for the public event payload.
+
+The payload is built once per event with slot availability computed in a
+single grouped query, then served from the cache until a booking or slot
+change invalidates it. The TTL bounds how stale availability can get for
+changes that happen without a write (online PENDING bookings expiring).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from mondodoro.http_cache import JEWELERS_SCOPE, bump_versions
+from mondodoro.metrics import record_cache_lookup
+
+from .models import Event, EventSlot
+
+PUBLIC_EVENT_CACHE_KEY = 'events:public:{event_id}'
+
+
+def public_event_cache_key(event_id):
+    return PUBLIC_EVENT_CACHE_KEY.format(event_id=event_id)
+
+
+def public_event_cache_scopes(pk):
+    """Version scopes behind the public event response's ETag."""
+    return [f'event:{pk}', JEWELERS_SCOPE]
+
+
+def public_event_queryset(event_id):
+    return (
+        Event.objects
+        .filter(pk=event_id, status=Event.Status.ACTIVE)
+        .select_related('jeweler')
+        .prefetch_related(Prefetch('slots', queryset=EventSlot.with_availability()))
+    )
+
+
+def serialize_public_event(event):
+    from .serializers import EventPublicSerializer
+
+    if event is None:
+        return None
+    return EventPublicSerializer(event).data
+
+
+def build_public_event_payload(event_id):
+    """Serialize an active event for the public page, or return None if not found."""
+    return serialize_public_event(public_event_queryset(event_id).first())
+
+
+def get_public_event_payload(event_id):
+    """Return the cached public payload for an event, rebuilding it on a miss."""
+    key = public_event_cache_key(event_id)
+    payload = cache.get(key)
+    record_cache_lookup('public_event', payload is not None)
+    if payload is None:
+        payload = build_public_event_payload(event_id)
+        if payload is not None:
+            cache.set(key, payload, settings.EVENTS_PUBLIC_CACHE_TTL)
+    return payload
+
+
+async def aget_public_event_payload(event_id):
+    """Async version of `get_public_event_payload()`."""
+    key = public_event_cache_key(event_id)
+    payload = await cache.aget(key)
+    record_cache_lookup('public_event', payload is not None)
+    if payload is None:
+        payload = serialize_public_event(await public_event_queryset(event_id).afirst())
+        if payload is not None:
+            await cache.aset(key, payload, settings.EVENTS_PUBLIC_CACHE_TTL)
+    return payload
+
+
+def invalidate_public_event(event_id):
+    if event_id is not None:
+        cache.delete(public_event_cache_key(event_id))
+        bump_versions(f'event:{event_id}')
@@ -0,0 +1,91 @@
+"""
+Streaming CSV export of bookings.
+
+Rows come from a single `values_list` query read with `iterator()`, so
+memory stays flat regardless of how many bookings a jeweler has.
+"""
+import csv
+import re
+
+from django.utils import timezone
+
+from .models import Booking
+
+EXPORT_CHUNK_SIZE = 2000
+
+BOOKING_EXPORT_COLUMNS = [
+    ('Evento', 'slot__event__title'),
+    ('Data', 'slot__event__date'),
+    ('Ora', 'slot__start_time'),
+    ('Nome', 'guest_name'),
+    ('Email', 'guest_email'),
+    ('Telefono', 'guest_phone'),
+    ('Messaggio', 'guest_message'),
+    ('Prezzo', 'slot__price'),
+    ('Metodo di pagamento', 'payment_method'),
+    ('Stato pagamento', 'payment_status'),
+    ('Prenotato il', 'created_at'),
+    ('ID prenotazione', 'id'),
+]
+
+_PAYMENT_METHODS = dict(Booking.PaymentMethod.choices)
+_PAYMENT_STATUSES = dict(Booking.PaymentStatus.choices)
+# Spreadsheets evaluate cells starting with these as formulas (CSV injection)
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+# International phone numbers start with '+' but cannot run as a formula
+_PHONE_NUMBER = re.compile(r'\+[\d\s().-]+')
+
+
+class _Echo:
+    """File-like object whose write() returns the line for the generator to yield."""
+
+    def write(self, value):
+        return value
+
+
+def _text_cell(value):
+    """Free text as a literal cell: a leading quote stops formula evaluation."""
+    value = value or ''
+    if not value.startswith(_FORMULA_PREFIXES) or _PHONE_NUMBER.fullmatch(value):
+        return value
+    return "'" + value
+
+
+def _format_row(row):
+    title, day, start, name, email, phone, message, price, method, status, created, pk = row
+    return [
+        _text_cell(title),
+        day.strftime('%d/%m/%Y'),
+        start.strftime('%H:%M'),
+        _text_cell(name),
+        _text_cell(email),
+        _text_cell(phone),
+        _text_cell(message),
+        f'{price:.2f}',
+        str(_PAYMENT_METHODS.get(method, method)),
+        str(_PAYMENT_STATUSES.get(status, status)),
+        timezone.localtime(created).strftime('%d/%m/%Y %H:%M'),
+        str(pk),
+    ]
+
+
+def iter_bookings_csv(queryset):
+    """Yield the CSV for `queryset` in chunks of EXPORT_CHUNK_SIZE rows."""
+    writer = csv.writer(_Echo())
+    # BOM so spreadsheet applications detect UTF-8
+    yield '\ufeff' + writer.writerow([header for header, _ in BOOKING_EXPORT_COLUMNS])
+
+    rows = (
+        queryset
+        .order_by('slot__event__date', 'slot__start_time', 'created_at')
+        .values_list(*[lookup for _, lookup in BOOKING_EXPORT_COLUMNS])
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow(_format_row(row)))
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
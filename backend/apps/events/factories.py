@@ -0,0 +1,86 @@
+"""
+factory-boy factories for events (tests and `generate_load_data`).
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+import factory
+from django.utils import timezone
+
+from apps.accounts.factories import JewelerFactory
+from mondodoro.factories import pooled, random_datetime, random_full_name, rng, weighted
+from .models import Event, EventSlot, Booking
+
+PAST_EVENT_STATUSES = {
+    Event.Status.COMPLETED: 85,
+    Event.Status.CANCELLED: 10,
+    Event.Status.DRAFT: 5,
+}
+UPCOMING_EVENT_STATUSES = {
+    Event.Status.ACTIVE: 80,
+    Event.Status.DRAFT: 12,
+    Event.Status.CANCELLED: 8,
+}
+EVENT_TITLES = ('Presentazione collezione', 'Giornata fedi nuziali', 'Trunk show', 'Serata perle', 'Atelier orologi')
+SLOT_PRICES = [Decimal(value) for value in ('0', '0', '25', '40', '60')]
+SLOT_CAPACITIES = (1, 1, 2, 4, 6, 10)
+ONLINE_SHARE = 0.7
+
+
+def _event_status(o):
+    past = o.date < timezone.localdate()
+    return weighted(PAST_EVENT_STATUSES if past else UPCOMING_EVENT_STATUSES)()
+
+
+def _event_created_at(o):
+    day_start = timezone.make_aware(datetime.combine(o.date, time.min))
+    return random_datetime(day_start - timedelta(days=rng().randint(14, 90)), min(timezone.now(), day_start))
+
+
+def _payment_method(o):
+    if o.slot.price > 0 and rng().random() < ONLINE_SHARE:
+        return Booking.PaymentMethod.ONLINE
+    return Booking.PaymentMethod.IN_PERSON
+
+
+def _booking_created_at(o):
+    event = o.slot.event
+    event_start = timezone.make_aware(datetime.combine(event.date, o.slot.start_time))
+    return random_datetime(event.created_at, min(timezone.now(), event_start))
+
+
+class EventFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Event
+
+    jeweler = factory.SubFactory(JewelerFactory)
+    title = factory.LazyFunction(lambda: rng().choice(EVENT_TITLES))
+    location = factory.LazyFunction(lambda: pooled('city'))
+    date = factory.LazyFunction(lambda: timezone.localdate() + timedelta(days=rng().randint(-365, 120)))
+    status = factory.LazyAttribute(_event_status)
+    created_at = factory.LazyAttribute(_event_created_at)
+    updated_at = factory.SelfAttribute('created_at')
+
+
+class EventSlotFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = EventSlot
+
+    event = factory.SubFactory(EventFactory)
+    start_time = factory.LazyFunction(lambda: time(rng().randint(9, 18), rng().choice((0, 30))))
+    price = factory.LazyFunction(lambda: rng().choice(SLOT_PRICES))
+    max_attendees = factory.LazyFunction(lambda: rng().choice(SLOT_CAPACITIES))
+    updated_at = factory.SelfAttribute('event.created_at')
+
+
+class BookingFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Booking
+
+    slot = factory.SubFactory(EventSlotFactory)
+    guest_name = factory.LazyFunction(random_full_name)
+    guest_email = factory.Sequence(lambda n: f'prenotazione{n}@example.com')
+    payment_method = factory.LazyAttribute(_payment_method)
+    payment_status = Booking.PaymentStatus.PAID
+    created_at = factory.LazyAttribute(_booking_created_at)
+    updated_at = factory.SelfAttribute('created_at')
@@ -0,0 +1,144 @@
+"""
+Streaming iCalendar (RFC 5545) serialization of a jeweler's events.
+
+Each slot becomes a VEVENT with its bookings listed in the description;
+events without slots are emitted as all-day entries. Lines are produced
+one at a time so the feed is never built in memory.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from .models import Event, EventSlot, Booking
+
+PRODID = '-//ListDreams//Eventi Gioielleria//IT'
+DEFAULT_SLOT_DURATION = timedelta(minutes=30)
+UID_DOMAIN = 'listdreams.it'
+
+
+def escape_text(value):
+    return (
+        str(value or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold_line(line):
+    """Fold a content line at 75 octets as required by RFC 5545."""
+    parts, current, size = [], [], 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        # Continuation lines start with a space, leaving 74 octets of content
+        limit = 75 if not parts else 74
+        if size + width > limit:
+            parts.append(''.join(current))
+            current, size = [], 0
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _local_datetime(day, time_of_day):
+    return timezone.make_aware(datetime.combine(day, time_of_day), timezone.get_default_timezone())
+
+
+def feed_events(jeweler):
+    """Events shown in the feed, with slots and live bookings prefetched."""
+    since = timezone.localdate() - timedelta(days=settings.EVENTS_CALENDAR_PAST_DAYS)
+    bookings = (
+        Booking.objects
+        .exclude(payment_status=Booking.PaymentStatus.CANCELLED)
+        .only('id', 'slot_id', 'guest_name', 'guest_phone', 'payment_status', 'created_at')
+        .order_by('created_at')
+    )
+    slots = EventSlot.objects.prefetch_related(Prefetch('bookings', queryset=bookings))
+    return (
+        Event.objects
+        .filter(jeweler=jeweler, date__gte=since)
+        .exclude(status=Event.Status.DRAFT)
+        .prefetch_related(Prefetch('slots', queryset=slots))
+        .order_by('date')
+    )
+
+
+def _event_status(event):
+    return 'CANCELLED' if event.status == Event.Status.CANCELLED else 'CONFIRMED'
+
+
+def _slot_lines(event, slot, dtstamp):
+    start = _local_datetime(event.date, slot.start_time)
+    end = _local_datetime(event.date, slot.end_time) if slot.end_time else start + DEFAULT_SLOT_DURATION
+    bookings = list(slot.bookings.all())
+
+    description = [f"Prenotazioni: {len(bookings)}/{slot.max_attendees}"]
+    for booking in bookings:
+        guest = booking.guest_name
+        if booking.guest_phone:
+            guest = f"{guest} ({booking.guest_phone})"
+        description.append(f"- {guest} — {booking.get_payment_status_display()}")
+    if slot.notes:
+        description.append(slot.notes)
+
+    yield 'BEGIN:VEVENT'
+    yield f'UID:slot-{slot.id}@{UID_DOMAIN}'
+    yield f'DTSTAMP:{dtstamp}'
+    yield f'DTSTART:{format_utc(start)}'
+    yield f'DTEND:{format_utc(end)}'
+    yield f'SUMMARY:{escape_text(f"{event.title} ({len(bookings)}/{slot.max_attendees})")}'
+    if event.location:
+        yield f'LOCATION:{escape_text(event.location)}'
+    yield f'DESCRIPTION:{escape_text(chr(10).join(description))}'
+    yield f'STATUS:{_event_status(event)}'
+    yield f'LAST-MODIFIED:{format_utc(max(event.updated_at, slot.updated_at))}'
+    yield 'END:VEVENT'
+
+
+def _all_day_lines(event, dtstamp):
+    yield 'BEGIN:VEVENT'
+    yield f'UID:event-{event.id}@{UID_DOMAIN}'
+    yield f'DTSTAMP:{dtstamp}'
+    yield f'DTSTART;VALUE=DATE:{event.date.strftime("%Y%m%d")}'
+    yield f'DTEND;VALUE=DATE:{(event.date + timedelta(days=1)).strftime("%Y%m%d")}'
+    yield f'SUMMARY:{escape_text(event.title)}'
+    if event.location:
+        yield f'LOCATION:{escape_text(event.location)}'
+    if event.description:
+        yield f'DESCRIPTION:{escape_text(event.description)}'
+    yield f'STATUS:{_event_status(event)}'
+    yield f'LAST-MODIFIED:{format_utc(event.updated_at)}'
+    yield 'END:VEVENT'
+
+
+def iter_calendar(jeweler):
+    """Yield the jeweler's calendar as text chunks, one per event."""
+    dtstamp = format_utc(timezone.now())
+    name = jeweler.business_name or jeweler.get_full_name()
+
+    yield fold_line('BEGIN:VCALENDAR')
+    yield fold_line('VERSION:2.0')
+    yield fold_line(f'PRODID:{PRODID}')
+    yield fold_line('CALSCALE:GREGORIAN')
+    yield fold_line('METHOD:PUBLISH')
+    yield fold_line(f'X-WR-CALNAME:{escape_text(f"{name} – Eventi")}')
+
+    for event in feed_events(jeweler).iterator(chunk_size=100):
+        slots = list(event.slots.all())
+        lines = (
+            (line for slot in slots for line in _slot_lines(event, slot, dtstamp))
+            if slots else _all_day_lines(event, dtstamp)
+        )
+        # One chunk per event keeps the number of writes to the socket low
+        yield ''.join(fold_line(line) for line in lines)
+
+    yield fold_line('END:VCALENDAR')
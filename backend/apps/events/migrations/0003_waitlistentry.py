@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_event_slots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('guest_name', models.CharField(max_length=255)),
+                ('guest_email', models.EmailField(max_length=254)),
+                ('guest_phone', models.CharField(blank=True, max_length=50, null=True)),
+                ('status', models.CharField(choices=[('waiting', 'In Attesa'), ('promoted', 'Promosso'), ('booked', 'Prenotato'), ('expired', 'Scaduto')], default='waiting', max_length=20)),
+                ('promoted_at', models.DateTimeField(blank=True, null=True)),
+                ('hold_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='events.eventslot')),
+            ],
+            options={
+                'verbose_name': 'Waitlist Entry',
+                'verbose_name_plural': 'Waitlist Entries',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['slot', 'status', 'created_at'], name='events_wait_slot_id_a25c33_idx')],
+            },
+        ),
+    ]
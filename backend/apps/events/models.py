@@ -1,3 +1,4 @@
+import secrets
 import uuid
 from datetime import timedelta
 from decimal import Decimal
@@ -9,6 +10,35 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
+# Online PENDING bookings expire after 30 min (abandoned Stripe checkouts don't block slots)
+PENDING_ONLINE_BOOKING_TTL = timedelta(minutes=30)
+
+
+def active_bookings_q(prefix=''):
+    """Q object matching bookings that occupy a spot; `prefix` is the lookup path to Booking."""
+    cutoff = timezone.now() - PENDING_ONLINE_BOOKING_TTL
+    return (
+        Q(**{f'{prefix}payment_status': Booking.PaymentStatus.PAID}) |
+        Q(**{
+            f'{prefix}payment_status': Booking.PaymentStatus.PENDING,
+            f'{prefix}payment_method': Booking.PaymentMethod.IN_PERSON,
+        }) |
+        Q(**{
+            f'{prefix}payment_status': Booking.PaymentStatus.PENDING,
+            f'{prefix}payment_method': Booking.PaymentMethod.ONLINE,
+            f'{prefix}created_at__gte': cutoff,
+        })
+    )
+
+
+def active_holds_q(prefix=''):
+    """Q object matching waitlist entries that currently hold a spot; `prefix` is the lookup path."""
+    return Q(**{
+        f'{prefix}status': WaitlistEntry.Status.PROMOTED,
+        f'{prefix}hold_expires_at__gt': timezone.now(),
+    })
+
+
 class Event(models.Model):
     class Status(models.TextChoices):
         DRAFT = 'draft', _('Bozza')
@@ -57,6 +87,8 @@ class EventSlot(models.Model):
     max_attendees = models.PositiveIntegerField(default=1)
     notes = models.CharField(max_length=255, blank=True, null=True)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         ordering = ['start_time']
         verbose_name = _('Event Slot')
@@ -71,20 +103,36 @@ class EventSlot(models.Model):
 
     @property
     def booked_count(self):
-        # Online PENDING bookings expire after 30 min (abandoned Stripe checkouts don't block slots)
-        cutoff = timezone.now() - timedelta(minutes=30)
-        return self.bookings.filter(
-            Q(payment_status=Booking.PaymentStatus.PAID) |
-            Q(payment_status=Booking.PaymentStatus.PENDING,
-              payment_method=Booking.PaymentMethod.IN_PERSON) |
-            Q(payment_status=Booking.PaymentStatus.PENDING,
-              payment_method=Booking.PaymentMethod.ONLINE,
-              created_at__gte=cutoff)
-        ).count()
+        # Querysets built with with_availability() carry the count as an annotation
+        annotated = getattr(self, 'active_bookings', None)
+        if annotated is not None:
+            return annotated
+        return self.bookings.filter(active_bookings_q()).count()
+
+    @property
+    def held_count(self):
+        """Spots reserved for waitlist guests who were promoted and have not booked yet."""
+        annotated = getattr(self, 'active_holds', None)
+        if annotated is not None:
+            return annotated
+        return self.waitlist_entries.filter(active_holds_q()).count()
+
+    @classmethod
+    def with_availability(cls, queryset=None):
+        """Annotate slots with booking and waitlist hold counts in a single grouped query."""
+        queryset = cls.objects.all() if queryset is None else queryset
+        return queryset.annotate(
+            active_bookings=models.Count(
+                'bookings', filter=active_bookings_q('bookings__'), distinct=True
+            ),
+            active_holds=models.Count(
+                'waitlist_entries', filter=active_holds_q('waitlist_entries__'), distinct=True
+            ),
+        )
 
     @property
     def available_spots(self):
-        return max(0, self.max_attendees - self.booked_count)
+        return max(0, self.max_attendees - self.booked_count - self.held_count)
 
     @property
     def is_available(self):
@@ -128,3 +176,86 @@ class Booking(models.Model):
 
     def __str__(self):
         return f"{self.guest_name} @ {self.slot.start_time} — {self.slot.event.title}"
+
+
+class WaitlistEntry(models.Model):
+    """
+    FIFO waitlist for a full slot. Promoted entries hold a spot until
+    `hold_expires_at`, giving the guest time to complete the booking.
+    """
+
+    class Status(models.TextChoices):
+        WAITING = 'waiting', _('In Attesa')
+        PROMOTED = 'promoted', _('Promosso')
+        BOOKED = 'booked', _('Prenotato')
+        EXPIRED = 'expired', _('Scaduto')
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    slot = models.ForeignKey(EventSlot, on_delete=models.CASCADE, related_name='waitlist_entries')
+
+    guest_name = models.CharField(max_length=255)
+    guest_email = models.EmailField()
+    guest_phone = models.CharField(max_length=50, blank=True, null=True)
+
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.WAITING,
+    )
+    promoted_at = models.DateTimeField(blank=True, null=True)
+    hold_expires_at = models.DateTimeField(blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['slot', 'status', 'created_at'])]
+        verbose_name = _('Waitlist Entry')
+        verbose_name_plural = _('Waitlist Entries')
+
+    def __str__(self):
+        return f"{self.guest_name} ({self.get_status_display()}) — {self.slot_id}"
+
+    @property
+    def position(self):
+        """1-based position among guests still waiting for the slot."""
+        if self.status != self.Status.WAITING:
+            return None
+        return WaitlistEntry.objects.filter(
+            slot_id=self.slot_id,
+            status=self.Status.WAITING,
+            created_at__lt=self.created_at,
+        ).count() + 1
+
+
+def generate_feed_token():
+    return secrets.token_urlsafe(32)
+
+
+class CalendarFeed(models.Model):
+    """
+    Secret token giving calendar clients read access to a jeweler's ICS feed.
+    Rotating the token revokes every previously shared feed URL.
+    """
+
+    jeweler = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='calendar_feed',
+    )
+    token = models.CharField(max_length=64, unique=True, default=generate_feed_token)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Calendar Feed')
+        verbose_name_plural = _('Calendar Feeds')
+
+    def __str__(self):
+        return f"Calendar feed — {self.jeweler.email}"
+
+    def rotate(self):
+        self.token = generate_feed_token()
+        self.save(update_fields=['token', 'updated_at'])
@@ -1,6 +1,6 @@
 import uuid
 from rest_framework import serializers
-from .models import Event, EventSlot, Booking
+from .models import Event, EventSlot, Booking, WaitlistEntry
 
 
 class BookingSerializer(serializers.ModelSerializer):
@@ -140,3 +140,27 @@ class EventPublicSerializer(serializers.ModelSerializer):
 
     def get_jeweler_name(self, obj):
         return obj.jeweler.business_name or obj.jeweler.get_full_name()
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    position = serializers.ReadOnlyField()
+    slot_time = serializers.SerializerMethodField()
+
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            'id', 'guest_name', 'guest_email', 'guest_phone',
+            'slot_time', 'status', 'status_display', 'position',
+            'promoted_at', 'hold_expires_at', 'created_at',
+        ]
+        read_only_fields = fields
+
+    def get_slot_time(self, obj):
+        return obj.slot.start_time.strftime('%H:%M')
+
+
+class WaitlistJoinSerializer(serializers.Serializer):
+    guest_name = serializers.CharField(max_length=255)
+    guest_email = serializers.EmailField()
+    guest_phone = serializers.CharField(max_length=50, required=False, allow_blank=True)
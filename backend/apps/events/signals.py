@@ -0,0 +1,34 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_public_event
+from .models import Event, EventSlot, Booking, WaitlistEntry
+
+
+def _slot_event_id(instance):
+    """Event id for a model with a `slot` foreign key, avoiding a full slot fetch."""
+    if type(instance).slot.is_cached(instance):
+        return instance.slot.event_id
+    return EventSlot.objects.filter(pk=instance.slot_id).values_list('event_id', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Event)
+def event_changed(sender, instance, **kwargs):
+    invalidate_public_event(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=EventSlot)
+def slot_changed(sender, instance, **kwargs):
+    invalidate_public_event(instance.event_id)
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def booking_changed(sender, instance, **kwargs):
+    # Covers creation, cancellation and the PENDING -> PAID transition
+    invalidate_public_event(_slot_event_id(instance))
+
+
+@receiver([post_save, post_delete], sender=WaitlistEntry)
+def waitlist_entry_changed(sender, instance, **kwargs):
+    # Promotions and expired holds change the slot's available spots
+    invalidate_public_event(_slot_event_id(instance))
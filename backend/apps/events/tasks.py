@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .waitlist import promote_waitlist
+
+
+@shared_task
+def process_waitlist():
+    """Expire unused waitlist holds and promote guests into freed spots."""
+    return promote_waitlist()
@@ -0,0 +1,443 @@
+"""
+Tests for the events app: public event payload, bookings and availability.
+"""
+import csv
+import io
+import json
+from datetime import date, time, timedelta
+from decimal import Decimal
+from unittest import mock
+
+import stripe
+from asgiref.sync import async_to_sync
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.models import User
+from apps.notifications.models import OutboundEmail
+from apps.notifications.outbox import deliver_pending
+from apps.payments.bulkhead import StripeUnavailable
+from .models import Event, EventSlot, Booking, WaitlistEntry, CalendarFeed
+from .ical import fold_line
+from .views import public_event_async_view
+from .waitlist import promote_waitlist
+
+
+def make_user(email, role='jeweler', password='TestPass123!'):
+    return User.objects.create_user(
+        username=email.split('@')[0],
+        email=email,
+        password=password,
+        first_name='Test',
+        last_name='User',
+        role=role,
+        business_name='Gioielleria Test' if role == 'jeweler' else None,
+    )
+
+
+def auth_client(user):
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+def make_event(jeweler, **kwargs):
+    defaults = {
+        'title': 'Serata Gioielli',
+        'date': date.today() + timedelta(days=7),
+        'status': Event.Status.ACTIVE,
+    }
+    defaults.update(kwargs)
+    return Event.objects.create(jeweler=jeweler, **defaults)
+
+
+def make_slot(event, **kwargs):
+    defaults = {
+        'start_time': time(18, 0),
+        'end_time': time(18, 30),
+        'price': Decimal('0.00'),
+        'max_attendees': 2,
+    }
+    defaults.update(kwargs)
+    return EventSlot.objects.create(event=event, **defaults)
+
+
+def make_booking(slot, **kwargs):
+    defaults = {
+        'guest_name': 'Anna Verdi',
+        'guest_email': 'anna@test.com',
+        'payment_method': Booking.PaymentMethod.IN_PERSON,
+    }
+    defaults.update(kwargs)
+    return Booking.objects.create(slot=slot, **defaults)
+
+
+class PublicEventCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.jeweler = make_user('events@test.com')
+        self.event = make_event(self.jeweler)
+        self.slot = make_slot(self.event)
+        self.url = f'/api/events/{self.event.id}/public/'
+
+    def _slot_payload(self, response):
+        return response.data['slots'][0]
+
+    def test_public_event_served_from_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(first.data, second.data)
+
+    def test_booking_creation_invalidates_cache(self):
+        self.client.get(self.url)
+        make_booking(self.slot)
+        response = self.client.get(self.url)
+        self.assertEqual(self._slot_payload(response)['booked_count'], 1)
+        self.assertEqual(self._slot_payload(response)['available_spots'], 1)
+
+    def test_booking_cancellation_invalidates_cache(self):
+        booking = make_booking(self.slot)
+        self.client.get(self.url)
+        booking.payment_status = Booking.PaymentStatus.CANCELLED
+        booking.save()
+        response = self.client.get(self.url)
+        self.assertEqual(self._slot_payload(response)['booked_count'], 0)
+
+    def test_slot_edit_invalidates_cache(self):
+        self.client.get(self.url)
+        self.slot.max_attendees = 5
+        self.slot.save()
+        response = self.client.get(self.url)
+        self.assertEqual(self._slot_payload(response)['available_spots'], 5)
+
+    def test_expired_online_booking_not_counted(self):
+        booking = make_booking(self.slot, payment_method=Booking.PaymentMethod.ONLINE)
+        Booking.objects.filter(pk=booking.pk).update(
+            created_at=timezone.now() - timedelta(minutes=31)
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(self._slot_payload(response)['booked_count'], 0)
+
+    def test_async_variant_matches_and_uses_cache(self):
+        make_booking(self.slot)
+        view = async_to_sync(public_event_async_view)
+        response = view(AsyncRequestFactory().get(self.url), pk=self.event.id)
+        self.assertEqual(json.loads(response.content), self.client.get(self.url).json())
+        with self.assertNumQueries(0):
+            self.assertEqual(view(AsyncRequestFactory().get(self.url), pk=self.event.id).status_code, 200)
+
+    def test_etag_follows_bookings(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_booking(self.slot)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._slot_payload(response)['booked_count'], 1)
+
+    def test_deactivated_event_not_public(self):
+        self.client.get(self.url)
+        self.event.status = Event.Status.DRAFT
+        self.event.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class WaitlistTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.jeweler = make_user('waitlist@test.com')
+        self.event = make_event(self.jeweler)
+        self.slot = make_slot(self.event, max_attendees=1)
+        self.booking = make_booking(self.slot)
+        self.join_url = f'/api/events/{self.event.id}/slots/{self.slot.id}/waitlist/'
+        self.book_url = f'/api/events/{self.event.id}/book/'
+
+    def _join(self, email, name='Ospite'):
+        return self.client.post(self.join_url, {'guest_name': name, 'guest_email': email}, format='json')
+
+    def _book(self, email):
+        return self.client.post(self.book_url, {
+            'slot_id': str(self.slot.id),
+            'guest_name': 'Ospite',
+            'guest_email': email,
+            'payment_method': 'in_person',
+        }, format='json')
+
+    def test_full_slot_booking_points_to_waitlist(self):
+        response = self._book('late@test.com')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertTrue(response.data['waitlist_available'])
+
+    def test_join_waitlist_returns_fifo_position(self):
+        first = self._join('first@test.com')
+        second = self._join('second@test.com')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data['position'], 1)
+        self.assertEqual(second.data['position'], 2)
+
+    def test_join_twice_returns_existing_entry(self):
+        first = self._join('first@test.com')
+        again = self._join('FIRST@test.com')
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.data['id'], first.data['id'])
+
+    def test_join_rejected_when_slot_available(self):
+        self.booking.delete()
+        response = self._join('first@test.com')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cancellation_promotes_next_entry(self):
+        self._join('first@test.com')
+        self._join('second@test.com')
+        self.booking.payment_status = Booking.PaymentStatus.CANCELLED
+        self.booking.save()
+
+        self.assertEqual(promote_waitlist(), 1)
+        first = WaitlistEntry.objects.get(guest_email='first@test.com')
+        second = WaitlistEntry.objects.get(guest_email='second@test.com')
+        self.assertEqual(first.status, WaitlistEntry.Status.PROMOTED)
+        self.assertEqual(second.status, WaitlistEntry.Status.WAITING)
+        deliver_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('first@test.com', mail.outbox[0].to)
+
+    def test_in_person_booking_queues_confirmation(self):
+        self.booking.delete()
+        response = self._book('guest@test.com')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        email = OutboundEmail.objects.get(template='booking_confirmation')
+        self.assertEqual(email.to_email, 'guest@test.com')
+        self.assertIn('Serata Gioielli', email.subject)
+        self.assertIn('Ciao Ospite', email.body)
+
+    def test_promoted_guest_holds_the_spot(self):
+        self._join('first@test.com')
+        self.booking.delete()
+        promote_waitlist()
+
+        self.assertEqual(self._book('other@test.com').status_code, status.HTTP_409_CONFLICT)
+        response = self._book('first@test.com')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        entry = WaitlistEntry.objects.get(guest_email='first@test.com')
+        self.assertEqual(entry.status, WaitlistEntry.Status.BOOKED)
+
+    def test_failed_checkout_keeps_the_hold(self):
+        self.slot.price = Decimal('20.00')
+        self.slot.save()
+        self._join('first@test.com')
+        self.booking.delete()
+        promote_waitlist()
+
+        for error, expected in ((StripeUnavailable(), 503), (stripe.error.APIConnectionError('down'), 500)):
+            with self.subTest(error=type(error).__name__):
+                with mock.patch('apps.events.views._create_event_checkout_session', side_effect=error):
+                    response = self.client.post(self.book_url, {
+                        'slot_id': str(self.slot.id),
+                        'guest_name': 'Ospite',
+                        'guest_email': 'first@test.com',
+                        'payment_method': 'online',
+                    }, format='json')
+                self.assertEqual(response.status_code, expected)
+                entry = WaitlistEntry.objects.get(guest_email='first@test.com')
+                self.assertEqual(entry.status, WaitlistEntry.Status.PROMOTED)
+                self.assertFalse(Booking.objects.filter(slot=self.slot).exists())
+        # The spot is still held for them
+        self.assertEqual(self._book('other@test.com').status_code, status.HTTP_409_CONFLICT)
+
+    def test_expired_hold_promotes_next_guest(self):
+        self._join('first@test.com')
+        self._join('second@test.com')
+        self.booking.delete()
+        promote_waitlist()
+        WaitlistEntry.objects.filter(guest_email='first@test.com').update(
+            hold_expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        self.assertEqual(promote_waitlist(), 1)
+        first = WaitlistEntry.objects.get(guest_email='first@test.com')
+        second = WaitlistEntry.objects.get(guest_email='second@test.com')
+        self.assertEqual(first.status, WaitlistEntry.Status.EXPIRED)
+        self.assertEqual(second.status, WaitlistEntry.Status.PROMOTED)
+
+    def test_jeweler_lists_waitlist(self):
+        self._join('first@test.com')
+        client = auth_client(self.jeweler)
+        response = client.get(f'/api/events/{self.event.id}/waitlist/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+
+
+class CalendarFeedTests(TestCase):
+
+    def setUp(self):
+        self.jeweler = make_user('calendar@test.com')
+        self.client = auth_client(self.jeweler)
+        self.event = make_event(self.jeweler, title='Presentazione Collezione', location='Via Roma 1, Milano')
+        self.slot = make_slot(self.event)
+        make_booking(self.slot, guest_name='Giulia Neri')
+
+    def _feed_path(self):
+        url = self.client.get('/api/events/calendar-feed/').data['url']
+        return url.replace('http://testserver', '')
+
+    def _content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_feed_lists_slots_and_bookings(self):
+        response = APIClient().get(self._feed_path())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/calendar'))
+        body = self._content(response)
+        self.assertIn('BEGIN:VCALENDAR', body)
+        self.assertIn(f'UID:slot-{self.slot.id}@listdreams.it', body)
+        self.assertIn('Giulia Neri', body)
+        self.assertIn('LOCATION:Via Roma 1\\, Milano', body)
+
+    def test_conditional_get_returns_304(self):
+        path = self._feed_path()
+        first = APIClient().get(path)
+        self._content(first)
+        second = APIClient().get(path, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_new_booking_changes_etag(self):
+        path = self._feed_path()
+        first = APIClient().get(path)
+        make_booking(self.slot, guest_name='Paolo Blu')
+        second = APIClient().get(path, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertIn('Paolo Blu', self._content(second))
+
+    def test_deleted_booking_not_answered_from_if_modified_since(self):
+        path = self._feed_path()
+        first = APIClient().get(path)
+        self.assertFalse(first.has_header('Last-Modified'))
+        Booking.objects.filter(slot=self.slot).delete()
+        second = APIClient().get(path, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Giulia Neri', self._content(second))
+
+    def test_rotating_token_revokes_old_url(self):
+        old_path = self._feed_path()
+        self.client.post('/api/events/calendar-feed/')
+        self.assertEqual(APIClient().get(old_path).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(CalendarFeed.objects.count(), 1)
+
+    def test_long_lines_are_folded(self):
+        folded = fold_line('DESCRIPTION:' + 'è' * 100)
+        for line in folded.split('\r\n'):
+            self.assertLessEqual(len(line.encode('utf-8')), 75)
+
+
+class BookingExportTests(TestCase):
+
+    def setUp(self):
+        self.jeweler = make_user('export@test.com')
+        self.client = auth_client(self.jeweler)
+        self.event = make_event(self.jeweler, date=date(2026, 6, 1))
+        self.slot = make_slot(self.event, max_attendees=10)
+        for i in range(3):
+            make_booking(self.slot, guest_name=f'Ospite {i}', guest_email=f'ospite{i}@test.com')
+        other_event = make_event(self.jeweler, date=date(2026, 9, 1))
+        make_booking(make_slot(other_event), guest_name='Ospite Settembre')
+
+    def _rows(self, response):
+        body = b''.join(response.streaming_content).decode('utf-8-sig')
+        return body.strip().splitlines()
+
+    def test_export_event_bookings_single_query(self):
+        response = self.client.get(f'/api/events/{self.event.id}/bookings/export/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('attachment', response['Content-Disposition'])
+        with self.assertNumQueries(1):
+            rows = self._rows(response)
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(rows[0].startswith('Evento,Data,Ora'))
+        self.assertIn('01/06/2026,18:00,Ospite 0', rows[1])
+
+    def test_export_neutralizes_formulas(self):
+        make_booking(
+            self.slot, guest_name='=HYPERLINK("http://evil.example","x")', guest_email='evil@test.com',
+            guest_phone='+393331234567', guest_message='@SUM(1+1)',
+        )
+        response = self.client.get(f'/api/events/{self.event.id}/bookings/export/')
+        body = b''.join(response.streaming_content).decode('utf-8-sig')
+        row = next(csv.reader(io.StringIO(body.splitlines()[-1])))
+        self.assertEqual(row[3:7], [
+            '\'=HYPERLINK("http://evil.example","x")', 'evil@test.com', '+393331234567', "'@SUM(1+1)",
+        ])
+
+    def test_export_keeps_phone_numbers_and_neutralizes_plus_formulas(self):
+        make_booking(self.slot, guest_name='Phone', guest_phone='+39 (333) 123-4567')
+        make_booking(self.slot, guest_name='Formula', guest_phone='+1+cmd|"/c calc"!A0')
+        response = self.client.get(f'/api/events/{self.event.id}/bookings/export/')
+        body = b''.join(response.streaming_content).decode('utf-8-sig')
+        phones = {row[3]: row[5] for row in csv.reader(io.StringIO(body))}
+        self.assertEqual(phones['Phone'], '+39 (333) 123-4567')
+        self.assertEqual(phones['Formula'], '\'+1+cmd|"/c calc"!A0')
+
+    def test_export_by_date_range(self):
+        response = self.client.get('/api/events/bookings/export/?date_from=2026-08-01')
+        rows = self._rows(response)
+        self.assertEqual(len(rows), 2)
+        self.assertIn('Ospite Settembre', rows[1])
+
+    def test_export_invalid_date(self):
+        for value in ('ieri', '2024-02-30'):
+            with self.subTest(value=value):
+                response = self.client.get(f'/api/events/bookings/export/?date_from={value}')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('date_from', response.data['error'])
+
+    def test_export_other_jeweler_forbidden(self):
+        other = auth_client(make_user('intruder@test.com'))
+        response = other.get(f'/api/events/{self.event.id}/bookings/export/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Changelist pages must not run per-row queries."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin@test.com', email='admin@test.com', password='TestPass123!',
+            first_name='Admin', last_name='User',
+        )
+        self.client.force_login(self.admin)
+
+    def _add_bookings(self, count):
+        for i in range(count):
+            jeweler = make_user(f'jeweler{Event.objects.count()}@test.com')
+            make_booking(make_slot(make_event(jeweler)), guest_name=f'Ospite {i}')
+
+    def _query_count(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelists_do_not_scale_with_rows(self):
+        urls = [
+            reverse(f'admin:events_{model}_changelist')
+            for model in ['event', 'eventslot', 'booking', 'waitlistentry']
+        ]
+        self._add_bookings(2)
+        small = [self._query_count(url) for url in urls]
+        self._add_bookings(20)
+        self.assertEqual([self._query_count(url) for url in urls], small)
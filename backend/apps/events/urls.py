@@ -1,5 +1,10 @@
+from django.conf import settings
 from django.urls import path
+
+from mondodoro.async_views import public_view
+from mondodoro.http_cache import public_cache
 from . import views
+from .cache import public_event_cache_scopes
 
 app_name = 'events'
 
@@ -10,11 +15,23 @@ urlpatterns = [
     path('<uuid:pk>/slots/', views.EventSlotsView.as_view(), name='event-slots'),
     path('<uuid:pk>/slots/<uuid:slot_pk>/', views.EventSlotDetailView.as_view(), name='event-slot-detail'),
     path('<uuid:pk>/bookings/', views.EventBookingsView.as_view(), name='event-bookings'),
+    path('<uuid:pk>/bookings/export/', views.export_event_bookings_view, name='event-bookings-export'),
+    path('bookings/export/', views.export_bookings_view, name='bookings-export'),
     path('<uuid:pk>/bookings/<uuid:booking_pk>/status/', views.update_booking_status_view, name='booking-status'),
+    path('<uuid:pk>/waitlist/', views.EventWaitlistView.as_view(), name='event-waitlist'),
+    path('calendar-feed/', views.calendar_feed_view, name='event-calendar-feed'),
 
     # Public endpoints
-    path('<uuid:pk>/public/', views.public_event_view, name='event-public'),
+    # ETags expire with the payload cache: availability also changes as pending bookings lapse
+    path('<uuid:pk>/public/',
+         public_cache(public_event_cache_scopes, version_ttl=settings.EVENTS_PUBLIC_CACHE_TTL)(
+             public_view(views.public_event_view, views.public_event_async_view)),
+         name='event-public'),
     path('<uuid:pk>/book/', views.create_booking_view, name='event-book'),
+    path('<uuid:pk>/slots/<uuid:slot_pk>/waitlist/', views.join_waitlist_view, name='slot-waitlist-join'),
+
+    # Token-protected ICS feed for calendar clients
+    path('calendar/<str:token>.ics', views.calendar_ics_view, name='event-calendar-ics'),
 
     # Stripe webhook for events
     path('webhook/', views.event_stripe_webhook, name='event-webhook'),
@@ -1,24 +1,39 @@
 import stripe
+import hashlib
 import logging
 from decimal import Decimal
 
 from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
-from django.http import HttpResponse
+from django.db.models import Count, Max
+from django.http import HttpResponse, Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import condition, require_GET
 
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
-
-from .models import Event, EventSlot, Booking
+from mondodoro.async_views import async_variant, json_response, not_found
+from mondodoro.instrumentation import query_budget
+from mondodoro.metrics import observe_webhook_lag
+from mondodoro.routers import replica_reads
+
+from .exports import iter_bookings_csv
+from .ical import iter_calendar
+from .models import Event, EventSlot, Booking, WaitlistEntry, CalendarFeed, active_holds_q
 from .serializers import (
-    EventSerializer, EventCreateSerializer, EventPublicSerializer,
+    EventSerializer, EventCreateSerializer,
     EventSlotSerializer, EventSlotCreateSerializer,
     BookingSerializer, BookingCreateSerializer,
+    WaitlistEntrySerializer, WaitlistJoinSerializer,
 )
+from .cache import aget_public_event_payload, get_public_event_payload
 from apps.accounts.models import User
+from apps.notifications.emails import queue_booking_confirmation
+from apps.payments.bulkhead import StripeUnavailable, call_stripe, stripe_unavailable_response
 from apps.payments.models import StripeAccount, PlatformSettings
 
 logger = logging.getLogger(__name__)
@@ -36,6 +51,7 @@ class IsJewelerOwner(permissions.BasePermission):
         return obj.jeweler == request.user
 
 
+@query_budget(queries=16)
 class EventListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsJewelerOwner]
 
@@ -126,13 +142,25 @@ class EventSlotDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Response(EventSlotSerializer(instance).data)
 
 
+@replica_reads
+@query_budget(queries=4)
 @extend_schema(summary="Public event detail", tags=["Events Public"])
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def public_event_view(request, pk):
-    event = get_object_or_404(Event, pk=pk, status=Event.Status.ACTIVE)
-    serializer = EventPublicSerializer(event)
-    return Response(serializer.data)
+    payload = get_public_event_payload(pk)
+    if payload is None:
+        raise Http404
+    return Response(payload)
+
+
+@async_variant(public_event_view)
+async def public_event_async_view(request, pk):
+    """Async variant of public_event_view for the ASGI serving mode."""
+    payload = await aget_public_event_payload(pk)
+    if payload is None:
+        return not_found()
+    return json_response(payload)
 
 
 class EventBookingsView(generics.ListAPIView):
@@ -148,6 +176,53 @@ class EventBookingsView(generics.ListAPIView):
         return get_object_or_404(Event, pk=self.kwargs['pk'], jeweler=self.request.user)
 
 
+def _bookings_csv_response(queryset, filename):
+    # Fix the database now: the body is streamed after the view, and its
+    # replica routing, have returned
+    queryset = queryset.using(queryset.db)
+    response = StreamingHttpResponse(iter_bookings_csv(queryset), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@replica_reads
+@extend_schema(summary="Export event bookings (CSV)", tags=["Events"])
+@api_view(['GET'])
+@permission_classes([IsJewelerOwner])
+def export_event_bookings_view(request, pk):
+    """Jeweler-only: stream all bookings of one event as CSV."""
+    event = get_object_or_404(Event, pk=pk, jeweler=request.user)
+    queryset = Booking.objects.filter(slot__event=event)
+    return _bookings_csv_response(queryset, f'prenotazioni-{event.date.isoformat()}.csv')
+
+
+@replica_reads
+@extend_schema(summary="Export bookings by date range (CSV)", tags=["Events"])
+@api_view(['GET'])
+@permission_classes([IsJewelerOwner])
+def export_bookings_view(request):
+    """Jeweler-only: stream bookings across events, optionally filtered by ?date_from=&date_to= (YYYY-MM-DD)."""
+    queryset = Booking.objects.filter(slot__event__jeweler=request.user)
+    bounds = {}
+    for param, lookup in (('date_from', 'slot__event__date__gte'), ('date_to', 'slot__event__date__lte')):
+        raw = request.query_params.get(param)
+        if not raw:
+            continue
+        try:
+            value = parse_date(raw)
+        except ValueError:
+            # Well-formed but not a real date, e.g. 2024-02-30
+            value = None
+        if value is None:
+            return Response({'error': f'{param} non valido (formato YYYY-MM-DD).'}, status=status.HTTP_400_BAD_REQUEST)
+        bounds[lookup] = value
+    queryset = queryset.filter(**bounds)
+
+    suffix = '-'.join(str(bounds[k]) for k in sorted(bounds)) or 'tutte'
+    return _bookings_csv_response(queryset, f'prenotazioni-{suffix}.csv')
+
+
+@query_budget(queries=14)
 @extend_schema(summary="Create booking", tags=["Events Public"])
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
@@ -161,9 +236,18 @@ def create_booking_view(request, pk):
     slot = serializer.context['slot']
     payment_method = serializer.validated_data['payment_method']
 
+    # A guest promoted from the waitlist books into the spot held for them
+    hold = slot.waitlist_entries.filter(
+        active_holds_q(),
+        guest_email__iexact=serializer.validated_data['guest_email'],
+    ).first()
+
     # Check slot availability
-    if not slot.is_available:
-        return Response({'error': 'Questo slot non è più disponibile.'}, status=status.HTTP_409_CONFLICT)
+    if hold is None and not slot.is_available:
+        return Response(
+            {'error': 'Questo slot non è più disponibile.', 'waitlist_available': True},
+            status=status.HTTP_409_CONFLICT,
+        )
 
     # Create booking
     booking = Booking.objects.create(
@@ -175,16 +259,22 @@ def create_booking_view(request, pk):
         payment_method=payment_method,
     )
 
+    if hold is not None:
+        hold.status = WaitlistEntry.Status.BOOKED
+        hold.save(update_fields=['status', 'updated_at'])
+
     # Free slot or in-person payment
     if slot.is_free:
         booking.payment_status = Booking.PaymentStatus.PAID
         booking.save()
+        queue_booking_confirmation(booking)
         return Response(
             {'booking': BookingSerializer(booking).data, 'checkout_url': None},
             status=status.HTTP_201_CREATED,
         )
 
     if payment_method == Booking.PaymentMethod.IN_PERSON:
+        queue_booking_confirmation(booking)
         return Response(
             {'booking': BookingSerializer(booking).data, 'checkout_url': None},
             status=status.HTTP_201_CREATED,
@@ -199,12 +289,68 @@ def create_booking_view(request, pk):
             {'booking': BookingSerializer(booking).data, 'checkout_url': checkout_url['url']},
             status=status.HTTP_201_CREATED,
         )
+    except StripeUnavailable:
+        _abandon_booking(booking, hold)
+        return stripe_unavailable_response()
     except Exception as e:
         logger.error(f"Stripe error for booking {booking.id}: {e}")
-        booking.delete()
+        _abandon_booking(booking, hold)
         return Response({'error': 'Errore nel pagamento. Riprova.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _abandon_booking(booking, hold):
+    """Drop a booking whose checkout could not be created; a waitlist guest keeps their hold."""
+    booking.delete()
+    if hold is not None:
+        hold.status = WaitlistEntry.Status.PROMOTED
+        hold.save(update_fields=['status', 'updated_at'])
+
+
+@query_budget(queries=10)
+@extend_schema(summary="Join slot waitlist", tags=["Events Public"])
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def join_waitlist_view(request, pk, slot_pk):
+    """Queue a guest for a full slot. Joining twice returns the existing entry."""
+    event = get_object_or_404(Event, pk=pk, status=Event.Status.ACTIVE)
+    slot = get_object_or_404(EventSlot, pk=slot_pk, event=event)
+
+    serializer = WaitlistJoinSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    email = serializer.validated_data['guest_email']
+
+    existing = slot.waitlist_entries.filter(
+        guest_email__iexact=email,
+        status__in=[WaitlistEntry.Status.WAITING, WaitlistEntry.Status.PROMOTED],
+    ).first()
+    if existing is not None:
+        return Response(WaitlistEntrySerializer(existing).data)
+
+    if slot.is_available:
+        return Response(
+            {'error': 'Lo slot ha ancora posti disponibili: prenota direttamente.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    entry = WaitlistEntry.objects.create(
+        slot=slot,
+        guest_name=serializer.validated_data['guest_name'],
+        guest_email=email,
+        guest_phone=serializer.validated_data.get('guest_phone', ''),
+    )
+    return Response(WaitlistEntrySerializer(entry).data, status=status.HTTP_201_CREATED)
+
+
+class EventWaitlistView(generics.ListAPIView):
+    """Jeweler-only: list waitlist entries for an event"""
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [IsJewelerOwner]
+
+    def get_queryset(self):
+        event = get_object_or_404(Event, pk=self.kwargs['pk'], jeweler=self.request.user)
+        return WaitlistEntry.objects.filter(slot__event=event).select_related('slot')
+
+
 def _create_event_checkout_session(event, slot, booking):
     stripe.api_key = settings.STRIPE_SECRET_KEY
     amount_cents = int(slot.price * 100)
@@ -256,7 +402,7 @@ def _create_event_checkout_session(event, slot, booking):
         params['stripe_account'] = stripe_account_id
         params['payment_intent_data'] = {'application_fee_amount': application_fee}
 
-    session = stripe.checkout.Session.create(**params)
+    session = call_stripe(stripe.checkout.Session.create, **params)
     return {'url': session.url, 'session_id': session.id}
 
 
@@ -279,12 +425,14 @@ def event_stripe_webhook(request):
         booking_id = session.get('metadata', {}).get('booking_id')
         if booking_id:
             try:
-                booking = Booking.objects.get(id=booking_id)
+                booking = Booking.objects.select_related('slot__event').get(id=booking_id)
                 booking.payment_status = Booking.PaymentStatus.PAID
                 booking.save()
+                queue_booking_confirmation(booking)
             except Booking.DoesNotExist:
                 pass
 
+    observe_webhook_lag('events', event_obj)
     return HttpResponse(status=200)
 
 
@@ -303,3 +451,77 @@ def update_booking_status_view(request, pk, booking_pk):
     booking.payment_status = new_status
     booking.save()
     return Response(BookingSerializer(booking).data)
+
+
+@extend_schema(summary="Calendar feed URL", tags=["Events"])
+@api_view(['GET', 'POST'])
+@permission_classes([IsJewelerOwner])
+def calendar_feed_view(request):
+    """GET returns the jeweler's ICS feed URL; POST rotates the token, revoking the old URL."""
+    feed, created = CalendarFeed.objects.get_or_create(jeweler=request.user)
+    if request.method == 'POST' and not created:
+        feed.rotate()
+
+    path = reverse('events:event-calendar-ics', kwargs={'token': feed.token})
+    return Response({
+        'url': request.build_absolute_uri(path),
+        'created_at': feed.created_at,
+        'updated_at': feed.updated_at,
+    })
+
+
+def _calendar_feed_state(request, token):
+    """
+    Version information for a feed, computed once per request and shared by
+    the ETag callback and the view. Counts are part of the ETag so deletions,
+    which leave no updated_at behind, still change it. There is deliberately
+    no Last-Modified: a deletion would not move it, and clients revalidating
+    with If-Modified-Since alone would get a stale 304.
+    """
+    if not hasattr(request, '_calendar_feed_state'):
+        feed = CalendarFeed.objects.select_related('jeweler').filter(token=token).first()
+        state = None
+        if feed is not None:
+            events = Event.objects.filter(jeweler_id=feed.jeweler_id).aggregate(
+                last=Max('updated_at'), count=Count('id'),
+            )
+            slots = EventSlot.objects.filter(event__jeweler_id=feed.jeweler_id).aggregate(
+                last=Max('updated_at'), count=Count('id'),
+            )
+            bookings = Booking.objects.filter(slot__event__jeweler_id=feed.jeweler_id).aggregate(
+                last=Max('updated_at'), count=Count('id'),
+            )
+            fingerprint = ':'.join(
+                str(part) for part in (
+                    feed.token, feed.jeweler.updated_at.isoformat(),
+                    *(s['last'] and s['last'].isoformat() for s in (events, slots, bookings)),
+                    events['count'], slots['count'], bookings['count'],
+                )
+            )
+            state = {
+                'feed': feed,
+                'etag': hashlib.sha256(fingerprint.encode()).hexdigest()[:32],
+            }
+        request._calendar_feed_state = state
+    return request._calendar_feed_state
+
+
+def _calendar_etag(request, token):
+    state = _calendar_feed_state(request, token)
+    return state and state['etag']
+
+
+@require_GET
+@condition(etag_func=_calendar_etag)
+def calendar_ics_view(request, token):
+    """Public, token-protected ICS feed. Clients polling with If-None-Match get a 304."""
+    state = _calendar_feed_state(request, token)
+    if state is None:
+        raise Http404
+    response = StreamingHttpResponse(
+        iter_calendar(state['feed'].jeweler),
+        content_type='text/calendar; charset=utf-8',
+    )
+    response['Content-Disposition'] = 'inline; filename="eventi.ics"'
+    response['Cache-Control'] = 'private, no-cache'
+    return response
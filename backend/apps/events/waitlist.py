@@ -0,0 +1,91 @@
+"""
+Waitlist promotion for full event slots.
+
+`promote_waitlist` is run periodically by the `process_waitlist` Celery task:
+it expires holds that were not used and promotes the next waiting guests
+into any capacity freed by cancelled or abandoned bookings.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.notifications.emails import queue_waitlist_promoted
+
+from .models import Event, EventSlot, WaitlistEntry
+
+logger = logging.getLogger(__name__)
+
+
+def expire_holds(now=None):
+    """Release spots held by promoted guests who did not book in time."""
+    now = now or timezone.now()
+    expired = 0
+    stale = WaitlistEntry.objects.filter(
+        status=WaitlistEntry.Status.PROMOTED,
+        hold_expires_at__lte=now,
+    )
+    for entry in stale:
+        entry.status = WaitlistEntry.Status.EXPIRED
+        entry.save(update_fields=['status', 'updated_at'])
+        expired += 1
+    return expired
+
+
+def promote_slot(slot_id, now=None):
+    """Promote waiting guests into the free spots of one slot. Returns the promoted entries."""
+    now = now or timezone.now()
+    hold = timedelta(minutes=settings.EVENTS_WAITLIST_HOLD_MINUTES)
+
+    with transaction.atomic():
+        # Lock the slot so concurrent runs cannot promote into the same spots
+        EventSlot.objects.select_for_update().filter(pk=slot_id).first()
+        slot = EventSlot.with_availability(
+            EventSlot.objects.filter(pk=slot_id).select_related('event')
+        ).first()
+        if slot is None or slot.available_spots == 0:
+            return []
+
+        entries = list(
+            slot.waitlist_entries
+            .filter(status=WaitlistEntry.Status.WAITING)
+            .order_by('created_at')[:slot.available_spots]
+        )
+        for entry in entries:
+            entry.slot = slot
+            entry.status = WaitlistEntry.Status.PROMOTED
+            entry.promoted_at = now
+            entry.hold_expires_at = now + hold
+            entry.save(update_fields=['status', 'promoted_at', 'hold_expires_at', 'updated_at'])
+
+    for entry in entries:
+        notify_promoted(entry)
+    return entries
+
+
+def promote_waitlist(now=None):
+    """Expire unused holds, then fill free capacity from the waitlists. Returns promoted count."""
+    now = now or timezone.now()
+    expire_holds(now)
+
+    slot_ids = (
+        WaitlistEntry.objects
+        .filter(
+            status=WaitlistEntry.Status.WAITING,
+            slot__event__status=Event.Status.ACTIVE,
+            slot__event__date__gte=timezone.localdate(now),
+        )
+        .values_list('slot_id', flat=True)
+        .distinct()
+    )
+    promoted = 0
+    for slot_id in list(slot_ids):
+        promoted += len(promote_slot(slot_id, now))
+    return promoted
+
+
+def notify_promoted(entry):
+    queue_waitlist_promoted(entry)
+    logger.info("Waitlist entry %s promoted for slot %s", entry.id, entry.slot_id)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
+from mondodoro.pagination import EstimatedCountAdminMixin
 from .models import GiftList, GiftListItem, Contribution
 
 
@@ -38,6 +39,7 @@ class GiftListAdmin(admin.ModelAdmin):
         'progress_display', 'contributors_count', 'created_at'
     )
     list_filter = ('status', 'is_public', 'allow_anonymous_contributions', 'created_at')
+    list_select_related = ('jeweler',)
     search_fields = ('title', 'description', 'jeweler__email', 'jeweler__business_name')
     readonly_fields = ('id', 'total_contributions_display', 'progress_display', 'created_at', 'updated_at')
     
@@ -70,6 +72,7 @@ class GiftListAdmin(admin.ModelAdmin):
         """Display total contributions with formatting"""
         return f"€{obj.total_contributions:.2f}"
     total_contributions_display.short_description = _('Total Contributions')
+    total_contributions_display.admin_order_field = 'completed_total'
     
     def progress_display(self, obj):
         """Display progress with visual indicator"""
@@ -86,8 +89,14 @@ class GiftListAdmin(admin.ModelAdmin):
         )
     progress_display.short_description = _('Progress')
     
+    def contributors_count(self, obj):
+        return obj.contributors_count
+    contributors_count.short_description = _('Contributors')
+    contributors_count.admin_order_field = 'completed_contributors'
+    
     def get_queryset(self, request):
-        queryset = super().get_queryset(request)
+        # Totals are annotated so list rows don't run their own aggregate queries
+        queryset = GiftList.with_totals(super().get_queryset(request))
         
         # Non-superadmin users can only see their own gift lists
         if not request.user.is_superuser and hasattr(request.user, 'role'):
@@ -107,6 +116,7 @@ class GiftListItemAdmin(admin.ModelAdmin):
     
     list_display = ('name', 'gift_list', 'price', 'quantity_available', 'quantity_contributed', 'is_available')
     list_filter = ('gift_list__status', 'created_at')
+    list_select_related = ('gift_list__jeweler',)
     search_fields = ('name', 'description', 'gift_list__title')
     readonly_fields = ('created_at', 'updated_at')
     
@@ -134,7 +144,7 @@ class GiftListItemAdmin(admin.ModelAdmin):
 
 
 @admin.register(Contribution)
-class ContributionAdmin(admin.ModelAdmin):
+class ContributionAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """
     Admin interface for Contributions
     """
@@ -144,6 +154,7 @@ class ContributionAdmin(admin.ModelAdmin):
         'is_anonymous', 'created_at', 'completed_at'
     )
     list_filter = ('payment_status', 'is_anonymous', 'created_at', 'completed_at')
+    list_select_related = ('gift_list__jeweler',)
     search_fields = (
         'contributor_name', 'contributor_email', 'gift_list__title',
         'stripe_payment_intent_id', 'stripe_session_id'
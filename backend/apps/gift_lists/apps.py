@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class GiftListsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.gift_lists'
-    verbose_name = 'Gift Lists'
\ No newline at end of file
+    verbose_name = 'Gift Lists'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,29 @@
+"""
+HTTP cache versions for the public gift list and gallery responses.
+
+Their ETags are built from version stamps (mondodoro/http_cache.py); the
+signal handlers in signals.py bump them whenever a list, its items,
+products or contributions change.
+"""
+from mondodoro.http_cache import JEWELERS_SCOPE, bump_versions
+
+# The public gallery shows every gallery-visible list with its totals
+GALLERY_SCOPE = 'gift_lists'
+
+
+def gift_list_scope(gift_list_id):
+    return f'gift_list:{gift_list_id}'
+
+
+def gift_list_cache_scopes(pk):
+    """Version scopes behind the public gift list response's ETag."""
+    return [gift_list_scope(pk), JEWELERS_SCOPE]
+
+
+def gallery_cache_scopes():
+    """Version scopes behind the gallery listing's ETag."""
+    return [GALLERY_SCOPE, JEWELERS_SCOPE]
+
+
+def invalidate_gift_list(gift_list_id):
+    bump_versions(gift_list_scope(gift_list_id), GALLERY_SCOPE)
@@ -0,0 +1,84 @@
+"""
+factory-boy factories for gift lists (tests and `generate_load_data`).
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+import factory
+from django.utils import timezone
+
+from apps.accounts.factories import JewelerFactory
+from mondodoro.factories import pooled, random_datetime, random_full_name, random_past_datetime, rng, weighted
+from .models import GiftList, Contribution
+
+LIST_STATUSES = {
+    GiftList.Status.ACTIVE: 55,
+    GiftList.Status.COMPLETED: 25,
+    GiftList.Status.DRAFT: 12,
+    GiftList.Status.CANCELLED: 8,
+}
+LIST_TYPES = {
+    GiftList.ListType.MONEY_COLLECTION: 80,
+    GiftList.ListType.PRODUCT_LIST: 20,
+}
+CONTRIBUTION_STATUSES = {
+    Contribution.PaymentStatus.COMPLETED: 85,
+    Contribution.PaymentStatus.PENDING: 8,
+    Contribution.PaymentStatus.FAILED: 5,
+    Contribution.PaymentStatus.REFUNDED: 2,
+}
+LIST_TITLES = ('Lista nozze', 'Anniversario', 'Battesimo', 'Laurea', 'Compleanno', 'Comunione')
+TARGET_AMOUNTS = [Decimal(value) for value in ('500', '1000', '1500', '2500', '5000', '10000')]
+CONTRIBUTION_AMOUNTS = [Decimal(value) for value in ('20', '30', '50', '50', '75', '100', '150', '250')]
+# Guests contribute to several lists, so contributor emails repeat
+CONTRIBUTOR_POOL = 50000
+
+
+def _fixed_amount(o):
+    if o.list_type == GiftList.ListType.MONEY_COLLECTION and rng().random() < 0.5:
+        return rng().choice((Decimal('25'), Decimal('50'), Decimal('100')))
+    return None
+
+
+def _contribution_created_at(o):
+    start = o.gift_list.created_at
+    return random_datetime(start, min(timezone.now(), start + timedelta(days=90)))
+
+
+class GiftListFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = GiftList
+
+    jeweler = factory.SubFactory(JewelerFactory)
+    list_type = factory.LazyFunction(weighted(LIST_TYPES))
+    title = factory.LazyFunction(lambda: f"{rng().choice(LIST_TITLES)} {pooled('last_name')}")
+    target_amount = factory.LazyFunction(lambda: rng().choice(TARGET_AMOUNTS))
+    fixed_contribution_amount = factory.LazyAttribute(_fixed_amount)
+    status = factory.LazyFunction(weighted(LIST_STATUSES))
+    show_in_public_gallery = factory.LazyFunction(lambda: rng().random() < 0.3)
+    created_at = factory.LazyFunction(lambda: random_past_datetime(700))
+    updated_at = factory.SelfAttribute('created_at')
+    start_date = factory.SelfAttribute('created_at')
+    end_date = factory.LazyAttribute(lambda o: o.created_at + timedelta(days=rng().randint(60, 180)))
+
+
+class ContributionFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Contribution
+
+    gift_list = factory.SubFactory(GiftListFactory)
+    contributor_name = factory.LazyFunction(random_full_name)
+    contributor_email = factory.LazyFunction(lambda: f'ospite{rng().randrange(CONTRIBUTOR_POOL)}@example.com')
+    is_anonymous = factory.LazyFunction(lambda: rng().random() < 0.1)
+    amount = factory.LazyAttribute(
+        lambda o: o.gift_list.fixed_contribution_amount or rng().choice(CONTRIBUTION_AMOUNTS)
+    )
+    payment_status = factory.LazyFunction(weighted(CONTRIBUTION_STATUSES))
+    created_at = factory.LazyAttribute(_contribution_created_at)
+    updated_at = factory.SelfAttribute('created_at')
+    completed_at = factory.LazyAttribute(
+        lambda o: o.created_at + timedelta(minutes=2)
+        if o.payment_status in (Contribution.PaymentStatus.COMPLETED, Contribution.PaymentStatus.REFUNDED)
+        else None
+    )
+    stripe_session_id = factory.Sequence(lambda n: f'cs_load_{n}')
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:41
+
+from django.db import migrations, models
+import mondodoro.images
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gift_lists', '0003_add_show_in_public_gallery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='giftlist',
+            name='cover_image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized versions of the cover image, written by the image worker'),
+        ),
+        migrations.AddField(
+            model_name='giftlistitem',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized versions of the item image, written by the image worker'),
+        ),
+        migrations.AlterField(
+            model_name='giftlist',
+            name='cover_image',
+            field=models.ImageField(blank=True, help_text='Cover image for the gift list', null=True, upload_to='gift_lists/covers/', validators=[mondodoro.images.validate_image_upload]),
+        ),
+        migrations.AlterField(
+            model_name='giftlistitem',
+            name='image',
+            field=models.ImageField(blank=True, help_text='Item image', null=True, upload_to='gift_lists/items/', validators=[mondodoro.images.validate_image_upload]),
+        ),
+    ]
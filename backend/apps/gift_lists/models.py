@@ -6,6 +6,8 @@ from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
+from mondodoro.images import validate_image_upload
+
 
 class GiftList(models.Model):
     """
@@ -107,8 +109,15 @@ class GiftList(models.Model):
         upload_to='gift_lists/covers/',
         blank=True,
         null=True,
+        validators=[validate_image_upload],
         help_text=_('Cover image for the gift list')
     )
+    cover_image_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text=_('Resized versions of the cover image, written by the image worker')
+    )
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -127,9 +136,24 @@ class GiftList(models.Model):
         """Get the public URL for this gift list"""
         return reverse('gift_lists:public_detail', kwargs={'pk': str(self.id)})
     
+    @classmethod
+    def with_totals(cls, queryset=None):
+        """Annotate lists with completed contribution total and contributor count in one grouped query."""
+        queryset = cls.objects.all() if queryset is None else queryset
+        completed = models.Q(contributions__payment_status=Contribution.PaymentStatus.COMPLETED)
+        return queryset.annotate(
+            completed_total=models.Sum('contributions__amount', filter=completed),
+            completed_contributors=models.Count(
+                'contributions__contributor_email', filter=completed, distinct=True
+            ),
+        )
+    
     @property
     def total_contributions(self):
         """Calculate total contributions received"""
+        # Querysets built with with_totals() carry the total as an annotation
+        if hasattr(self, 'completed_total'):
+            return self.completed_total or Decimal('0.00')
         return self.contributions.filter(
             payment_status=Contribution.PaymentStatus.COMPLETED
         ).aggregate(
@@ -151,6 +175,9 @@ class GiftList(models.Model):
     @property
     def contributors_count(self):
         """Count unique contributors"""
+        annotated = getattr(self, 'completed_contributors', None)
+        if annotated is not None:
+            return annotated
         return self.contributions.filter(
             payment_status=Contribution.PaymentStatus.COMPLETED
         ).values('contributor_email').distinct().count()
@@ -187,8 +214,15 @@ class GiftListItem(models.Model):
         upload_to='gift_lists/items/',
         blank=True,
         null=True,
+        validators=[validate_image_upload],
         help_text=_('Item image')
     )
+    image_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text=_('Resized versions of the item image, written by the image worker')
+    )
     
     # Inventory
     quantity_available = models.PositiveIntegerField(
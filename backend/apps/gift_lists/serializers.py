@@ -1,18 +1,22 @@
 from rest_framework import serializers
 from django.utils import timezone
+from mondodoro.images import ImageRenditionsField
 from .models import GiftList, GiftListItem, GiftListProduct, Contribution
 
+RECENT_CONTRIBUTIONS = 10
+
 
 class GiftListItemSerializer(serializers.ModelSerializer):
     """
     Serializer for Gift List Items
     """
     is_available = serializers.ReadOnlyField()
+    image_renditions = ImageRenditionsField('image')
     
     class Meta:
         model = GiftListItem
         fields = [
-            'id', 'name', 'description', 'price', 'image',
+            'id', 'name', 'description', 'price', 'image', 'image_renditions',
             'quantity_available', 'quantity_contributed',
             'is_available', 'order', 'created_at', 'updated_at'
         ]
@@ -69,6 +73,7 @@ class GiftListSerializer(serializers.ModelSerializer):
     contributors_count = serializers.ReadOnlyField()
     is_completed = serializers.ReadOnlyField()
     public_url = serializers.ReadOnlyField()
+    cover_image_renditions = ImageRenditionsField('cover_image')
     
     class Meta:
         model = GiftList
@@ -76,7 +81,8 @@ class GiftListSerializer(serializers.ModelSerializer):
             'id', 'title', 'description', 'list_type', 'target_amount', 
             'fixed_contribution_amount', 'max_contributors', 'status',
             'is_public', 'show_in_public_gallery', 'allow_anonymous_contributions', 'start_date', 'end_date',
-            'cover_image', 'jeweler_name', 'business_name', 'items', 'products', 'contributions',
+            'cover_image', 'cover_image_renditions', 'jeweler_name', 'business_name',
+            'items', 'products', 'contributions',
             'total_contributions', 'progress_percentage', 'contributors_count',
             'is_completed', 'public_url', 'created_at', 'updated_at'
         ]
@@ -159,22 +165,26 @@ class GiftListPublicSerializer(serializers.ModelSerializer):
     progress_percentage = serializers.ReadOnlyField()
     contributors_count = serializers.ReadOnlyField()
     is_completed = serializers.ReadOnlyField()
+    cover_image_renditions = ImageRenditionsField('cover_image')
     
     class Meta:
         model = GiftList
         fields = [
             'id', 'title', 'description', 'list_type', 'target_amount',
             'fixed_contribution_amount', 'max_contributors',
-            'cover_image', 'jeweler_name', 'business_name', 'items', 'products',
+            'cover_image', 'cover_image_renditions', 'jeweler_name', 'business_name', 'items', 'products',
             'recent_contributions', 'total_contributions', 'progress_percentage',
             'contributors_count', 'is_completed', 'end_date'
         ]
     
     def get_recent_contributions(self, obj):
         """Get recent contributions for public display"""
-        recent = obj.contributions.filter(
-            payment_status=Contribution.PaymentStatus.COMPLETED
-        ).order_by('-completed_at')[:10]
+        # Prefetched by public_gift_list_queryset()
+        recent = getattr(obj, 'recent_completed_contributions', None)
+        if recent is None:
+            recent = obj.contributions.filter(
+                payment_status=Contribution.PaymentStatus.COMPLETED
+            ).order_by('-completed_at')[:RECENT_CONTRIBUTIONS]
         
         return [{
             'display_name': contrib.display_name,
@@ -0,0 +1,44 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from mondodoro.images import delete_renditions, needs_renditions
+from mondodoro.publisher import publish_on_commit
+
+from .cache import invalidate_gift_list
+from .models import GiftList, GiftListItem, GiftListProduct, Contribution
+from .tasks import render_cover_image, render_item_image
+
+
+@receiver([post_save, post_delete], sender=GiftList)
+def gift_list_changed(sender, instance, **kwargs):
+    invalidate_gift_list(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=GiftListItem)
+@receiver([post_save, post_delete], sender=GiftListProduct)
+@receiver([post_save, post_delete], sender=Contribution)
+def gift_list_content_changed(sender, instance, **kwargs):
+    # Items, products and contributions (totals, recent contributors) are part of both payloads
+    invalidate_gift_list(instance.gift_list_id)
+
+
+@receiver(post_save, sender=GiftList)
+def cover_image_saved(sender, instance, **kwargs):
+    if needs_renditions(instance, 'cover_image'):
+        publish_on_commit(render_cover_image, instance.pk)
+
+
+@receiver(post_save, sender=GiftListItem)
+def item_image_saved(sender, instance, **kwargs):
+    if needs_renditions(instance, 'image'):
+        publish_on_commit(render_item_image, instance.pk)
+
+
+@receiver(post_delete, sender=GiftList)
+def cover_image_deleted(sender, instance, **kwargs):
+    delete_renditions(instance, 'cover_image')
+
+
+@receiver(post_delete, sender=GiftListItem)
+def item_image_deleted(sender, instance, **kwargs):
+    delete_renditions(instance, 'image')
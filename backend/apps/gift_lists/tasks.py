@@ -0,0 +1,20 @@
+from celery import shared_task
+
+from mondodoro.images import refresh_renditions
+
+from .models import GiftList, GiftListItem
+
+COVER_SIZES = ('thumbnail', 'card', 'hero')
+ITEM_IMAGE_SIZES = ('thumbnail', 'card')
+
+
+@shared_task(ignore_result=True)
+def render_cover_image(gift_list_id):
+    """Resize a gift list cover into its thumbnail, card and hero renditions."""
+    return refresh_renditions(GiftList, gift_list_id, 'cover_image', COVER_SIZES)
+
+
+@shared_task(ignore_result=True)
+def render_item_image(item_id):
+    """Resize an item image into its thumbnail and card renditions."""
+    return refresh_renditions(GiftListItem, item_id, 'image', ITEM_IMAGE_SIZES)
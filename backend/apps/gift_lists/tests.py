@@ -1,15 +1,30 @@
 """
 Tests for the gift_lists app: CRUD, contributions, permissions, public access.
 """
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from decimal import Decimal
+from PIL import Image
 
 from apps.accounts.models import User
-from .models import GiftList, Contribution
+from mondodoro import publisher
+from .models import GiftList, GiftListItem, Contribution
+from .tasks import render_cover_image
+from .views import public_gallery_async_view, public_gift_list_async_view
 
 
 def make_user(email, role='jeweler', password='TestPass123!'):
@@ -31,6 +46,16 @@ def auth_client(user):
     return client
 
 
+def make_jpeg(size, name='photo.jpg', orientation=None):
+    image = Image.new('RGB', size, 'gold')
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
 def make_gift_list(jeweler, **kwargs):
     defaults = {
         'title': 'Lista Matrimonio',
@@ -127,6 +152,229 @@ class PublicGiftListTests(TestCase):
         response = self.client.get(f'/api/gift-lists/public/{gl.id}/')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def add_content(self, gift_list):
+        GiftListItem.objects.create(gift_list=gift_list, name='Anello', price=Decimal('200.00'))
+        Contribution.objects.create(
+            gift_list=gift_list, contributor_name='Mario', contributor_email='mario@test.com',
+            amount=Decimal('50.00'), payment_status=Contribution.PaymentStatus.COMPLETED,
+        )
+
+    def count_queries(self, client, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(path)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_list_queries_do_not_grow_with_lists(self):
+        jeweler_client = APIClient()
+        jeweler_client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.jeweler).key}')
+        self.add_content(make_gift_list(self.jeweler, show_in_public_gallery=True))
+        # The first authenticated request also records the token's last use
+        self.count_queries(jeweler_client, '/api/gift-lists/')
+        gallery = self.count_queries(self.client, '/api/gift-lists/')
+        own = self.count_queries(jeweler_client, '/api/gift-lists/')
+        for i in range(5):
+            self.add_content(make_gift_list(self.jeweler, title=f'Lista {i}', show_in_public_gallery=True))
+        self.assertEqual(self.count_queries(self.client, '/api/gift-lists/'), gallery)
+        self.assertEqual(self.count_queries(jeweler_client, '/api/gift-lists/'), own)
+
+    def test_public_detail_prefetches_recent_contributions(self):
+        gl = make_gift_list(self.jeweler)
+        self.add_content(gl)
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/gift-lists/public/{gl.id}/')
+        self.assertEqual(len(response.json()['recent_contributions']), 1)
+
+
+class PublicAsyncViewTests(TestCase):
+    """The async variants must return what the DRF views return, without sync ORM access."""
+
+    def setUp(self):
+        self.jeweler = make_user('async@test.com', role='jeweler')
+        self.gift_list = make_gift_list(self.jeweler, show_in_public_gallery=True)
+        GiftListItem.objects.create(gift_list=self.gift_list, name='Anello', price=Decimal('200.00'))
+        Contribution.objects.create(
+            gift_list=self.gift_list, contributor_name='Mario', contributor_email='mario@test.com',
+            amount=Decimal('50.00'), payment_status=Contribution.PaymentStatus.COMPLETED,
+        )
+        make_gift_list(self.jeweler, title='Nascosta', show_in_public_gallery=False)
+        self.factory = AsyncRequestFactory()
+
+    def call(self, view, path, **kwargs):
+        return async_to_sync(view)(self.factory.get(path), **kwargs)
+
+    def test_public_detail_matches_sync_view(self):
+        path = f'/api/gift-lists/public/{self.gift_list.id}/'
+        expected = APIClient().get(path).json()
+        response = self.call(public_gift_list_async_view, path, pk=self.gift_list.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), expected)
+        self.assertEqual(len(expected['recent_contributions']), 1)
+
+    def test_public_detail_not_found(self):
+        self.gift_list.is_public = False
+        self.gift_list.save()
+        response = self.call(public_gift_list_async_view, '/', pk=self.gift_list.id)
+        self.assertEqual(response.status_code, 404)
+
+    def test_gallery_matches_sync_view(self):
+        path = '/api/gift-lists/?search=Matrimonio&ordering=title'
+        expected = APIClient().get(path).json()
+        response = self.call(public_gallery_async_view, path)
+        self.assertEqual(json.loads(response.content), expected)
+        self.assertEqual(expected['count'], 1)
+
+    def test_gallery_invalid_page(self):
+        response = self.call(public_gallery_async_view, '/api/gift-lists/?page=9')
+        self.assertEqual(response.status_code, 404)
+
+    def test_credentials_fall_back_to_drf_view(self):
+        request = self.factory.get('/api/gift-lists/', headers={'Authorization': 'Token invalid'})
+        response = async_to_sync(public_gallery_async_view)(request)
+        self.assertEqual(response.status_code, 401)
+
+
+class PublicHttpCacheTests(TestCase):
+    """Public gift list and gallery responses carry version-stamped ETags."""
+
+    def setUp(self):
+        self.jeweler = make_user('etag@test.com', role='jeweler')
+        self.gift_list = make_gift_list(self.jeweler, show_in_public_gallery=True)
+        self.path = f'/api/gift-lists/public/{self.gift_list.id}/'
+        self.client = APIClient()
+
+    def test_headers(self):
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('s-maxage=2', response['Cache-Control'])
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('Authorization', response['Vary'])
+
+    def test_not_modified_without_queries(self):
+        etag = self.client.get(self.path)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.path, HTTP_IF_NONE_MATCH=f'W/{etag}')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_changes_invalidate_etag(self):
+        etag = self.client.get(self.path)['ETag']
+        gallery_etag = self.client.get('/api/gift-lists/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Contribution.objects.create(
+                gift_list=self.gift_list, contributor_name='Mario', contributor_email='mario@test.com',
+                amount=Decimal('50.00'), payment_status=Contribution.PaymentStatus.COMPLETED,
+            )
+        response = self.client.get(self.path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['total_contributions'], 50.0)
+        self.assertNotEqual(self.client.get('/api/gift-lists/')['ETag'], gallery_etag)
+
+    def test_gallery_etag_depends_on_query(self):
+        first = self.client.get('/api/gift-lists/')['ETag']
+        self.assertNotEqual(self.client.get('/api/gift-lists/?ordering=title')['ETag'], first)
+        self.assertEqual(self.client.get('/api/gift-lists/', HTTP_IF_NONE_MATCH=first).status_code, 304)
+
+    def test_authenticated_requests_bypass(self):
+        response = auth_client(self.jeweler).get('/api/gift-lists/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertNotIn('public', response.get('Cache-Control', ''))
+
+
+class ImageRenditionTests(TestCase):
+    """Uploads are validated in the request and resized into renditions by the worker."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.jeweler = make_user('images@test.com', role='jeweler')
+        self.gift_list = make_gift_list(self.jeweler)
+        self.client = auth_client(self.jeweler)
+        self.path = reverse('gift_lists:gift_list_detail', kwargs={'pk': self.gift_list.pk})
+
+    def upload_cover(self, upload):
+        with mock.patch.object(render_cover_image, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(self.path, {'cover_image': upload}, format='multipart')
+            publisher.flush()
+        return response, apply_async
+
+    def test_upload_queues_renditions(self):
+        response, apply_async = self.upload_cover(make_jpeg((2000, 1500)))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['cover_image_renditions'])
+        apply_async.assert_called_once_with((self.gift_list.pk,), retry=False)
+
+    @override_settings(IMAGE_MAX_PIXELS=1_000_000)
+    def test_too_many_pixels_rejected(self):
+        response, apply_async = self.upload_cover(make_jpeg((2000, 1500)))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cover_image', response.json())
+        apply_async.assert_not_called()
+
+    def test_unsupported_format_rejected(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (10, 10)).save(buffer, 'BMP')
+        upload = SimpleUploadedFile('photo.bmp', buffer.getvalue(), content_type='image/bmp')
+        response, _ = self.upload_cover(upload)
+        self.assertEqual(response.status_code, 400)
+
+    def test_worker_renders_sizes(self):
+        # Portrait phone photo stored sideways with an EXIF rotation
+        self.upload_cover(make_jpeg((2400, 1800), orientation=6))
+        self.assertTrue(render_cover_image(self.gift_list.pk))
+        self.assertFalse(render_cover_image(self.gift_list.pk))
+
+        renditions = self.client.get(self.path).json()['cover_image_renditions']
+        self.assertEqual(
+            {name: (size['width'], size['height']) for name, size in renditions.items() if name != 'srcset'},
+            {'thumbnail': (240, 320), 'card': (640, 853), 'hero': (1600, 2133)},
+        )
+        self.assertTrue(renditions['card']['webp'].endswith('-card.webp'))
+        self.assertTrue(renditions['srcset']['jpeg'].startswith(renditions['thumbnail']['jpeg'] + ' 240w, '))
+        public = APIClient().get(f'/api/gift-lists/public/{self.gift_list.id}/').json()
+        self.assertTrue(renditions['hero']['webp'].endswith(public['cover_image_renditions']['hero']['webp']))
+
+        self.gift_list.refresh_from_db()
+        stored = self.gift_list.cover_image_renditions['sizes']['hero']
+        with default_storage.open(stored['webp']) as f, Image.open(f) as image:
+            self.assertEqual((image.format, image.size), ('WEBP', (1600, 2133)))
+
+    def test_small_source_not_upscaled_and_replacement_cleans_up(self):
+        self.upload_cover(make_jpeg((500, 250)))
+        render_cover_image(self.gift_list.pk)
+        self.gift_list.refresh_from_db()
+        old = self.gift_list.cover_image_renditions['sizes']
+        self.assertEqual(old['hero'], old['card'])
+        self.assertEqual((old['card']['width'], old['thumbnail']['width']), (500, 240))
+        srcset = self.client.get(self.path).json()['cover_image_renditions']['srcset']['webp']
+        self.assertEqual(srcset.count('w, '), 1)
+
+        # Until the worker catches up, the old renditions are not shown for the new image
+        self.upload_cover(make_jpeg((800, 600), name='other.jpg'))
+        self.assertIsNone(self.client.get(self.path).json()['cover_image_renditions'])
+        render_cover_image(self.gift_list.pk)
+        self.assertFalse(default_storage.exists(old['hero']['jpeg']))
+        self.assertEqual(self.client.get(self.path).json()['cover_image_renditions']['hero']['width'], 800)
+
+    def test_deleting_the_list_removes_renditions(self):
+        self.upload_cover(make_jpeg((800, 600)))
+        render_cover_image(self.gift_list.pk)
+        self.gift_list.refresh_from_db()
+        paths = [entry['webp'] for entry in self.gift_list.cover_image_renditions['sizes'].values()]
+        self.assertTrue(all(default_storage.exists(path) for path in paths))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(self.path)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(any(default_storage.exists(path) for path in paths))
+
 
 class ContributionTests(TestCase):
 
@@ -214,3 +462,55 @@ class GiftListModelTests(TestCase):
             payment_status=Contribution.PaymentStatus.COMPLETED,
         )
         self.assertTrue(gl.is_completed)
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Changelist pages must not run per-row queries."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin@test.com', email='admin@test.com', password='TestPass123!',
+            first_name='Admin', last_name='User',
+        )
+        self.client.force_login(self.admin)
+
+    def _add_lists(self, count):
+        for i in range(count):
+            jeweler = make_user(f'jeweler{GiftList.objects.count()}@test.com')
+            gift_list = make_gift_list(jeweler, title=f'Lista {i}')
+            for amount in ['10.00', '20.00']:
+                Contribution.objects.create(
+                    gift_list=gift_list,
+                    contributor_name='Anna',
+                    contributor_email=f'anna{amount}@test.com',
+                    amount=Decimal(amount),
+                    payment_status=Contribution.PaymentStatus.COMPLETED,
+                )
+
+    def _query_count(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def _assert_constant_queries(self, url):
+        self._add_lists(2)
+        small = self._query_count(url)
+        self._add_lists(20)
+        self.assertEqual(self._query_count(url), small)
+
+    def test_gift_list_changelist(self):
+        url = reverse('admin:gift_lists_giftlist_changelist')
+        self._assert_constant_queries(url)
+        response = self.client.get(url)
+        self.assertContains(response, '€30.00')
+
+    def test_contribution_changelist(self):
+        self._assert_constant_queries(reverse('admin:gift_lists_contribution_changelist'))
+
+    def test_gift_list_totals_annotation(self):
+        self._add_lists(1)
+        gift_list = GiftList.with_totals().get()
+        with self.assertNumQueries(0):
+            self.assertEqual(gift_list.total_contributions, Decimal('30.00'))
+            self.assertEqual(gift_list.contributors_count, 2)
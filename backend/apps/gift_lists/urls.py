@@ -1,15 +1,23 @@
 from django.urls import path
+
+from mondodoro.async_views import public_view
+from mondodoro.http_cache import public_cache
 from . import views
+from .cache import gallery_cache_scopes, gift_list_cache_scopes
 
 app_name = 'gift_lists'
 
 urlpatterns = [
     # Gift Lists
-    path('', views.GiftListListCreateView.as_view(), name='gift_list_list_create'),
+    path('', public_cache(gallery_cache_scopes)(
+        public_view(views.GiftListListCreateView.as_view(), views.public_gallery_async_view)),
+        name='gift_list_list_create'),
     path('<uuid:pk>/', views.GiftListDetailView.as_view(), name='gift_list_detail'),
     
     # Public gift list view
-    path('public/<uuid:pk>/', views.public_gift_list_view, name='public_detail'),
+    path('public/<uuid:pk>/', public_cache(gift_list_cache_scopes)(
+        public_view(views.public_gift_list_view, views.public_gift_list_async_view)),
+        name='public_detail'),
     
     # Gift List Items
     path('<uuid:gift_list_id>/items/', views.GiftListItemListCreateView.as_view(), name='item_list_create'),
@@ -1,19 +1,53 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from drf_spectacular.utils import extend_schema, extend_schema_view
+from mondodoro.async_views import async_variant, json_response, not_found
+from mondodoro.instrumentation import query_budget
+from mondodoro.routers import replica_reads
 from .models import GiftList, GiftListItem, Contribution
 from .serializers import (
+    RECENT_CONTRIBUTIONS,
     GiftListSerializer, GiftListCreateSerializer, GiftListPublicSerializer,
     GiftListItemSerializer, ContributionSerializer, ContributionCreateSerializer
 )
 from apps.accounts.models import User
 
 
+def with_serializer_data(queryset):
+    """Load everything GiftListSerializer reads in a fixed number of queries."""
+    return GiftList.with_totals(queryset).select_related('jeweler').prefetch_related(
+        'items', 'products', 'contributions__product',
+    )
+
+
+def public_gallery_queryset():
+    return GiftList.objects.filter(
+        is_public=True,
+        show_in_public_gallery=True,
+        status=GiftList.Status.ACTIVE
+    )
+
+
+def public_gift_list_queryset():
+    """Active public lists with everything GiftListPublicSerializer reads."""
+    recent = Contribution.objects.filter(
+        payment_status=Contribution.PaymentStatus.COMPLETED
+    ).order_by('-completed_at')[:RECENT_CONTRIBUTIONS]
+    return GiftList.with_totals(
+        GiftList.objects.filter(is_public=True, status=GiftList.Status.ACTIVE)
+    ).select_related('jeweler').prefetch_related(
+        'items', 'products',
+        Prefetch('contributions', queryset=recent, to_attr='recent_completed_contributions'),
+    )
+
+
 class IsJewelerOrReadOnly(permissions.BasePermission):
     """
     Custom permission to only allow jewelers to create/edit gift lists
@@ -36,6 +70,8 @@ class IsJewelerOrReadOnly(permissions.BasePermission):
         return obj.jeweler == request.user
 
 
+@replica_reads
+@query_budget(queries=14)
 @extend_schema_view(
     get=extend_schema(
         summary="List gift lists",
@@ -69,14 +105,10 @@ class GiftListListCreateView(generics.ListCreateAPIView):
         
         if user.is_authenticated and user.role == User.UserRole.JEWELER:
             # Jewelers see their own gift lists
-            return GiftList.objects.filter(jeweler=user)
+            return with_serializer_data(GiftList.objects.filter(jeweler=user))
         else:
             # Others see only public, active gift lists that are shown in public gallery
-            return GiftList.objects.filter(
-                is_public=True,
-                show_in_public_gallery=True,
-                status=GiftList.Status.ACTIVE
-            )
+            return with_serializer_data(public_gallery_queryset())
     
     def perform_create(self, serializer):
         serializer.save(jeweler=self.request.user)
@@ -94,6 +126,7 @@ class GiftListListCreateView(generics.ListCreateAPIView):
         return Response(output_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
+@query_budget(queries=14)
 @extend_schema_view(
     get=extend_schema(
         summary="Get gift list details",
@@ -138,6 +171,8 @@ class GiftListDetailView(generics.RetrieveUpdateDestroyAPIView):
             )
 
 
+@replica_reads
+@query_budget(queries=10)
 @extend_schema(
     summary="Get public gift list",
     description="Get public view of a gift list (accessible by anyone)",
@@ -149,17 +184,38 @@ def public_gift_list_view(request, pk):
     """
     Public view of a gift list
     """
-    gift_list = get_object_or_404(
-        GiftList,
-        pk=pk,
-        is_public=True,
-        status=GiftList.Status.ACTIVE
-    )
+    gift_list = get_object_or_404(public_gift_list_queryset(), pk=pk)
     
     serializer = GiftListPublicSerializer(gift_list)
     return Response(serializer.data)
 
 
+@async_variant(public_gift_list_view)
+async def public_gift_list_async_view(request, pk):
+    """Async variant of public_gift_list_view for the ASGI serving mode."""
+    gift_list = await public_gift_list_queryset().filter(pk=pk).afirst()
+    if gift_list is None:
+        return not_found()
+    return json_response(GiftListPublicSerializer(gift_list).data)
+
+
+@async_variant(GiftListListCreateView.as_view())
+async def public_gallery_async_view(request):
+    """Async variant of the anonymous gift list listing (the public gallery at /lists)."""
+    view = GiftListListCreateView(request=Request(request), args=(), kwargs={}, format_kwarg=None)
+    try:
+        queryset = view.filter_queryset(with_serializer_data(public_gallery_queryset()))
+        page = await view.paginator.apaginate_queryset(queryset, view.request, view=view)
+    except APIException as exc:
+        # Same body as DRF's exception handler
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return json_response(data, status=exc.status_code)
+    if page is None:
+        return json_response(GiftListSerializer([obj async for obj in queryset], many=True).data)
+    data = GiftListSerializer(page, many=True).data
+    return json_response(view.paginator.get_paginated_response(data).data)
+
+
 @extend_schema_view(
     get=extend_schema(
         summary="List gift list items",
@@ -231,6 +287,7 @@ class GiftListItemDetailView(generics.RetrieveUpdateDestroyAPIView):
         return obj
 
 
+@query_budget(queries=8)
 @extend_schema_view(
     get=extend_schema(
         summary="List contributions",
@@ -0,0 +1,31 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from mondodoro.pagination import EstimatedCountAdminMixin
+
+from .models import OutboundEmail, DigestRun
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
+    list_display = ['to_email', 'template', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at']
+    list_filter = ['status', 'template']
+    search_fields = ['to_email', 'subject']
+    readonly_fields = ['dedupe_key', 'attempts', 'last_error', 'sent_at', 'created_at', 'updated_at']
+    ordering = ['-created_at']
+    actions = ['retry_now']
+
+    @admin.action(description='Riprova invio ora')
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboundEmail.Status.SENT).update(
+            status=OutboundEmail.Status.PENDING,
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f'{updated} email rimesse in coda.')
+
+
+@admin.register(DigestRun)
+class DigestRunAdmin(admin.ModelAdmin):
+    list_display = ['window_start', 'window_end', 'jewelers_notified', 'created_at']
+    readonly_fields = ['window_start', 'window_end', 'jewelers_notified', 'created_at']
+    ordering = ['-window_end']
@@ -0,0 +1,103 @@
+"""
+Jeweler activity digests.
+
+Instead of one email per contribution or booking, `send_jeweler_digests`
+sends each jeweler a single summary per NOTIFICATIONS_DIGEST_MINUTES window.
+Totals come from two grouped queries (contributions per gift list, bookings
+per event) covering every jeweler at once.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.events.models import Booking
+from apps.gift_lists.models import Contribution
+
+from .models import DigestRun
+from .outbox import queue_email
+
+
+def contribution_totals(since, until):
+    """Completed contributions per gift list in (since, until]."""
+    return (
+        Contribution.objects
+        .filter(
+            payment_status=Contribution.PaymentStatus.COMPLETED,
+            completed_at__gt=since,
+            completed_at__lte=until,
+        )
+        .values('gift_list__jeweler_id', 'gift_list_id', 'gift_list__title')
+        .annotate(count=Count('id'), total=Sum('amount'))
+        .order_by('gift_list__jeweler_id', '-total')
+    )
+
+
+def booking_totals(since, until):
+    """
+    Confirmed bookings per event made in (since, until]: paid ones and
+    in-person ones awaiting payment. Online bookings whose checkout is still
+    open or was abandoned are left out.
+    """
+    confirmed = Q(payment_status=Booking.PaymentStatus.PAID) | Q(
+        payment_status=Booking.PaymentStatus.PENDING, payment_method=Booking.PaymentMethod.IN_PERSON,
+    )
+    return (
+        Booking.objects
+        .filter(confirmed, created_at__gt=since, created_at__lte=until)
+        .values('slot__event__jeweler_id', 'slot__event_id', 'slot__event__title', 'slot__event__date')
+        .annotate(count=Count('id'))
+        .order_by('slot__event__jeweler_id', 'slot__event__date')
+    )
+
+
+def build_digests(since, until):
+    """Return {jeweler_id: {'gift_lists': [...], 'events': [...]}} for jewelers with activity."""
+    digests = defaultdict(lambda: {'gift_lists': [], 'events': []})
+    for row in contribution_totals(since, until):
+        digests[row['gift_list__jeweler_id']]['gift_lists'].append({
+            'title': row['gift_list__title'],
+            'count': row['count'],
+            'total': row['total'],
+        })
+    for row in booking_totals(since, until):
+        digests[row['slot__event__jeweler_id']]['events'].append({
+            'title': row['slot__event__title'],
+            'date': row['slot__event__date'],
+            'count': row['count'],
+        })
+    return digests
+
+
+def send_jeweler_digests(now=None):
+    """Queue one digest per jeweler for the window ending now. Returns the number queued."""
+    now = now or timezone.now()
+    window = timedelta(minutes=settings.NOTIFICATIONS_DIGEST_MINUTES)
+
+    with transaction.atomic():
+        last = DigestRun.objects.select_for_update().order_by('-window_end').first()
+        since = last.window_end if last else now - window
+        if now - since < window:
+            return 0
+
+        digests = build_digests(since, now)
+        jewelers = User.objects.in_bulk(list(digests))
+        for jeweler_id, digest in digests.items():
+            jeweler = jewelers[jeweler_id]
+            queue_email('jeweler_digest', jeweler.email, {
+                'name': jeweler.first_name or jeweler.business_name,
+                'since': since,
+                'until': now,
+                'gift_lists': digest['gift_lists'],
+                'contribution_count': sum(item['count'] for item in digest['gift_lists']),
+                'contribution_total': sum(item['total'] for item in digest['gift_lists']),
+                'events': digest['events'],
+                'booking_count': sum(item['count'] for item in digest['events']),
+            }, dedupe_key=f'jeweler-digest:{jeweler_id}:{now.isoformat()}')
+
+        DigestRun.objects.create(window_start=since, window_end=now, jewelers_notified=len(digests))
+    return len(digests)
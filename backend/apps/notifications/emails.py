@@ -0,0 +1,60 @@
+"""
+Transactional emails. Each helper queues one templated message in the outbox.
+"""
+from django.conf import settings
+
+from .outbox import queue_email
+
+
+def queue_password_reset(user, reset_url):
+    return queue_email('password_reset', user.email, {
+        'first_name': user.first_name,
+        'reset_url': reset_url,
+    })
+
+
+def queue_contribution_received(contribution):
+    """Receipt for the contributor once the payment has completed."""
+    return queue_email('contribution_received', contribution.contributor_email, {
+        'contributor_name': contribution.contributor_name,
+        'gift_list_title': contribution.gift_list.title,
+        'amount': contribution.amount,
+        'message': contribution.contributor_message,
+        'completed_at': contribution.completed_at or contribution.updated_at,
+        'reference': contribution.id,
+    }, dedupe_key=f'contribution-received:{contribution.id}')
+
+
+def _booking_payment_label(booking):
+    if booking.slot.is_free:
+        return None
+    if booking.payment_status == booking.PaymentStatus.PAID:
+        return 'Pagato'
+    return 'Da saldare in negozio'
+
+
+def queue_booking_confirmation(booking):
+    slot = booking.slot
+    event = slot.event
+    return queue_email('booking_confirmation', booking.guest_email, {
+        'guest_name': booking.guest_name,
+        'event_title': event.title,
+        'event_date': event.date,
+        'start_time': slot.start_time,
+        'location': event.location,
+        'price': slot.price if not slot.is_free else None,
+        'payment': _booking_payment_label(booking),
+        'reference': booking.id,
+    }, dedupe_key=f'booking-confirmation:{booking.id}')
+
+
+def queue_waitlist_promoted(entry):
+    event = entry.slot.event
+    return queue_email('waitlist_promoted', entry.guest_email, {
+        'guest_name': entry.guest_name,
+        'event_title': event.title,
+        'event_date': event.date,
+        'start_time': entry.slot.start_time,
+        'hold_expires_at': entry.hold_expires_at,
+        'book_url': f"{settings.FRONTEND_URL}/events/{event.id}/book?slot={entry.slot_id}",
+    }, dedupe_key=f'waitlist-promoted:{entry.id}')
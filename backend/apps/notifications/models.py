@@ -0,0 +1,70 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboundEmail(models.Model):
+    """
+    Email waiting to be delivered by the outbox worker.
+
+    Messages are rendered when queued, so the worker only needs the row to
+    send them. Failed deliveries are retried with exponential backoff until
+    EMAIL_OUTBOX_MAX_ATTEMPTS is reached.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('In Attesa')
+        SENDING = 'sending', _('In Invio')
+        SENT = 'sent', _('Inviata')
+        FAILED = 'failed', _('Fallita')
+
+    template = models.CharField(max_length=100)
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    # Optional idempotency key: queueing the same key twice sends one email
+    dedupe_key = models.CharField(max_length=255, unique=True, blank=True, null=True)
+
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+        verbose_name = _('Outbound Email')
+        verbose_name_plural = _('Outbound Emails')
+
+    def __str__(self):
+        return f"{self.template} → {self.to_email} ({self.get_status_display()})"
+
+
+class DigestRun(models.Model):
+    """
+    One jeweler digest window. Each run summarizes activity in
+    (window_start, window_end], and the next run starts where this one ended,
+    so no contribution or booking is reported twice or skipped.
+    """
+
+    window_start = models.DateTimeField()
+    window_end = models.DateTimeField(unique=True)
+    jewelers_notified = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-window_end']
+        verbose_name = _('Digest Run')
+        verbose_name_plural = _('Digest Runs')
+
+    def __str__(self):
+        return f"Digest {self.window_start:%d/%m/%Y %H:%M} – {self.window_end:%H:%M} ({self.jewelers_notified})"
@@ -0,0 +1,164 @@
+"""
+Email outbox.
+
+Request handlers call `queue_email`, which renders the message and stores an
+`OutboundEmail` row; nothing talks to the mail server inside the request.
+The `send_outbox` Celery task, run periodically by beat, delivers pending
+rows in batches over a single SMTP connection. Queueing also kicks it after
+commit through mondodoro/publisher.py, which never makes the request wait
+on the broker; a lost kick only delays delivery until the next beat run.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from mondodoro.publisher import publish_on_commit
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# Rows stuck in SENDING longer than this belong to a worker that died mid-batch
+STALE_SENDING_AFTER = timedelta(minutes=10)
+
+
+def render_email(template, context):
+    """Render `notifications/<template>_subject.txt` and `notifications/<template>.txt`."""
+    context = {'frontend_url': settings.FRONTEND_URL, **context}
+    subject = render_to_string(f'notifications/{template}_subject.txt', context)
+    body = render_to_string(f'notifications/{template}.txt', context)
+    # Subjects must be a single line
+    return ' '.join(subject.split()), body
+
+
+def queue_email(template, to, context, dedupe_key=None):
+    """
+    Render and queue an email for background delivery. Returns the outbox row.
+
+    With a `dedupe_key`, queueing the same message again (e.g. a webhook and
+    a client confirmation both completing a payment) returns the existing row.
+    """
+    if dedupe_key:
+        existing = OutboundEmail.objects.filter(dedupe_key=dedupe_key).first()
+        if existing is not None:
+            return existing
+
+    subject, body = render_email(template, context)
+    try:
+        with transaction.atomic():
+            email = OutboundEmail.objects.create(
+                template=template,
+                to_email=to,
+                subject=subject,
+                body=body,
+                dedupe_key=dedupe_key,
+            )
+    except IntegrityError:
+        # Lost a race with a concurrent request queueing the same key
+        return OutboundEmail.objects.get(dedupe_key=dedupe_key)
+
+    from .tasks import send_outbox
+    publish_on_commit(send_outbox)
+    return email
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2×base, 4×base… capped at one day."""
+    base = settings.EMAIL_OUTBOX_RETRY_BACKOFF
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 24 * 60 * 60))
+
+
+def claim_batch(limit, now=None):
+    """Mark up to `limit` due emails as SENDING and return them."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:limit]
+        )
+        OutboundEmail.objects.filter(id__in=ids).update(status=OutboundEmail.Status.SENDING, updated_at=now)
+    return list(OutboundEmail.objects.filter(id__in=ids).order_by('next_attempt_at'))
+
+
+def requeue_stale(now=None):
+    now = now or timezone.now()
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.Status.SENDING,
+        updated_at__lt=now - STALE_SENDING_AFTER,
+    ).update(status=OutboundEmail.Status.PENDING, updated_at=now)
+
+
+def _mark_failed(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboundEmail.Status.FAILED
+        logger.error("Giving up on email %s to %s: %s", email.id, email.to_email, error)
+    else:
+        email.status = OutboundEmail.Status.PENDING
+        email.next_attempt_at = now + retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'updated_at'])
+
+
+def send_batch(emails, connection=None):
+    """Send `emails` over one connection. Returns the number delivered."""
+    connection = connection or get_connection(fail_silently=False)
+    sent = 0
+    now = timezone.now()
+    try:
+        connection.open()
+    except Exception as e:
+        for email in emails:
+            _mark_failed(email, e, now)
+        return 0
+
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email.to_email],
+                connection=connection,
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                _mark_failed(email, e, now)
+                # The server may have dropped us; start the next message on a fresh connection
+                connection.close()
+                try:
+                    connection.open()
+                except Exception:
+                    pass  # send_messages() opens on demand
+                continue
+            email.status = OutboundEmail.Status.SENT
+            email.attempts += 1
+            email.sent_at = timezone.now()
+            email.last_error = ''
+            email.save(update_fields=['status', 'attempts', 'sent_at', 'last_error', 'updated_at'])
+            sent += 1
+    finally:
+        connection.close()
+    return sent
+
+
+def deliver_pending(batch_size=None, max_batches=20):
+    """Deliver due outbox emails batch by batch. Returns the number delivered."""
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    requeue_stale()
+    sent = 0
+    for _ in range(max_batches):
+        batch = claim_batch(batch_size)
+        if not batch:
+            break
+        sent += send_batch(batch)
+    return sent
@@ -0,0 +1,16 @@
+from celery import shared_task
+
+from .digests import send_jeweler_digests
+from .outbox import deliver_pending
+
+
+@shared_task(ignore_result=True)
+def send_outbox():
+    """Deliver queued emails; failures are rescheduled with backoff."""
+    return deliver_pending()
+
+
+@shared_task
+def send_digests():
+    """Queue jeweler activity digests once per NOTIFICATIONS_DIGEST_MINUTES window."""
+    return send_jeweler_digests()
@@ -0,0 +1,237 @@
+"""
+Tests for the notifications app: email outbox queueing and batched delivery,
+jeweler digests.
+"""
+import time as clock
+from datetime import date, time, timedelta
+from decimal import Decimal
+from smtplib import SMTPServerDisconnected
+from unittest import mock
+
+from kombu.exceptions import OperationalError
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend as LocMemBackend
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from mondodoro import publisher
+
+from apps.accounts.models import User
+from apps.events.models import Event, EventSlot, Booking
+from apps.gift_lists.models import GiftList, Contribution
+from .digests import send_jeweler_digests
+from .models import OutboundEmail, DigestRun
+from .outbox import queue_email, deliver_pending
+from .tasks import send_outbox
+
+
+def make_user(email, role='jeweler', password='TestPass123!'):
+    return User.objects.create_user(
+        username=email.split('@')[0],
+        email=email,
+        password=password,
+        first_name='Test',
+        last_name='User',
+        role=role,
+        business_name='Gioielleria Test' if role == 'jeweler' else None,
+    )
+
+
+class CountingBackend(LocMemBackend):
+    """Locmem backend that records connection opens and can fail on demand."""
+    opens = 0
+    fail_for = set()
+
+    def open(self):
+        CountingBackend.opens += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & CountingBackend.fail_for:
+                raise SMTPServerDisconnected('Connection unexpectedly closed')
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='apps.notifications.tests.CountingBackend')
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        CountingBackend.opens = 0
+        CountingBackend.fail_for = set()
+
+    def _queue(self, to='ospite@test.com', **kwargs):
+        return queue_email('password_reset', to, {
+            'first_name': 'Anna',
+            'reset_url': 'https://example.com/reset',
+        }, **kwargs)
+
+    def test_queue_renders_without_sending(self):
+        email = self._queue()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(email.status, OutboundEmail.Status.PENDING)
+        self.assertEqual(email.subject, 'Reset della tua password – ListDreams')
+        self.assertIn('Ciao Anna', email.body)
+        self.assertIn('https://example.com/reset', email.body)
+
+    def test_batch_reuses_one_connection(self):
+        for i in range(5):
+            self._queue(to=f'ospite{i}@test.com')
+        self.assertEqual(deliver_pending(), 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingBackend.opens, 1)
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.Status.SENT).exists())
+
+    def test_failure_is_retried_with_backoff(self):
+        CountingBackend.fail_for = {'down@test.com'}
+        failing = self._queue(to='down@test.com')
+        self._queue(to='ok@test.com')
+
+        self.assertEqual(deliver_pending(), 1)
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, OutboundEmail.Status.PENDING)
+        self.assertEqual(failing.attempts, 1)
+        self.assertGreater(failing.next_attempt_at, timezone.now() + timedelta(seconds=30))
+        self.assertIn('unexpectedly closed', failing.last_error)
+
+        # Not due yet
+        self.assertEqual(deliver_pending(), 0)
+
+        CountingBackend.fail_for = set()
+        OutboundEmail.objects.filter(pk=failing.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_pending(), 1)
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, OutboundEmail.Status.SENT)
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_gives_up_after_max_attempts(self):
+        CountingBackend.fail_for = {'down@test.com'}
+        email = self._queue(to='down@test.com')
+        deliver_pending()
+        OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        deliver_pending()
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.Status.FAILED)
+        self.assertEqual(email.attempts, 2)
+
+    def test_dedupe_key_queues_once(self):
+        first = self._queue(dedupe_key='reset:1')
+        second = self._queue(dedupe_key='reset:1')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+    def test_stale_sending_rows_are_requeued(self):
+        email = self._queue()
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            status=OutboundEmail.Status.SENDING,
+            updated_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(deliver_pending(), 1)
+
+    def test_broker_down_does_not_block_request(self):
+        make_user('reset@test.com')
+
+        def unreachable_broker(*args, **kwargs):
+            clock.sleep(1)
+            raise OperationalError('Error 111 connecting to redis:6379. Connection refused.')
+
+        with mock.patch.object(send_outbox, 'apply_async', side_effect=unreachable_broker) as apply_async:
+            started = clock.monotonic()
+            with self.captureOnCommitCallbacks(execute=True):
+                response = APIClient().post(
+                    reverse('accounts:forgot_password'), {'email': 'reset@test.com'}, format='json',
+                )
+            elapsed = clock.monotonic() - started
+            with self.assertLogs('mondodoro.publisher', 'WARNING'):
+                publisher.flush()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(elapsed, 0.5)
+        apply_async.assert_called_once_with((), retry=False)
+        # Beat delivers it on its next run
+        self.assertEqual(deliver_pending(), 1)
+
+
+class JewelerDigestTests(TestCase):
+
+    def setUp(self):
+        # Just ahead of the rows created below, so they all fall in the window
+        self.now = timezone.now() + timedelta(seconds=1)
+        self.jeweler = make_user('digest@test.com')
+        self.quiet_jeweler = make_user('quiet@test.com')
+        self.gift_list = GiftList.objects.create(
+            jeweler=self.jeweler,
+            title='Lista Nozze',
+            target_amount=Decimal('1000.00'),
+            status=GiftList.Status.ACTIVE,
+        )
+        for amount in ['50.00', '25.00', '25.00']:
+            self._contribution(amount)
+        self._contribution('80.00', status=Contribution.PaymentStatus.PENDING)
+
+        event = Event.objects.create(
+            jeweler=self.jeweler, title='Serata Perle', date=date(2026, 12, 1), status=Event.Status.ACTIVE,
+        )
+        slot = EventSlot.objects.create(event=event, start_time=time(18, 0), max_attendees=10)
+        for i in range(2):
+            Booking.objects.create(
+                slot=slot, guest_name=f'Ospite {i}', guest_email=f'o{i}@test.com',
+                payment_method=Booking.PaymentMethod.IN_PERSON,
+            )
+        DigestRun.objects.create(window_start=self.now - timedelta(hours=2), window_end=self.now - timedelta(hours=1))
+
+    def _contribution(self, amount, status=Contribution.PaymentStatus.COMPLETED):
+        return Contribution.objects.create(
+            gift_list=self.gift_list,
+            contributor_name='Anna',
+            contributor_email='anna@test.com',
+            amount=Decimal(amount),
+            payment_status=status,
+            completed_at=self.now - timedelta(minutes=10) if status == Contribution.PaymentStatus.COMPLETED else None,
+        )
+
+    def test_one_digest_per_jeweler_with_activity(self):
+        self.assertEqual(send_jeweler_digests(now=self.now), 1)
+        digest = OutboundEmail.objects.get(template='jeweler_digest')
+        self.assertEqual(digest.to_email, 'digest@test.com')
+        self.assertIn('3 contributi, 2 prenotazioni', digest.subject)
+        self.assertIn('Lista Nozze: 3 contributi, € 100,00', digest.body)
+        self.assertIn('Serata Perle (01/12/2026): 2 prenotazioni', digest.body)
+
+    def test_unpaid_online_bookings_not_counted(self):
+        slot = EventSlot.objects.get()
+        for status in (Booking.PaymentStatus.PENDING, Booking.PaymentStatus.PAID, Booking.PaymentStatus.CANCELLED):
+            Booking.objects.create(
+                slot=slot, guest_name='Online', guest_email='online@test.com',
+                payment_method=Booking.PaymentMethod.ONLINE, payment_status=status,
+            )
+        send_jeweler_digests(now=self.now)
+        digest = OutboundEmail.objects.get(template='jeweler_digest')
+        # Two in-person bookings plus the paid online one; the abandoned checkout is left out
+        self.assertIn('Serata Perle (01/12/2026): 3 prenotazioni', digest.body)
+
+    def test_summary_uses_grouped_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            send_jeweler_digests(now=self.now)
+        sql = [query['sql'] for query in queries.captured_queries]
+        self.assertEqual(len([q for q in sql if 'FROM "gift_lists_contribution"' in q]), 1)
+        self.assertEqual(len([q for q in sql if 'FROM "events_booking"' in q]), 1)
+
+    def test_waits_for_full_window(self):
+        send_jeweler_digests(now=self.now)
+        self._contribution('10.00')
+        self.assertEqual(send_jeweler_digests(now=self.now + timedelta(minutes=5)), 0)
+        self.assertEqual(OutboundEmail.objects.filter(template='jeweler_digest').count(), 1)
+
+    def test_next_window_starts_where_previous_ended(self):
+        send_jeweler_digests(now=self.now)
+        later = self.now + timedelta(hours=1)
+        self.assertEqual(send_jeweler_digests(now=later), 0)
+        run = DigestRun.objects.first()
+        self.assertEqual(run.window_start, self.now)
+        self.assertEqual(run.window_end, later)
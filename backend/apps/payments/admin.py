@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
+from mondodoro.pagination import EstimatedCountAdminMixin
 from .models import StripeAccount, PaymentIntent, WebhookEvent, PlatformSettings
 
 
@@ -19,6 +20,7 @@ class StripeAccountAdmin(admin.ModelAdmin):
         'account_status', 'onboarding_completed', 'charges_enabled',
         'payouts_enabled', 'country', 'created_at'
     )
+    list_select_related = ('jeweler',)
     search_fields = (
         'jeweler__email', 'jeweler__business_name', 'stripe_account_id'
     )
@@ -44,7 +46,7 @@ class StripeAccountAdmin(admin.ModelAdmin):
 
 
 @admin.register(PaymentIntent)
-class PaymentIntentAdmin(admin.ModelAdmin):
+class PaymentIntentAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """
     Admin interface for Payment Intents
     """
@@ -54,6 +56,7 @@ class PaymentIntentAdmin(admin.ModelAdmin):
         'currency', 'status', 'application_fee_amount', 'created_at'
     )
     list_filter = ('status', 'currency', 'created_at')
+    list_select_related = ('contribution__gift_list',)
     search_fields = (
         'stripe_payment_intent_id', 'contribution__contributor_email',
         'contribution__gift_list__title'
@@ -86,7 +89,7 @@ class PaymentIntentAdmin(admin.ModelAdmin):
 
 
 @admin.register(WebhookEvent)
-class WebhookEventAdmin(admin.ModelAdmin):
+class WebhookEventAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """
     Admin interface for Webhook Events
     """
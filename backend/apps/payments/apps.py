@@ -4,4 +4,11 @@ from django.apps import AppConfig
 class PaymentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.payments'
-    verbose_name = 'Payments'
\ No newline at end of file
+    verbose_name = 'Payments'
+
+    def ready(self):
+        import stripe
+        from django.conf import settings
+
+        if settings.STRIPE_API_BASE:
+            stripe.api_base = settings.STRIPE_API_BASE
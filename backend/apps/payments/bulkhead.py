@@ -0,0 +1,105 @@
+"""
+Deployment-wide limit on blocking Stripe API calls.
+
+Request-path Stripe calls go through `call_stripe()`. Each call holds one of
+STRIPE_MAX_CONCURRENT_CALLS slots in the shared cache (CACHE_URL, Redis in
+production) while it runs, so the limit covers every gunicorn worker
+together. A request that cannot get a slot within STRIPE_BULKHEAD_WAIT
+seconds fails with `StripeUnavailable`, which views answer with 503 and
+Retry-After.
+
+Gunicorn runs GUNICORN_WORKERS sync workers with GUNICORN_THREADS threads
+each (gunicorn.conf.py), one request per thread. Keep the limit below
+workers x threads: a checkout spike then queues for Stripe instead of
+taking every thread that dashboard and public traffic need. Without
+CACHE_URL the cache, and so the limit, is per process.
+
+A slot expires after STRIPE_BULKHEAD_LEASE seconds, so a worker killed
+mid-call does not keep it. Calls made inside a transaction are refused: row
+locks held across a slow Stripe call would block every other request
+touching the rows.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.transaction import TransactionManagementError
+from rest_framework import status
+from rest_framework.response import Response
+
+from mondodoro.metrics import STRIPE_BULKHEAD_REJECTIONS, STRIPE_IN_FLIGHT
+
+RETRY_AFTER_SECONDS = 5
+SLOT_KEY = 'stripe-bulkhead:slot:{}'
+# Seconds between attempts while every slot is taken
+POLL_INTERVAL = 0.05
+
+
+class StripeUnavailable(Exception):
+    """No Stripe call slot freed up in time."""
+
+
+def ensure_no_transaction():
+    for connection in connections.all(initialized_only=True):
+        # The test case's own wrapping transaction does not count
+        if any(not block._from_testcase for block in connection.atomic_blocks):
+            raise TransactionManagementError(
+                f"Stripe calls must not run inside a transaction (database '{connection.alias}')."
+            )
+
+
+class StripeBulkhead:
+
+    def __init__(self, size, wait, lease):
+        self.size = size
+        self.wait = wait
+        self.lease = lease
+
+    def _acquire(self):
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait
+        while True:
+            for slot in range(self.size):
+                key = SLOT_KEY.format(slot)
+                if cache.add(key, token, self.lease):
+                    return key, token
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(POLL_INTERVAL, remaining))
+
+    def _release(self, key, token):
+        # After an expired lease the slot may belong to another call by now
+        if cache.get(key) == token:
+            cache.delete(key)
+
+    def call(self, func, *args, **kwargs):
+        ensure_no_transaction()
+        slot = self._acquire()
+        if slot is None:
+            STRIPE_BULKHEAD_REJECTIONS.inc()
+            raise StripeUnavailable()
+        STRIPE_IN_FLIGHT.inc()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            STRIPE_IN_FLIGHT.dec()
+            self._release(*slot)
+
+
+def call_stripe(func, *args, **kwargs):
+    """Run `func(*args, **kwargs)` (a Stripe API call) in one of the deployment's Stripe slots."""
+    bulkhead = StripeBulkhead(
+        settings.STRIPE_MAX_CONCURRENT_CALLS, settings.STRIPE_BULKHEAD_WAIT, settings.STRIPE_BULKHEAD_LEASE,
+    )
+    return bulkhead.call(func, *args, **kwargs)
+
+
+def stripe_unavailable_response():
+    return Response(
+        {'error': 'Il servizio di pagamento è momentaneamente sovraccarico. Riprova tra qualche secondo.'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': str(RETRY_AFTER_SECONDS)},
+    )
@@ -3,8 +3,10 @@ import stripe.checkout
 from decimal import Decimal
 from django.conf import settings
 from django.utils import timezone
+from .bulkhead import call_stripe
 from .models import StripeAccount, PaymentIntent, PlatformSettings
 from apps.gift_lists.models import Contribution
+from apps.notifications.emails import queue_contribution_received
 
 # Configure Stripe - moved to function level to ensure settings are loaded
 
@@ -14,7 +16,8 @@ def create_stripe_account(user):
     # Configure Stripe API key
     stripe.api_key = settings.STRIPE_SECRET_KEY
     
-    account = stripe.Account.create(
+    account = call_stripe(
+        stripe.Account.create,
         type='express',
         country='IT',
         email=user.email,
@@ -42,7 +45,8 @@ def create_onboarding_link(account_id, refresh_url, return_url):
     # Configure Stripe API key
     stripe.api_key = settings.STRIPE_SECRET_KEY
 
-    account_link = stripe.AccountLink.create(
+    account_link = call_stripe(
+        stripe.AccountLink.create,
         account=account_id,
         refresh_url=refresh_url,
         return_url=return_url,
@@ -126,7 +130,7 @@ def create_stripe_checkout_session(contribution):
         }
     
     # Create Stripe Checkout session
-    checkout_session = stripe.checkout.Session.create(**checkout_params)
+    checkout_session = call_stripe(stripe.checkout.Session.create, **checkout_params)
     
     # Save checkout session to database (update if exists, create if not)
     payment_intent_obj, created = PaymentIntent.objects.update_or_create(
@@ -151,6 +155,14 @@ def create_stripe_checkout_session(contribution):
     return payment_intent_obj
 
 
+def complete_contribution(contribution):
+    """Mark a contribution as paid and queue the contributor's receipt (sent once)."""
+    contribution.payment_status = Contribution.PaymentStatus.COMPLETED
+    contribution.completed_at = timezone.now()
+    contribution.save()
+    queue_contribution_received(contribution)
+
+
 def handle_payment_succeeded(payment_intent_data):
     """Handle successful payment webhook"""
     try:
@@ -163,10 +175,7 @@ def handle_payment_succeeded(payment_intent_data):
         pi_obj.save()
         
         # Update contribution
-        contribution = pi_obj.contribution
-        contribution.payment_status = Contribution.PaymentStatus.COMPLETED
-        contribution.completed_at = timezone.now()
-        contribution.save()
+        complete_contribution(pi_obj.contribution)
         
         return True
         
@@ -216,10 +225,7 @@ def handle_checkout_session_completed(session_data):
         pi_obj.save()
         
         # Update contribution
-        contribution = pi_obj.contribution
-        contribution.payment_status = Contribution.PaymentStatus.COMPLETED
-        contribution.completed_at = timezone.now()
-        contribution.save()
+        complete_contribution(pi_obj.contribution)
 
         return True
 
@@ -3,12 +3,16 @@ Tests for the payments app: Stripe checkout, webhooks, and utility functions.
 All Stripe API calls are mocked — no real network requests are made.
 """
 import json
+import threading
 import uuid
 from decimal import Decimal
 from unittest.mock import patch, MagicMock
 from datetime import timedelta
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import transaction
+from django.db.transaction import TransactionManagementError
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -16,6 +20,8 @@ from rest_framework.authtoken.models import Token
 
 from apps.accounts.models import User
 from apps.gift_lists.models import GiftList, Contribution
+from apps.notifications.models import OutboundEmail
+from .bulkhead import StripeUnavailable, call_stripe
 from .models import PaymentIntent, StripeAccount, PlatformSettings
 from .stripe_utils import (
     handle_payment_succeeded,
@@ -246,6 +252,14 @@ class HandlePaymentSucceededTests(TestCase):
         self.assertEqual(self.contribution.payment_status, Contribution.PaymentStatus.COMPLETED)
         self.assertIsNotNone(self.contribution.completed_at)
 
+    def test_handle_payment_succeeded_queues_receipt_once(self):
+        handle_payment_succeeded({'id': self.pi.stripe_payment_intent_id})
+        handle_payment_succeeded({'id': self.pi.stripe_payment_intent_id})
+        receipts = OutboundEmail.objects.filter(template='contribution_received')
+        self.assertEqual(receipts.count(), 1)
+        self.assertEqual(receipts.get().to_email, 'anna@test.com')
+        self.assertIn('Lista Matrimonio', receipts.get().subject)
+
     def test_handle_payment_succeeded_unknown_id_returns_false(self):
         result = handle_payment_succeeded({'id': 'pi_nonexistent'})
         self.assertFalse(result)
@@ -395,3 +409,67 @@ class PlatformSettingsTests(TestCase):
         PlatformSettings.load()
         PlatformSettings.load()
         self.assertEqual(PlatformSettings.objects.count(), 1)
+
+
+# ─── Stripe bulkhead ─────────────────────────────────────────────────────────
+
+@override_settings(STRIPE_MAX_CONCURRENT_CALLS=2, STRIPE_BULKHEAD_WAIT=0.05)
+class StripeBulkheadTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def hold_slots(self, count):
+        """Start `count` Stripe calls that block, like checkouts in other gunicorn workers."""
+        started, release = threading.Semaphore(0), threading.Event()
+
+        def slow_call():
+            started.release()
+            release.wait(5)
+
+        holders = [threading.Thread(target=call_stripe, args=(slow_call,)) for _ in range(count)]
+        for holder in holders:
+            holder.start()
+        for _ in holders:
+            started.acquire(timeout=5)
+
+        def finish():
+            release.set()
+            for holder in holders:
+                holder.join()
+        self.addCleanup(finish)
+        return finish
+
+    def test_full_bulkhead_rejects(self):
+        finish = self.hold_slots(2)
+        with self.assertRaises(StripeUnavailable):
+            call_stripe(lambda: None)
+        finish()
+        self.assertEqual(call_stripe(lambda: 'ok'), 'ok')
+
+    @override_settings(STRIPE_MAX_CONCURRENT_CALLS=1)
+    def test_failed_call_frees_its_slot(self):
+        with self.assertRaises(ValueError):
+            call_stripe(MagicMock(side_effect=ValueError))
+        self.assertEqual(call_stripe(lambda: 'ok'), 'ok')
+
+    def test_refuses_calls_inside_a_transaction(self):
+        with transaction.atomic():
+            with self.assertRaises(TransactionManagementError):
+                call_stripe(lambda: None)
+
+    @override_settings(STRIPE_SECRET_KEY='sk_test_bulkhead')
+    @patch('stripe.checkout.Session.create')
+    def test_checkout_past_the_limit_answers_503(self, mock_create):
+        PlatformSettings.objects.create(
+            pk=1, platform_fee_percentage=Decimal('2.50'), platform_fee_fixed=Decimal('0.30'),
+        )
+        contribution = make_contribution(make_gift_list(make_user('bulkhead@test.com')))
+        self.hold_slots(2)
+        response = APIClient().post(
+            '/api/payments/create-payment-intent/',
+            {'contribution_id': str(contribution.id)}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '5')
+        mock_create.assert_not_called()
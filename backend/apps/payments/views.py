@@ -15,6 +15,9 @@ from rest_framework.decorators import api_view, permission_classes
 from django_ratelimit.decorators import ratelimit
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
+from mondodoro.instrumentation import query_budget
+from mondodoro.metrics import observe_webhook_lag
+from .bulkhead import StripeUnavailable, call_stripe, stripe_unavailable_response
 from .models import StripeAccount, PaymentIntent, WebhookEvent, PlatformSettings
 from .stripe_utils import (
     create_stripe_account,
@@ -23,7 +26,8 @@ from .stripe_utils import (
     handle_payment_succeeded,
     handle_payment_failed,
     handle_checkout_session_completed,
-    handle_account_updated
+    handle_account_updated,
+    complete_contribution,
 )
 from apps.gift_lists.models import Contribution
 from apps.accounts.models import User
@@ -78,6 +82,8 @@ def stripe_onboard_view(request):
             'account_id': stripe_account.stripe_account_id
         })
         
+    except StripeUnavailable:
+        return stripe_unavailable_response()
     except stripe.StripeError as e:
         return Response(
             {'error': f'Stripe error: {str(e)}'},
@@ -114,7 +120,7 @@ def stripe_onboard_return_view(request):
         stripe_account = StripeAccount.objects.get(jeweler=user)
         
         # Retrieve account from Stripe to check status
-        account = stripe.Account.retrieve(stripe_account.stripe_account_id)
+        account = call_stripe(stripe.Account.retrieve, stripe_account.stripe_account_id)
         
         # Update local account status
         stripe_account.charges_enabled = account.charges_enabled
@@ -156,6 +162,8 @@ def stripe_onboard_return_view(request):
             'account_status': 'pending',
             'message': 'Stripe account not found. Please complete onboarding.'
         })
+    except StripeUnavailable:
+        return stripe_unavailable_response()
     except Exception as e:
         return Response(
             {'error': f'Server error: {str(e)}'},
@@ -163,6 +171,7 @@ def stripe_onboard_return_view(request):
         )
 
 
+@query_budget(queries=12)
 @extend_schema(
     summary="Create payment intent",
     description="Create Stripe payment intent for contribution",
@@ -228,6 +237,8 @@ def create_payment_intent_view(request):
             'session_id': payment_intent_obj.stripe_payment_intent_id
         })
 
+    except StripeUnavailable:
+        return stripe_unavailable_response()
     except stripe.StripeError as e:
         logger.error("Stripe error in create_payment_intent: %s", str(e))
         return Response(
@@ -242,6 +253,7 @@ def create_payment_intent_view(request):
         )
 
 
+@query_budget(queries=20)
 @extend_schema(
     summary="Stripe webhook handler",
     description="Handle Stripe webhook events",
@@ -294,6 +306,7 @@ def stripe_webhook_view(request):
         # Mark event as processed
         webhook_event.processed = True
         webhook_event.save()
+        observe_webhook_lag('payments', event)
         
     except Exception as e:
         # Log error
@@ -335,7 +348,7 @@ def confirm_payment_view(request):
             )
         
         # Retrieve from Stripe to get latest status
-        stripe_pi = stripe.PaymentIntent.retrieve(payment_intent_id)
+        stripe_pi = call_stripe(stripe.PaymentIntent.retrieve, payment_intent_id)
         
         # Update local payment intent
         payment_intent_obj.status = stripe_pi.status
@@ -343,10 +356,7 @@ def confirm_payment_view(request):
         
         # Update contribution if payment succeeded
         if stripe_pi.status == 'succeeded':
-            contribution = payment_intent_obj.contribution
-            contribution.payment_status = Contribution.PaymentStatus.COMPLETED
-            contribution.completed_at = timezone.now()
-            contribution.save()
+            complete_contribution(payment_intent_obj.contribution)
             
             return Response({
                 'success': True,
@@ -358,6 +368,8 @@ def confirm_payment_view(request):
                 'message': f'Payment status: {stripe_pi.status}'
             })
         
+    except StripeUnavailable:
+        return stripe_unavailable_response()
     except Exception as e:
         return Response(
             {'error': str(e)},
@@ -0,0 +1,61 @@
+"""
+Micro-benchmarks for hot code paths.
+
+Each `bench_*.py` module is a standalone script run from the backend
+directory, e.g. `python -m benchmarks.bench_login`. Benchmarks run against a
+throwaway test database (created and destroyed like the test runner does),
+so they never touch development or production data.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mondodoro.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def throwaway_database(keepdb=False):
+    """Create the test database for the duration of the block."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def measure(func, repeat=200, warmup=10):
+    """Call `func` repeatedly and return timings in milliseconds."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        'p50': statistics.median(ordered),
+        'p95': ordered[max(0, int(len(ordered) * 0.95) - 1)],
+        'p99': ordered[max(0, int(len(ordered) * 0.99) - 1)],
+        'max': ordered[-1],
+    }
+
+
+def report(label, timings):
+    stats = summarize(timings)
+    print(f"{label:<45} p50 {stats['p50']:8.3f} ms   p95 {stats['p95']:8.3f} ms   max {stats['max']:8.3f} ms")
@@ -0,0 +1,76 @@
+"""
+CPU cost versus bytes saved of compressing API responses.
+
+Renders the payloads of bench_json (large gift list, gallery page, public
+list, KPI series) and times compressing each with gzip and brotli at a few
+levels, plus the chunk-by-chunk streaming mode of mondodoro/compression.py.
+The levels the middleware uses are marked with *.
+
+    python -m benchmarks.bench_compression --contributions 500
+"""
+import argparse
+import zlib
+
+from benchmarks import setup_django, throwaway_database, measure, report
+
+setup_django()
+
+import factory.random  # noqa: E402
+
+from benchmarks.bench_json import build_payloads  # noqa: E402
+from mondodoro import compression  # noqa: E402
+from mondodoro.renderers import FastJSONRenderer  # noqa: E402
+
+STREAM_CHUNK = 8 * 1024
+
+
+def gzip_at(level):
+    def run(body):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(body) + compressor.flush()
+    return run
+
+
+def brotli_at(quality):
+    return lambda body: compression.brotli.compress(body, quality=quality)
+
+
+def stream(encoding):
+    def run(body):
+        chunks = [body[i:i + STREAM_CHUNK] for i in range(0, len(body), STREAM_CHUNK)]
+        return b''.join(compression.compress_stream(chunks, encoding))
+    return run
+
+
+def codecs():
+    marked = {compression.GZIP_LEVEL: '*'}
+    yield from ((f'gzip -{level}{marked.get(level, "")}', gzip_at(level)) for level in (1, 6, 9))
+    yield f'gzip -{compression.GZIP_LEVEL} streamed ({STREAM_CHUNK // 1024} KiB chunks)', stream('gzip')
+    if compression.brotli is None:
+        print('brotli is not installed: skipping brotli.')
+        return
+    marked = {compression.BROTLI_QUALITY: '*'}
+    yield from ((f'brotli q{quality}{marked.get(quality, "")}', brotli_at(quality)) for quality in (1, 4, 11))
+    yield f'brotli q{compression.BROTLI_QUALITY} streamed', stream('br')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--contributions', type=int, default=500, help='contributions on the large gift list')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    factory.random.reseed_random(47)
+    with throwaway_database():
+        payloads = build_payloads(args.contributions)
+
+    for label, data in payloads.items():
+        body = FastJSONRenderer().render(data)
+        print(f'\n{label}: {len(body) / 1024:.1f} KiB')
+        for name, codec in codecs():
+            size = len(codec(body))
+            report(f'  {name:<34} {size / len(body):6.1%}', measure(lambda: codec(body), args.repeat, warmup=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Per-request cost of opening database connections.
+
+Replays the request lifecycle (request_started, one small query,
+request_finished) under each connection policy of mondodoro/db.py and
+reports latency and how many physical connections were opened. Meaningful
+against PostgreSQL, where a connect costs a TCP and possibly TLS handshake
+plus authentication; point DATABASE_URL (or --url) at the server, or at
+PgBouncer with --pooler pgbouncer.
+
+    DATABASE_URL=postgresql://user:pass@db:5432/mondodoro python -m benchmarks.bench_db_connections
+"""
+import argparse
+
+from benchmarks import setup_django, throwaway_database, measure, report
+
+setup_django()
+
+from django.core.signals import request_finished, request_started  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.db.backends.signals import connection_created  # noqa: E402
+
+from mondodoro.db import database_config  # noqa: E402
+
+POLICIES = {
+    'reconnect per request': dict(conn_max_age=0, health_checks=False),
+    'persistent': dict(conn_max_age=60, health_checks=False),
+    'persistent + health checks': dict(conn_max_age=60, health_checks=True),
+}
+
+
+def request_cycle():
+    request_started.send(sender=None)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    request_finished.send(sender=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', help='DATABASE_URL to benchmark (default: the configured one)')
+    parser.add_argument('--pooler', default='', choices=['', 'pgbouncer'])
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    if args.url:
+        connections.settings['default'] = database_config(args.url, pooler=args.pooler)
+        del connections['default']
+
+    opened = []
+    connection_created.connect(lambda **kwargs: opened.append(1), weak=False)
+
+    with throwaway_database():
+        host = connection.settings_dict.get('HOST') or 'local'
+        print(f'{args.repeat} request cycles on {connection.vendor} ({host})')
+        if connection.vendor == 'sqlite':
+            print('Note: the SQLite test database lives in memory and is never reconnected; '
+                  'use PostgreSQL for meaningful numbers.')
+        for label, policy in POLICIES.items():
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = policy['conn_max_age']
+            connection.settings_dict['CONN_HEALTH_CHECKS'] = policy['health_checks']
+            opened.clear()
+            timings = measure(request_cycle, args.repeat)
+            report(f'{label} ({len(opened)} connects)', timings)
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""
+Latency, query count and peak memory of the main API endpoints.
+
+Loads a synthetic data set with `generate_load_data`, then drives each
+endpoint through the full middleware stack with DRF's test client. For
+every scenario it records p50/p95/max latency, the number of queries per
+request and the peak Python memory allocated while serving one request.
+Stripe is stubbed in-process, and rate limiting is disabled.
+
+    python -m benchmarks.bench_endpoints --scale small --save baseline.json
+    python -m benchmarks.bench_endpoints --scale small --compare baseline.json
+
+With `--compare` the exit status is 1 if any scenario regressed: p95 or
+peak memory beyond `--tolerance`, or more queries than the baseline.
+Compare runs of the same scale and database vendor only.
+"""
+import argparse
+import itertools
+import json
+import logging
+import platform
+import sys
+import tracemalloc
+from datetime import time
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from benchmarks import setup_django, throwaway_database, measure, summarize
+
+setup_django()
+
+import django  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.test.utils import CaptureQueriesContext, override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from apps.events.models import Booking, Event, EventSlot  # noqa: E402
+from apps.gift_lists.factories import ContributionFactory  # noqa: E402
+from apps.gift_lists.models import Contribution, GiftList  # noqa: E402
+from apps.payments.models import PlatformSettings  # noqa: E402
+
+SCALES = {
+    'tiny': dict(jewelers=10, lists=500, contributions=5_000, events=100),
+    'small': dict(jewelers=50, lists=5_000, contributions=50_000, events=1_000),
+    'medium': dict(jewelers=500, lists=50_000, contributions=500_000, events=10_000),
+    'large': dict(jewelers=2_000, lists=200_000, contributions=2_000_000, events=40_000),
+}
+MEMORY_SAMPLES = 5
+
+
+class Scenario:
+    """One endpoint call; callable `data` builds a fresh payload for every call."""
+
+    def __init__(self, name, method, url, expected_status, client, data=None):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.expected_status = expected_status
+        self.client = client
+        self.data = data
+
+    def __call__(self):
+        data = self.data() if callable(self.data) else self.data
+        response = getattr(self.client, self.method)(self.url, data, format='json')
+        if response.status_code != self.expected_status:
+            raise AssertionError(
+                f'{self.name}: {self.method.upper()} {self.url} returned '
+                f'{response.status_code}: {response.content[:300]!r}'
+            )
+        return response
+
+
+class StubStripe:
+    """Returns canned Checkout sessions instead of calling the Stripe API."""
+
+    def __init__(self):
+        self.ids = itertools.count()
+
+    def create_session(self, **params):
+        session_id = f'cs_bench_{next(self.ids)}'
+        return SimpleNamespace(id=session_id, url=f'https://checkout.stripe.test/{session_id}')
+
+
+def pending_contributions(gift_list, count):
+    contributions = [
+        ContributionFactory.build(
+            gift_list=gift_list,
+            payment_status=Contribution.PaymentStatus.PENDING,
+            completed_at=None,
+        )
+        for _ in range(count)
+    ]
+    # created_at is auto_now_add here: checkout refuses contributions older than an hour
+    Contribution.objects.bulk_create(contributions)
+    return iter(contributions)
+
+
+def build_scenarios(calls):
+    jeweler_id = (
+        GiftList.objects.values('jeweler').annotate(lists=Count('id')).order_by('-lists')[0]['jeweler']
+    )
+    owned = GiftList.objects.filter(jeweler_id=jeweler_id).annotate(n=Count('contributions')).order_by('-n')[0]
+    public = (
+        GiftList.objects.filter(status=GiftList.Status.ACTIVE, is_public=True)
+        .annotate(n=Count('contributions')).order_by('-n')[0]
+    )
+    event = (
+        Event.objects.filter(status=Event.Status.ACTIVE, date__gte=timezone.localdate())
+        .annotate(n=Count('slots__bookings')).order_by('-n')[0]
+    )
+    # A dedicated paid slot that never fills up, so every booking goes to checkout
+    slot = EventSlot.objects.create(
+        event=event, start_time=time(20, 0), price=Decimal('40.00'), max_attendees=10 ** 6,
+    )
+
+    # A freshly created PlatformSettings still holds its float defaults; read it back from the database
+    PlatformSettings.load()
+
+    owner = APIClient()
+    owner.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user_id=jeweler_id).key}')
+    anonymous = APIClient()
+
+    checkout = pending_contributions(public, calls)
+    guests = itertools.count()
+
+    return [
+        Scenario('gift_list_list', 'get', '/api/gift-lists/', 200, owner),
+        Scenario('gift_list_detail', 'get', f'/api/gift-lists/{owned.id}/', 200, owner),
+        Scenario('gift_list_public', 'get', f'/api/gift-lists/public/{public.id}/', 200, anonymous),
+        Scenario(
+            'contribution_create', 'post', f'/api/gift-lists/{public.id}/contributions/', 201, anonymous,
+            data=lambda: {
+                'contributor_name': 'Ospite Benchmark',
+                'contributor_email': f'bench{next(guests)}@example.com',
+                'amount': '50.00',
+            },
+        ),
+        Scenario(
+            'checkout_create', 'post', '/api/payments/create-payment-intent/', 200, anonymous,
+            data=lambda: {'contribution_id': str(next(checkout).id)},
+        ),
+        Scenario('event_public', 'get', f'/api/events/{event.id}/public/', 200, anonymous),
+        Scenario(
+            'booking_create', 'post', f'/api/events/{event.id}/book/', 201, anonymous,
+            data=lambda: {
+                'slot_id': str(slot.id),
+                'guest_name': 'Ospite Benchmark',
+                'guest_email': f'booking{next(guests)}@example.com',
+                'payment_method': Booking.PaymentMethod.ONLINE,
+            },
+        ),
+    ]
+
+
+def peak_memory_kib(scenario):
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(MEMORY_SAMPLES):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            scenario()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return max(peaks) / 1024
+
+
+def run_scenario(scenario, repeat):
+    timings = measure(scenario, repeat)
+    with CaptureQueriesContext(connection) as queries:
+        scenario()
+    return {
+        **{key: round(value, 3) for key, value in summarize(timings).items()},
+        'queries': len(queries),
+        'peak_kib': round(peak_memory_kib(scenario), 1),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print deltas against `baseline`; return the names of regressed scenarios."""
+    regressed = []
+    print(f"\n{'scenario':<22}{'p95 ms':<20}{'queries':<14}{'peak KiB':<24}")
+    for name, current in results.items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f'{name:<22} (not in baseline)')
+            continue
+        slower = current['p95'] > before['p95'] * (1 + tolerance)
+        more_queries = current['queries'] > before['queries']
+        bigger = current['peak_kib'] > before['peak_kib'] * (1 + tolerance)
+        flag = '  REGRESSED' if slower or more_queries or bigger else ''
+        print(
+            f"{name:<22}{before['p95']:>8.2f} -> {current['p95']:<8.2f}"
+            f"{before['queries']:>5} -> {current['queries']:<5}"
+            f"{before['peak_kib']:>10.1f} -> {current['peak_kib']:<10.1f}{flag}"
+        )
+        if flag:
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--only', nargs='*', help='Run only these scenarios')
+    parser.add_argument('--save', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Compare against a JSON file written by --save')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative p95/memory increase before a regression (default 0.2)')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    # Per-request log lines would dominate the output
+    logging.getLogger('mondodoro.requests').setLevel(logging.WARNING)
+    stripe = StubStripe()
+
+    with throwaway_database(), override_settings(
+        RATELIMIT_ENABLE=False, STRIPE_SECRET_KEY='sk_test_bench',
+    ), mock.patch('stripe.checkout.Session.create', side_effect=stripe.create_session):
+        print(f'Generating the {args.scale} data set on {connection.vendor}...')
+        call_command('generate_load_data', seed=42, **SCALES[args.scale])
+
+        # Each call of a create scenario consumes data, so size pools for every pass
+        calls = 10 + args.repeat + 1 + MEMORY_SAMPLES
+        results = {}
+        for scenario in build_scenarios(calls):
+            if args.only and scenario.name not in args.only:
+                continue
+            stats = results[scenario.name] = run_scenario(scenario, args.repeat)
+            print(
+                f"{scenario.name:<22} p50 {stats['p50']:8.2f} ms   p95 {stats['p95']:8.2f} ms   "
+                f"{stats['queries']:3d} queries   peak {stats['peak_kib']:9.1f} KiB"
+            )
+
+    run = {
+        'meta': {
+            'scale': args.scale,
+            'vendor': connection.vendor,
+            'repeat': args.repeat,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'recorded_at': timezone.now().isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+        print(f'\nSaved results to {args.save}')
+
+    if baseline is not None:
+        if (baseline['meta']['scale'], baseline['meta']['vendor']) != (args.scale, connection.vendor):
+            print(f"Warning: baseline was recorded at scale {baseline['meta']['scale']} "
+                  f"on {baseline['meta']['vendor']}")
+        regressed = compare(results, baseline, args.tolerance)
+        if regressed:
+            print(f"\nRegressed: {', '.join(regressed)}")
+            sys.exit(1)
+        print('\nNo regressions.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Rendering cost of uploaded images (mondodoro/images.py).
+
+Builds a phone-sized JPEG and times producing a gift list cover's
+renditions (thumbnail, card, hero in WebP and JPEG) as the worker does,
+against decoding at full size and resizing every rendition from the
+original. Then prints the bytes a guest downloads for each size.
+
+    python -m benchmarks.bench_images --width 4032 --height 3024
+"""
+import argparse
+import io
+import shutil
+import tempfile
+
+from benchmarks import setup_django, measure, report
+
+setup_django()
+
+from django.core.files.storage import default_storage  # noqa: E402
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from PIL import Image, ImageFilter, ImageOps  # noqa: E402
+
+from apps.gift_lists.tasks import COVER_SIZES  # noqa: E402
+from mondodoro import images  # noqa: E402
+
+
+class Upload:
+    """Stands in for the FieldFile the worker reads."""
+
+    def __init__(self, name, content):
+        self.name = name
+        self.file = SimpleUploadedFile(name, content)
+
+    def open(self, mode='rb'):
+        self.file.seek(0)
+
+    def close(self):
+        pass
+
+    def read(self, *args):
+        return self.file.read(*args)
+
+    def seek(self, *args):
+        return self.file.seek(*args)
+
+    def tell(self):
+        return self.file.tell()
+
+
+def photo(width, height):
+    # Noise keeps the JPEG about as large as a real photo
+    image = Image.effect_noise((width, height), 40).convert('RGB').filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=92)
+    return buffer.getvalue()
+
+
+def naive_renditions(content):
+    """Decode at full size and resize every rendition from the original, in memory."""
+    with Image.open(io.BytesIO(content)) as original:
+        image = ImageOps.exif_transpose(original).convert('RGB')
+    for name in COVER_SIZES:
+        width = min(images.RENDITION_WIDTHS[name], image.width)
+        resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        for _, _, options in images.FORMATS:
+            resized.save(io.BytesIO(), **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--width', type=int, default=4032)
+    parser.add_argument('--height', type=int, default=3024)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    content = photo(args.width, args.height)
+    print(f'original: {args.width}x{args.height}, {len(content) / 1024:.0f} KiB')
+    media_root = tempfile.mkdtemp()
+    try:
+        with override_settings(MEDIA_ROOT=media_root):
+            upload = Upload('covers/photo.jpg', content)
+            report('  worker: draft decode, chained resizes', measure(
+                lambda: images.render_renditions(upload, COVER_SIZES), args.repeat, warmup=1))
+            report('  naive: full decode, resize from original', measure(
+                lambda: naive_renditions(content), args.repeat, warmup=1))
+
+            data = images.render_renditions(upload, COVER_SIZES)
+            for name, entry in data['sizes'].items():
+                sizes = ', '.join(
+                    f'{key} {default_storage.size(entry[key]) / 1024:.1f} KiB' for key in images.FORMAT_KEYS)
+                print(f'  {name:<10} {entry["width"]}x{entry["height"]}: {sizes}')
+    finally:
+        shutil.rmtree(media_root)
+
+
+if __name__ == '__main__':
+    main()
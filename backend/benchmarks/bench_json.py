@@ -0,0 +1,73 @@
+"""
+DRF JSON rendering and parsing: stdlib vs orjson (mondodoro/renderers.py).
+
+Serializes representative payloads once, then times rendering them with
+DRF's JSONRenderer and with FastJSONRenderer, and parsing them back with
+both parsers. Every payload is checked to render to the same bytes.
+
+    python -m benchmarks.bench_json --contributions 500
+"""
+import argparse
+import io
+
+from benchmarks import setup_django, throwaway_database, measure, report
+
+setup_django()
+
+import factory.random  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from apps.analytics.models import PlatformDailyStats  # noqa: E402
+from apps.analytics.rollups import rollup_platform_stats  # noqa: E402
+from apps.analytics.serializers import PlatformDailyStatsSerializer  # noqa: E402
+from apps.gift_lists.factories import ContributionFactory, GiftListFactory  # noqa: E402
+from apps.gift_lists.models import GiftList  # noqa: E402
+from apps.gift_lists.serializers import GiftListPublicSerializer, GiftListSerializer  # noqa: E402
+from apps.gift_lists.views import public_gift_list_queryset, with_serializer_data  # noqa: E402
+from mondodoro.renderers import FastJSONParser, FastJSONRenderer, orjson  # noqa: E402
+
+
+def build_payloads(contributions):
+    gift_list = GiftListFactory(status=GiftList.Status.ACTIVE, is_public=True, show_in_public_gallery=True)
+    ContributionFactory.create_batch(contributions, gift_list=gift_list)
+    GiftListFactory.create_batch(19, jeweler=gift_list.jeweler, status=GiftList.Status.ACTIVE)
+    for other in GiftList.objects.exclude(pk=gift_list.pk):
+        ContributionFactory.create_batch(10, gift_list=other)
+    rollup_platform_stats()
+
+    lists = with_serializer_data(GiftList.objects.order_by('-created_at'))
+    return {
+        f'gift list detail ({contributions} contributions)': GiftListSerializer(lists.get(pk=gift_list.pk)).data,
+        'gift list page (20 lists)': GiftListSerializer(lists[:20], many=True).data,
+        'public gift list': GiftListPublicSerializer(public_gift_list_queryset().get(pk=gift_list.pk)).data,
+        'KPI daily series': PlatformDailyStatsSerializer(PlatformDailyStats.objects.all(), many=True).data,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--contributions', type=int, default=500, help='contributions on the large gift list')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    if orjson is None:
+        print('orjson is not installed: FastJSONRenderer falls back to the stdlib encoder.')
+    factory.random.reseed_random(46)
+
+    with throwaway_database():
+        payloads = build_payloads(args.contributions)
+
+    for label, data in payloads.items():
+        body = JSONRenderer().render(data)
+        if FastJSONRenderer().render(data) != body:
+            raise AssertionError(f'{label}: FastJSONRenderer output differs from JSONRenderer')
+        print(f'\n{label}: {len(body) / 1024:.1f} KiB')
+        report('  render  DRF JSONRenderer', measure(lambda: JSONRenderer().render(data), args.repeat))
+        report('  render  FastJSONRenderer', measure(lambda: FastJSONRenderer().render(data), args.repeat))
+        report('  parse   DRF JSONParser', measure(lambda: JSONParser().parse(io.BytesIO(body)), args.repeat))
+        report('  parse   FastJSONParser', measure(lambda: FastJSONParser().parse(io.BytesIO(body)), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
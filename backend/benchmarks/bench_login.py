@@ -0,0 +1,74 @@
+"""
+Login lookup latency with a large user table.
+
+Compares the previous `email__iexact | username__iexact` lookup with the
+single equality probe used by EmailOrUsernameBackend, and times a full
+`authenticate()` call. Password hashing is switched to MD5 so the numbers
+reflect the query rather than PBKDF2.
+
+    python -m benchmarks.bench_login [--users 100000]
+"""
+import argparse
+
+from benchmarks import setup_django, throwaway_database, measure, report
+
+setup_django()
+
+from django.contrib.auth import authenticate  # noqa: E402
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Q  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from apps.accounts.models import User  # noqa: E402
+
+PASSWORD = 'BenchPass123!'
+
+
+def populate(count, batch_size=5000):
+    password = make_password(PASSWORD)
+    for offset in range(0, count, batch_size):
+        User.objects.bulk_create([
+            User(
+                email=f'user{i}@bench.test',
+                username=f'user{i}@bench.test',
+                password=password,
+                first_name='Bench',
+                last_name=str(i),
+            )
+            for i in range(offset, min(offset + batch_size, count))
+        ])
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE accounts_user')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    with throwaway_database(), override_settings(
+        PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']
+    ):
+        print(f"Creating {args.users} users on {connection.vendor}...")
+        populate(args.users)
+        login = f'USER{args.users // 2}@Bench.test'
+
+        old = User.objects.filter(Q(email__iexact=login) | Q(username__iexact=login), is_active=True)
+        new = User.objects.filter(email=login.strip().lower(), is_active=True)
+        assert old.get().pk == new.get().pk
+
+        print('\nPrevious lookup plan:\n' + old.explain())
+        print('\nEquality lookup plan:\n' + new.explain() + '\n')
+
+        report('iexact OR lookup', measure(lambda: old.get(), args.repeat))
+        report('equality lookup', measure(lambda: new.get(), args.repeat))
+        report('authenticate() (MD5 hasher)', measure(
+            lambda: authenticate(username=login, password=PASSWORD), args.repeat
+        ))
+
+
+if __name__ == '__main__':
+    main()
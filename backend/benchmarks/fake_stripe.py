@@ -0,0 +1,242 @@
+"""
+Minimal Stripe API stand-in for load tests.
+
+Serves `POST /v1/checkout/sessions` (and `GET` of a created session) with
+Stripe-shaped JSON. For every session it simulates the guest paying, then
+POSTs a signed `checkout.session.completed` event to the webhook URL after
+a random delay, retrying non-2xx responses like Stripe does. Point the
+backend at it with STRIPE_API_BASE.
+
+    python -m benchmarks.fake_stripe --port 12111 \
+        --webhook-url http://127.0.0.1:8000/api/payments/stripe/webhook/ --secret whsec_load
+"""
+import argparse
+import heapq
+import hmac
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+WEBHOOK_RETRY_DELAYS = (1, 2, 4)
+
+
+def sign_payload(payload, secret, timestamp=None):
+    """Stripe-Signature header value for `payload` (bytes)."""
+    timestamp = int(timestamp or time.time())
+    signature = hmac.new(secret.encode(), f'{timestamp}.'.encode() + payload, sha256).hexdigest()
+    return f't={timestamp},v1={signature}'
+
+
+def parse_form(body):
+    """Decode Stripe's bracketed form encoding (metadata[key]=value) one level deep."""
+    params = {}
+    for key, value in parse_qsl(body, keep_blank_values=True):
+        if '[' in key:
+            outer, inner = key.split('[', 1)
+            params.setdefault(outer, {})
+            if isinstance(params[outer], dict):
+                params[outer][inner.split(']', 1)[0]] = value
+        else:
+            params[key] = value
+    return params
+
+
+class WebhookSender:
+    """Delivers signed events after a delay from a small thread pool."""
+
+    def __init__(self, url, secret, delay=(2.0, 20.0), seed=None, workers=8):
+        self.url = url
+        self.secret = secret
+        self.delay = delay
+        self.random = random.Random(seed)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='webhook')
+        self.queue = []
+        self.order = itertools.count()
+        self.lock = threading.Condition()
+        self.stats = {'scheduled': 0, 'delivered': 0, 'failed': 0, 'retries': 0, 'latencies_ms': []}
+        self.pending = 0
+        self.closed = False
+        threading.Thread(target=self._dispatch, daemon=True, name='webhook-scheduler').start()
+
+    def schedule(self, event):
+        with self.lock:
+            due = time.monotonic() + self.random.uniform(*self.delay)
+            heapq.heappush(self.queue, (due, next(self.order), event, 0))
+            self.stats['scheduled'] += 1
+            self.pending += 1
+            self.lock.notify()
+
+    def _dispatch(self):
+        while True:
+            with self.lock:
+                while not self.closed and (not self.queue or self.queue[0][0] > time.monotonic()):
+                    timeout = self.queue[0][0] - time.monotonic() if self.queue else None
+                    self.lock.wait(timeout)
+                if self.closed:
+                    return
+                _, _, event, attempt = heapq.heappop(self.queue)
+            self.pool.submit(self._deliver, event, attempt)
+
+    def _deliver(self, event, attempt):
+        payload = json.dumps(event).encode()
+        start = time.perf_counter()
+        try:
+            response = requests.post(
+                self.url, data=payload, timeout=30,
+                headers={'Content-Type': 'application/json', 'Stripe-Signature': sign_payload(payload, self.secret)},
+            )
+            ok = 200 <= response.status_code < 300
+        except requests.RequestException:
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+
+        with self.lock:
+            if ok:
+                self.stats['delivered'] += 1
+                self.stats['latencies_ms'].append(elapsed)
+            elif attempt < len(WEBHOOK_RETRY_DELAYS):
+                self.stats['retries'] += 1
+                due = time.monotonic() + WEBHOOK_RETRY_DELAYS[attempt]
+                heapq.heappush(self.queue, (due, next(self.order), event, attempt + 1))
+                self.lock.notify()
+                return
+            else:
+                self.stats['failed'] += 1
+            self.pending -= 1
+            self.lock.notify_all()
+
+    def drain(self, timeout):
+        """Wait until every scheduled event was delivered or gave up; False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            while self.pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.lock.wait(remaining)
+        return True
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class FakeStripe(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, webhooks=None, latency=(0.05, 0.25), seed=None):
+        super().__init__(address, FakeStripeHandler)
+        self.webhooks = webhooks
+        self.latency = latency
+        self.random = random.Random(seed)
+        self.sessions = {}
+        self.ids = itertools.count(1)
+        # Object ids must not collide with those stored by earlier runs
+        self.run = uuid.uuid4().hex[:8]
+        self.lock = threading.Lock()
+
+    def create_session(self, params, account):
+        with self.lock:
+            number = f'{self.run}{next(self.ids):06d}'
+            wait = self.random.uniform(*self.latency)
+        time.sleep(wait)
+        session_id = f'cs_test_fake{number}'
+        session = {
+            'id': session_id,
+            'object': 'checkout.session',
+            'url': f'https://checkout.stripe.test/pay/{session_id}',
+            'mode': params.get('mode', 'payment'),
+            'payment_status': 'unpaid',
+            'status': 'open',
+            'payment_intent': f'pi_fake{number}',
+            'metadata': params.get('metadata', {}),
+            'customer_email': params.get('customer_email'),
+            'livemode': False,
+        }
+        self.sessions[session_id] = session
+        if self.webhooks is not None:
+            paid = dict(session, payment_status='paid', status='complete')
+            event = {
+                'id': f'evt_fake{number}',
+                'object': 'event',
+                'type': 'checkout.session.completed',
+                'account': account,
+                'created': int(time.time()),
+                'data': {'object': paid},
+            }
+            self.webhooks.schedule(event)
+        return session
+
+
+class FakeStripeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Request-Id', 'req_fake')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_found(self):
+        self._send(404, {'error': {'type': 'invalid_request_error', 'message': f'Unrecognized request URL ({self.path})'}})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode()
+        if urlsplit(self.path).path != '/v1/checkout/sessions':
+            return self._not_found()
+        self._send(200, self.server.create_session(parse_form(body), self.headers.get('Stripe-Account')))
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        prefix = '/v1/checkout/sessions/'
+        session = self.server.sessions.get(path[len(prefix):]) if path.startswith(prefix) else None
+        if session is None:
+            return self._not_found()
+        self._send(200, session)
+
+
+def start(port, webhook_url=None, secret=None, seed=None, pay_delay=(2.0, 20.0), latency=(0.05, 0.25)):
+    """Run the stand-in on a background thread; returns the server."""
+    webhooks = WebhookSender(webhook_url, secret, delay=pay_delay, seed=seed) if webhook_url else None
+    server = FakeStripe(('127.0.0.1', port), webhooks=webhooks, latency=latency, seed=seed)
+    threading.Thread(target=server.serve_forever, daemon=True, name='fake-stripe').start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, default=12111)
+    parser.add_argument('--webhook-url', help='Deliver checkout.session.completed events here')
+    parser.add_argument('--secret', help='Webhook signing secret (STRIPE_WEBHOOK_SECRET)')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    if args.webhook_url and not args.secret:
+        parser.error('--webhook-url needs --secret')
+
+    server = start(args.port, args.webhook_url, args.secret, args.seed)
+    print(f'Fake Stripe listening on http://127.0.0.1:{args.port}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+"""
+Wedding-day spike: one shared gift list link, thousands of guests.
+
+Replays the worst traffic we see against a running local stack. Guests
+open the public gift list shortly after the link is shared (arrivals decay
+exponentially over `--duration`). A subset of them then create a
+contribution and a Stripe checkout. The fake Stripe server
+(benchmarks.fake_stripe) answers the checkout calls. It then "pays" each
+session and POSTs a signed checkout.session.completed webhook back to the
+stack, so webhook writes compete with the browsing traffic.
+
+The schedule is drawn from `--seed`, so runs are reproducible. The report
+gives per-endpoint throughput, error rate and p50/p95/p99 latency, the
+webhook delivery outcome and, on PostgreSQL, how many backends were
+waiting on locks (sampled from pg_stat_activity).
+
+Run it from the backend directory with the same database settings as the
+server. The server has to talk to the fake Stripe and skip rate limits:
+
+    export STRIPE_SECRET_KEY=sk_test_load STRIPE_WEBHOOK_SECRET=whsec_load \\
+           STRIPE_API_BASE=http://127.0.0.1:12111 RATELIMIT_ENABLE=False
+    gunicorn mondodoro.wsgi -w 4 -b 127.0.0.1:8000 &
+    python -m benchmarks.load_wedding_day --guests 3000 --givers 300 --save w4.json
+
+The gift list and its jeweler use the load-data email domain, so
+`generate_load_data --clear` removes them.
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from benchmarks import fake_stripe, setup_django, summarize
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from apps.accounts.factories import LOAD_EMAIL_DOMAIN  # noqa: E402
+from apps.accounts.models import User  # noqa: E402
+from apps.gift_lists.models import Contribution, GiftList  # noqa: E402
+from apps.payments.models import PlatformSettings, StripeAccount  # noqa: E402
+
+AMOUNTS = ('20.00', '30.00', '50.00', '50.00', '100.00', '150.00')
+WEBHOOK_PATH = '/api/payments/stripe/webhook/'
+
+
+def prepare_gift_list():
+    jeweler, _ = User.objects.get_or_create(
+        email=f'wedding@{LOAD_EMAIL_DOMAIN}',
+        defaults={
+            'username': f'wedding@{LOAD_EMAIL_DOMAIN}',
+            'first_name': 'Carlo',
+            'last_name': 'Rossi',
+            'role': User.UserRole.JEWELER,
+            'business_name': 'Gioielleria Rossi',
+        },
+    )
+    # Checkouts go through Connect, as they do for onboarded jewelers
+    StripeAccount.objects.get_or_create(
+        jeweler=jeweler,
+        defaults={'stripe_account_id': 'acct_fakewedding', 'charges_enabled': True, 'payouts_enabled': True},
+    )
+    PlatformSettings.load()
+    return GiftList.objects.create(
+        jeweler=jeweler,
+        title='Lista nozze Giulia e Marco',
+        target_amount='15000.00',
+        status=GiftList.Status.ACTIVE,
+        is_public=True,
+    )
+
+
+def build_schedule(guests, givers, duration, rng):
+    """[(start offset, kind)] for every guest; givers browse first, then give."""
+    schedule = []
+    giving = set(rng.sample(range(guests), min(givers, guests)))
+    for guest in range(guests):
+        # Most guests open the link in the first minutes after it is shared
+        arrival = min(rng.expovariate(4 / duration), duration)
+        schedule.append((arrival, 'browse'))
+        if guest in giving:
+            schedule.append((min(arrival + rng.uniform(5, 60), duration), 'give'))
+    return sorted(schedule)
+
+
+class LoadRun:
+
+    def __init__(self, base_url, gift_list, concurrency, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.gift_list = gift_list
+        self.timeout = timeout
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lags = []
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='guest')
+
+    def session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def call(self, name, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session().request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        elapsed = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.latencies[name].append(elapsed)
+            if not ok:
+                self.errors[name] += 1
+        return response if ok else None
+
+    def browse(self, rng):
+        self.call('gift_list_public', 'GET', f'/api/gift-lists/public/{self.gift_list.id}/')
+
+    def give(self, rng):
+        contribution = self.call(
+            'contribution_create', 'POST', f'/api/gift-lists/{self.gift_list.id}/contributions/',
+            json={
+                'contributor_name': 'Ospite Matrimonio',
+                'contributor_email': f'ospite{rng.randrange(10 ** 9)}@example.com',
+                'amount': rng.choice(AMOUNTS),
+            },
+        )
+        if contribution is not None:
+            self.call(
+                'checkout_create', 'POST', '/api/payments/create-payment-intent/',
+                json={'contribution_id': contribution.json()['id']},
+            )
+
+    def run(self, schedule, seed):
+        started = time.monotonic()
+        futures = []
+        for index, (offset, kind) in enumerate(schedule):
+            delay = started + offset - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            scheduled = started + offset
+            rng = random.Random(f'{seed}:{index}')
+            futures.append(self.executor.submit(self._task, getattr(self, kind), rng, scheduled))
+        for future in futures:
+            future.result()
+        self.executor.shutdown()
+        return time.monotonic() - started
+
+    def _task(self, action, rng, scheduled):
+        # Time spent waiting for a free client thread: large values mean the
+        # load generator, not the server, was the bottleneck
+        with self.lock:
+            self.lags.append((time.monotonic() - scheduled) * 1000)
+        action(rng)
+
+
+class LockSampler:
+    """Samples backends waiting on locks from pg_stat_activity (PostgreSQL only)."""
+
+    QUERY = """
+        SELECT count(*) FILTER (WHERE wait_event_type = 'Lock'),
+               count(*) FILTER (WHERE state = 'active')
+        FROM pg_stat_activity
+        WHERE datname = current_database() AND pid <> pg_backend_pid()
+    """
+    DEADLOCKS = 'SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()'
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = []
+        self.stop = threading.Event()
+        self.enabled = connection.vendor == 'postgresql'
+        self.deadlocks_before = self._deadlocks() if self.enabled else None
+        self.thread = threading.Thread(target=self._run, daemon=True, name='lock-sampler')
+
+    def _deadlocks(self):
+        with connection.cursor() as cursor:
+            cursor.execute(self.DEADLOCKS)
+            return cursor.fetchone()[0]
+
+    def _run(self):
+        from django.db import connection as thread_connection
+        try:
+            while not self.stop.wait(self.interval):
+                with thread_connection.cursor() as cursor:
+                    cursor.execute(self.QUERY)
+                    self.samples.append(cursor.fetchone())
+        finally:
+            thread_connection.close()
+
+    def __enter__(self):
+        if self.enabled:
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.enabled:
+            self.stop.set()
+            self.thread.join()
+
+    def report(self):
+        if not self.enabled:
+            return {'available': False, 'reason': f'lock sampling needs PostgreSQL, not {connection.vendor}'}
+        waiting = [lock for lock, _ in self.samples] or [0]
+        active = [busy for _, busy in self.samples] or [0]
+        return {
+            'available': True,
+            'samples': len(self.samples),
+            'max_waiting': max(waiting),
+            'mean_waiting': round(sum(waiting) / len(waiting), 2),
+            'share_of_samples_with_waits': round(sum(1 for w in waiting if w) / len(waiting), 3),
+            'max_active': max(active),
+            'deadlocks': self._deadlocks() - self.deadlocks_before,
+        }
+
+
+def endpoint_report(run, elapsed):
+    report = {}
+    for name, latencies in sorted(run.latencies.items()):
+        stats = {key: round(value, 1) for key, value in summarize(latencies).items()}
+        report[name] = {
+            'requests': len(latencies),
+            'throughput_rps': round(len(latencies) / elapsed, 1),
+            'error_rate': round(run.errors[name] / len(latencies), 4),
+            **stats,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--guests', type=int, default=3000, help='Guests opening the public list')
+    parser.add_argument('--givers', type=int, default=300, help='Guests who also contribute and check out')
+    parser.add_argument('--duration', type=float, default=300, help='Seconds over which guests arrive')
+    parser.add_argument('--concurrency', type=int, default=64, help='Client threads')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--webhook-url', help='Defaults to the stack\'s Stripe webhook endpoint')
+    parser.add_argument('--drain-timeout', type=float, default=120,
+                        help='Seconds to wait for outstanding webhooks after the traffic ends')
+    parser.add_argument('--sample-interval', type=float, default=0.1)
+    parser.add_argument('--save', help='Write the report to this JSON file')
+    args = parser.parse_args()
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+
+    if not (settings.STRIPE_SECRET_KEY and settings.STRIPE_WEBHOOK_SECRET and settings.STRIPE_API_BASE):
+        parser.error('set STRIPE_SECRET_KEY, STRIPE_WEBHOOK_SECRET and STRIPE_API_BASE as for the server')
+
+    stripe_port = urlsplit(settings.STRIPE_API_BASE).port
+    stripe_server = fake_stripe.start(
+        stripe_port,
+        webhook_url=args.webhook_url or args.base_url.rstrip('/') + WEBHOOK_PATH,
+        secret=settings.STRIPE_WEBHOOK_SECRET,
+        seed=args.seed,
+    )
+    gift_list = prepare_gift_list()
+    schedule = build_schedule(args.guests, args.givers, args.duration, random.Random(args.seed))
+    print(f'{len(schedule)} guest actions over {args.duration:.0f}s against {args.base_url}, list {gift_list.id}')
+
+    run = LoadRun(args.base_url, gift_list, args.concurrency, args.timeout)
+    with LockSampler(args.sample_interval) as sampler:
+        elapsed = run.run(schedule, args.seed)
+        webhooks = stripe_server.webhooks
+        drained = webhooks.drain(args.drain_timeout)
+    webhooks.close()
+    stripe_server.shutdown()
+
+    total = sum(len(latencies) for latencies in run.latencies.values())
+    errors = sum(run.errors.values())
+    completed = Contribution.objects.filter(
+        gift_list=gift_list, payment_status=Contribution.PaymentStatus.COMPLETED
+    ).count()
+    delivered = webhooks.stats['latencies_ms']
+    report = {
+        'config': {key: value for key, value in vars(args).items() if key != 'save'},
+        'elapsed_s': round(elapsed, 1),
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 1),
+        'error_rate': round(errors / total, 4) if total else 0,
+        'endpoints': endpoint_report(run, elapsed),
+        'client_lag_ms': {key: round(value, 1) for key, value in summarize(run.lags or [0]).items()},
+        'webhooks': {
+            **{key: value for key, value in webhooks.stats.items() if key != 'latencies_ms'},
+            'drained': drained,
+            **{f'{key}_ms': round(value, 1) for key, value in summarize(delivered or [0]).items()},
+        },
+        'contributions_completed': completed,
+        'lock_waits': sampler.report(),
+    }
+
+    print(f"\n{report['requests']} requests in {report['elapsed_s']}s: "
+          f"{report['throughput_rps']} req/s, error rate {report['error_rate']:.2%}")
+    for name, stats in report['endpoints'].items():
+        print(f"  {name:<22}{stats['requests']:>6} req  {stats['throughput_rps']:>7} req/s  "
+              f"err {stats['error_rate']:>6.2%}  p50 {stats['p50']:>7} ms  p95 {stats['p95']:>7} ms  "
+              f"p99 {stats['p99']:>7} ms")
+    print(f"  client lag p95 {report['client_lag_ms']['p95']} ms")
+    hooks = report['webhooks']
+    print(f"Webhooks: {hooks['delivered']}/{hooks['scheduled']} delivered, {hooks['retries']} retries, "
+          f"{hooks['failed']} failed, p95 {hooks['p95_ms']} ms; {completed} contributions completed")
+    locks = report['lock_waits']
+    if locks['available']:
+        print(f"Lock waits: max {locks['max_waiting']} backends, mean {locks['mean_waiting']}, "
+              f"{locks['share_of_samples_with_waits']:.1%} of samples, {locks['deadlocks']} deadlocks")
+    else:
+        print(f"Lock waits: {locks['reason']}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Saved report to {args.save}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """Views that exceed their @query_budget fail the test instead of logging a warning."""
+    settings.QUERY_BUDGET_STRICT = True
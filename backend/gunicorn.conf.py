@@ -0,0 +1,33 @@
+"""
+Gunicorn configuration.
+
+Sets PROMETHEUS_MULTIPROC_DIR before any worker imports prometheus_client,
+so every worker writes its metrics to files there and /metrics reports the
+sum across workers. The directory is emptied on start, and the files of a
+worker that exits are marked dead so its gauges stop being reported.
+"""
+import os
+import shutil
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 3))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+# Sync workers serve one request per thread; with GUNICORN_THREADS > 1 gunicorn
+# uses gthread. Keep STRIPE_MAX_CONCURRENT_CALLS below workers x threads.
+# uvicorn.workers.UvicornWorker serves mondodoro.asgi (see deploy-guide.md)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/mondodoro-metrics')
+
+
+def on_starting(server):
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
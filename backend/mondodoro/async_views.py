@@ -0,0 +1,57 @@
+"""
+Async variants of the read-only public views.
+
+DRF views are sync-only. Each variant here is a plain Django async view
+that loads its data with the async ORM and renders it with the API's JSON
+renderer, so the body matches the DRF view it stands in for. Requests the
+variant does not serve (writes, OPTIONS, anything carrying credentials)
+fall through to the DRF view on a thread.
+
+URLconfs choose between the two with `public_view()`. ASYNC_PUBLIC_VIEWS is
+meant for the ASGI serving mode (see deploy-guide.md); under WSGI every
+async view would pay for an event loop of its own.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.exceptions import NotFound
+
+from .renderers import FastJSONRenderer
+
+
+def is_anonymous_read(request):
+    return request.method in ('GET', 'HEAD') and 'HTTP_AUTHORIZATION' not in request.META
+
+
+def async_variant(sync_view):
+    """
+    Mark an async view as the variant of `sync_view`.
+
+    The result carries `sync_view`'s attributes (DRF class for the schema,
+    query budget, CSRF exemption) and delegates to it for everything but
+    anonymous reads.
+    """
+    fallback = sync_to_async(sync_view)
+
+    def decorator(async_view):
+        @wraps(sync_view)
+        async def view(request, *args, **kwargs):
+            if is_anonymous_read(request):
+                return await async_view(request, *args, **kwargs)
+            return await fallback(request, *args, **kwargs)
+        return view
+    return decorator
+
+
+def public_view(sync_view, async_view):
+    return async_view if settings.ASYNC_PUBLIC_VIEWS else sync_view
+
+
+def json_response(data, status=200):
+    return HttpResponse(FastJSONRenderer().render(data), content_type='application/json', status=status)
+
+
+def not_found():
+    return json_response({'detail': NotFound.default_detail}, status=404)
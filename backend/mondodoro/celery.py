@@ -0,0 +1,16 @@
+"""
+Celery application for mondodoro.
+
+Background jobs live in each app's ``tasks.py``; periodic ones are scheduled
+through ``CELERY_BEAT_SCHEDULE`` in settings.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mondodoro.settings")
+
+app = Celery("mondodoro")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
@@ -0,0 +1,160 @@
+"""
+Negotiated gzip/brotli compression of API responses.
+
+`CompressionMiddleware` compresses responses under API_COMPRESSION_PATHS
+whose content type is text-like (JSON, CSV exports, ICS feeds) and whose
+body is at least API_COMPRESSION_MIN_SIZE bytes. It picks brotli when the
+client accepts it and the `brotli` package is installed, gzip otherwise.
+Streaming responses (CSV exports, ICS feeds) are compressed chunk by chunk
+and flushed after every chunk, so rows still reach the client as they are
+produced.
+
+Behind the bundled nginx, which already gzips these types (nginx/nginx.conf),
+API_COMPRESSION stays off: nginx compresses outside the Python workers. Turn
+it on where the backend is exposed without a compressing proxy, or to serve
+brotli; nginx passes responses that already carry Content-Encoding through.
+"""
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+GZIP_LEVEL = 6
+# Brotli's default (11) is meant for static files; 4-5 beats gzip -6 at similar CPU
+BROTLI_QUALITY = 4
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+
+def _accepted(accept_encoding):
+    """{coding: q} from an Accept-Encoding header."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding):
+    """The coding to answer with: 'br', 'gzip' or None for identity."""
+    accepted = _accepted(accept_encoding)
+    wildcard = accepted.get('*', 0.0)
+    candidates = [coding for coding in ('br', 'gzip') if coding != 'br' or brotli is not None]
+    best = max(candidates, key=lambda coding: accepted.get(coding, wildcard))
+    return best if accepted.get(best, wildcard) > 0 else None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class StreamCompressor:
+    """Incremental compressor; `chunk()` output is flushed so it can be sent right away."""
+
+    def __init__(self, encoding):
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data):
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def compress_stream(chunks, encoding):
+    compressor = StreamCompressor(encoding)
+    for chunk in chunks:
+        data = compressor.chunk(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, encoding):
+    compressor = StreamCompressor(encoding)
+    async for chunk in chunks:
+        data = compressor.chunk(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """Compress large API responses with the best coding the client accepts."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if (
+            not settings.API_COMPRESSION
+            or not request.path.startswith(tuple(settings.API_COMPRESSION_PATHS))
+            or response.has_header('Content-Encoding')
+            or response.status_code in (204, 206, 304)
+            or not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+        ):
+            return response
+        if not response.streaming and len(response.content) < settings.API_COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The encoded body is no longer byte-identical to what a strong ETag promised
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
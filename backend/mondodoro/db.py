@@ -0,0 +1,45 @@
+"""
+Database settings built from the environment.
+
+`database_config()` turns DATABASE_URL into a DATABASES entry and adds the
+connection handling on top:
+
+- Persistent connections: each worker keeps its connection for
+  `conn_max_age` seconds instead of connecting (and negotiating TLS) on
+  every request. Health checks make Django ping a reused connection at the
+  start of a request and reconnect if the server or a pooler dropped it.
+- `pooler='pgbouncer'` for PgBouncer in transaction pooling mode. Consecutive
+  transactions may run on different server connections, so named
+  server-side cursors (used by `QuerySet.iterator()` on PostgreSQL) are
+  turned off; iterators then fetch their whole result at once. Keep the
+  database's default time zone at UTC: session settings such as the
+  `SET TIME ZONE` Django would otherwise send do not survive transaction
+  pooling.
+
+Under ASGI, keep `conn_max_age` at 0: connections belong to per-request
+threads there and would never be reused.
+"""
+import environ
+from django.core.exceptions import ImproperlyConfigured
+
+POOLERS = ('', 'pgbouncer')
+POSTGRES_ENGINES = ('django.db.backends.postgresql', 'django.db.backends.postgresql_psycopg2')
+
+
+def database_config(url, conn_max_age=0, health_checks=True, pooler='', connect_timeout=None):
+    """Return a DATABASES entry for `url`."""
+    if pooler not in POOLERS:
+        raise ImproperlyConfigured(f"DB_POOLER must be one of {', '.join(repr(p) for p in POOLERS)}, got {pooler!r}")
+
+    db = environ.Env.db_url_config(url)
+    db['CONN_MAX_AGE'] = conn_max_age
+    db['CONN_HEALTH_CHECKS'] = health_checks
+
+    if db['ENGINE'] in POSTGRES_ENGINES:
+        if connect_timeout:
+            db.setdefault('OPTIONS', {})['connect_timeout'] = connect_timeout
+        if pooler == 'pgbouncer':
+            db['DISABLE_SERVER_SIDE_CURSORS'] = True
+    elif pooler:
+        raise ImproperlyConfigured(f'DB_POOLER={pooler} needs a PostgreSQL DATABASE_URL')
+    return db
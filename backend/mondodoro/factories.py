@@ -0,0 +1,54 @@
+"""
+Shared helpers for the per-app factory-boy factories.
+
+All randomness goes through `factory.random.randgen`, so
+`factory.random.reseed_random(seed)` makes generated data reproducible.
+High-volume fields draw from small pre-generated pools instead of calling
+Faker for every row.
+"""
+from datetime import timedelta
+from functools import lru_cache
+
+import factory.random
+from faker import Faker
+from django.utils import timezone
+
+POOL_SIZE = 500
+
+
+def rng():
+    return factory.random.randgen
+
+
+def weighted(distribution):
+    """Pick a key of `distribution` ({value: weight}) at random."""
+    values = list(distribution)
+    weights = list(distribution.values())
+    return lambda: rng().choices(values, weights)[0]
+
+
+def random_datetime(start, end):
+    """Uniformly random datetime between `start` and `end`."""
+    span = max(0, (end - start).total_seconds())
+    return start + timedelta(seconds=rng().uniform(0, span))
+
+
+def random_past_datetime(days):
+    now = timezone.now()
+    return random_datetime(now - timedelta(days=days), now)
+
+
+@lru_cache(maxsize=None)
+def _pool(kind):
+    fake = Faker('it_IT')
+    fake.seed_instance(kind)
+    return tuple(getattr(fake, kind)() for _ in range(POOL_SIZE))
+
+
+def pooled(kind):
+    """Random Faker value (e.g. 'first_name', 'city') from a fixed pool."""
+    return rng().choice(_pool(kind))
+
+
+def random_full_name():
+    return f"{pooled('first_name')} {pooled('last_name')}"
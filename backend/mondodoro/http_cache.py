@@ -0,0 +1,138 @@
+"""
+Version-stamped ETags and shared-cache headers for public endpoints.
+
+A version is a random token kept in the cache under a scope name such as
+`gift_list:<id>`. Signal handlers bump it when data behind the scope
+changes (after the transaction commits). The ETag of a public response
+hashes the versions it depends on with the request path and Accept header,
+so `If-None-Match` is answered with a 304 from one cache lookup, before the
+view reads the database or serializes anything.
+
+Version entries expire after `version_ttl` seconds. That bounds staleness
+for changes no signal sees (pending bookings expiring, reads served by a
+lagging replica); a lost entry only costs clients one full response.
+Versions minted for a request that does not end in a 200 (unknown or
+private list or event) are dropped again, so arbitrary ids cannot fill the
+cache. `If-None-Match: *` is not honoured: it would answer 304 before the
+view checks that the resource exists.
+
+Anonymous GET/HEAD responses get `Cache-Control: public, max-age=0,
+s-maxage=PUBLIC_CACHE_S_MAXAGE`: browsers revalidate every time, while
+the nginx micro-cache (nginx/mondodoro.conf) serves repeats for that long.
+Requests with credentials are passed to the view untouched.
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+
+from .async_views import is_anonymous_read
+
+VERSION_KEY = 'http:version:{scope}'
+# Public payloads show the jeweler's name; profile changes bump this scope
+JEWELERS_SCOPE = 'jewelers'
+
+
+def _keys(scopes):
+    return [VERSION_KEY.format(scope=scope) for scope in scopes]
+
+
+def _new_version():
+    return uuid.uuid4().hex[:16]
+
+
+def get_versions(scopes, timeout):
+    """The versions of `scopes`, minting missing ones, and the keys that were minted."""
+    keys = _keys(scopes)
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout)
+        versions.update(missing)
+    return [versions[key] for key in keys], list(missing)
+
+
+async def aget_versions(scopes, timeout):
+    """Async version of `get_versions()`."""
+    keys = _keys(scopes)
+    versions = await cache.aget_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        await cache.aset_many(missing, timeout)
+        versions.update(missing)
+    return [versions[key] for key in keys], list(missing)
+
+
+def bump_versions(*scopes):
+    """Invalidate the ETags depending on `scopes` once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete_many(_keys(scopes)))
+
+
+def compute_etag(request, versions):
+    parts = [request.get_full_path(), request.META.get('HTTP_ACCEPT', ''), *versions]
+    return '"%s"' % hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
+
+
+def _not_modified(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    # Weak comparison: nginx gzip and CompressionMiddleware weaken the ETag
+    return etag in {tag.removeprefix('W/') for tag in parse_etags(header)}
+
+
+def _finish(response, etag):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=0, s_maxage=settings.PUBLIC_CACHE_S_MAXAGE)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+    return response
+
+
+def public_cache(scopes, version_ttl=None):
+    """
+    Conditional GET and shared-cache headers for a public view.
+
+    `scopes(*args, **kwargs)` receives the URL arguments and returns the
+    version scopes the response depends on. `version_ttl` defaults to
+    PUBLIC_CACHE_VERSION_TTL.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                if not is_anonymous_read(request):
+                    return await view(request, *args, **kwargs)
+                ttl = version_ttl or settings.PUBLIC_CACHE_VERSION_TTL
+                versions, minted = await aget_versions(scopes(*args, **kwargs), ttl)
+                etag = compute_etag(request, versions)
+                if _not_modified(request, etag):
+                    return _finish(HttpResponseNotModified(), etag)
+                response = await view(request, *args, **kwargs)
+                if minted and response.status_code != 200:
+                    await cache.adelete_many(minted)
+                return _finish(response, etag)
+        else:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                if not is_anonymous_read(request):
+                    return view(request, *args, **kwargs)
+                ttl = version_ttl or settings.PUBLIC_CACHE_VERSION_TTL
+                versions, minted = get_versions(scopes(*args, **kwargs), ttl)
+                etag = compute_etag(request, versions)
+                if _not_modified(request, etag):
+                    return _finish(HttpResponseNotModified(), etag)
+                response = view(request, *args, **kwargs)
+                if minted and response.status_code != 200:
+                    # Unknown or private resource: keep no version for it
+                    cache.delete_many(minted)
+                return _finish(response, etag)
+        return wrapper
+    return decorator
@@ -0,0 +1,224 @@
+"""
+Resized renditions of uploaded images (gift list covers, item images, avatars).
+
+Uploads are checked cheaply in the request by `validate_image_upload`: file
+size, format and pixel count come from the file header, nothing is decoded.
+After the row is committed, the signal handlers hand a Celery task (each
+app's ``tasks.py``) to `mondodoro.publisher`, and the worker calls
+`refresh_renditions`, which decodes the original once and writes a WebP and a
+JPEG file for each size in RENDITION_WIDTHS under ``renditions/`` in the
+media storage. EXIF metadata (camera, GPS) is dropped; its orientation is
+applied first.
+
+The rendition list is stored next to the image in a `<field>_renditions`
+JSON field together with the upload it was made from, so a replaced image
+never shows the old renditions. Old files are removed when the new ones are
+stored, and when the row is deleted. `ImageRenditionsField` exposes them to API
+clients as URLs and `srcset` strings; it is null until the worker is done,
+and clients fall back to the original upload. Rendition names carry a random
+token, so nginx serves ``/media/renditions/`` as immutable.
+"""
+import io
+import posixpath
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from PIL import ExifTags, Image, ImageOps
+from rest_framework import serializers
+
+# Maximum width of each size; images are never upscaled
+RENDITION_WIDTHS = {'thumbnail': 240, 'card': 640, 'hero': 1600}
+# (format, extension, save options); clients pick one through <picture>/srcset
+FORMATS = (
+    ('webp', 'webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    ('jpeg', 'jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+)
+FORMAT_KEYS = tuple(key for key, _, _ in FORMATS)
+# MPO is how many phones label their JPEGs
+ALLOWED_FORMATS = ('JPEG', 'MPO', 'PNG', 'WEBP')
+RENDITIONS_DIR = 'renditions'
+# EXIF orientations that swap width and height
+_TRANSPOSED = (5, 6, 7, 8)
+
+
+def validate_image_upload(value):
+    """Reject oversized files, unsupported formats and huge pixel counts without decoding."""
+    if getattr(value, '_committed', False):
+        # Already stored: validated when it was uploaded
+        return
+    if value.size > settings.IMAGE_UPLOAD_MAX_BYTES:
+        raise ValidationError(
+            _('Images can be at most %(size)d MB.'),
+            code='file_too_large',
+            params={'size': settings.IMAGE_UPLOAD_MAX_BYTES // (1024 * 1024)},
+        )
+    position = value.tell()
+    try:
+        value.seek(0)
+        with Image.open(value) as image:
+            image_format, (width, height) = image.format, image.size
+    except (OSError, Image.DecompressionBombError):
+        raise ValidationError(_('Upload a valid image.'), code='invalid_image')
+    finally:
+        value.seek(position)
+    if image_format not in ALLOWED_FORMATS:
+        raise ValidationError(_('Upload a JPEG, PNG or WebP image.'), code='invalid_image_format')
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            _('Images can be at most %(pixels)d megapixels.'),
+            code='image_too_large',
+            params={'pixels': settings.IMAGE_MAX_PIXELS // 1_000_000},
+        )
+
+
+def renditions_attr(field_name):
+    return f'{field_name}_renditions'
+
+
+def current_renditions(instance, field_name):
+    """The stored renditions if they were made from the current upload, else None."""
+    image = getattr(instance, field_name)
+    data = getattr(instance, renditions_attr(field_name)) or {}
+    if image and data.get('source') == image.name:
+        return data
+    return None
+
+
+def needs_renditions(instance, field_name):
+    image = getattr(instance, field_name)
+    data = getattr(instance, renditions_attr(field_name)) or {}
+    return (image.name or '') != data.get('source', '')
+
+
+def _decode(field_file, max_width):
+    """Open the original, decoding JPEGs at the smallest scale that still covers `max_width`."""
+    image = Image.open(field_file)
+    width, height = image.size
+    if image.getexif().get(ExifTags.Base.Orientation) in _TRANSPOSED:
+        width, height = height, width
+    if width > max_width:
+        scale = max_width / width
+        image.draft('RGB', (round(image.size[0] * scale), round(image.size[1] * scale)))
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def _encode(image, options):
+    if options['format'] == 'JPEG' and image.mode == 'RGBA':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    buffer = io.BytesIO()
+    image.save(buffer, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def render_renditions(field_file, sizes):
+    """Write the renditions of `field_file` for the named `sizes` and describe them."""
+    widths = sorted({name: RENDITION_WIDTHS[name] for name in sizes}.items(), key=lambda item: -item[1])
+    stem = posixpath.splitext(field_file.name)[0]
+    token = uuid.uuid4().hex[:8]
+    rendered = {}
+    field_file.open('rb')
+    try:
+        image = _decode(field_file, widths[0][1])
+    finally:
+        field_file.close()
+    previous = None
+    # Largest first, each size resized from the one before
+    for name, max_width in widths:
+        width = min(max_width, image.width)
+        if previous and previous['width'] == width:
+            # Source narrower than this size: reuse the files
+            rendered[name] = previous
+            continue
+        image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        entry = {'width': image.width, 'height': image.height}
+        for key, extension, options in FORMATS:
+            path = f'{RENDITIONS_DIR}/{stem}-{token}-{name}.{extension}'
+            entry[key] = default_storage.save(path, _encode(image, options))
+        rendered[name] = previous = entry
+    return {'source': field_file.name, 'sizes': rendered}
+
+
+def _delete_files(data):
+    paths = {entry[key] for entry in (data or {}).get('sizes', {}).values() for key in FORMAT_KEYS}
+    for path in paths:
+        default_storage.delete(path)
+
+
+def delete_renditions(instance, field_name):
+    """Remove the rendition files of a deleted row once the deletion commits."""
+    data = getattr(instance, renditions_attr(field_name))
+    if data:
+        transaction.on_commit(lambda: _delete_files(data))
+
+
+def refresh_renditions(model, pk, field_name, sizes):
+    """
+    Bring the renditions of `field_name` on row `pk` in line with its upload.
+
+    Renders outside any transaction, then stores the result only if the row
+    still holds the same upload; a newer upload has its own task queued.
+    Returns whether the row was updated.
+    """
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not needs_renditions(instance, field_name):
+        return False
+    image = getattr(instance, field_name)
+    data = render_renditions(image, sizes) if image else {}
+
+    attr = renditions_attr(field_name)
+    with transaction.atomic():
+        locked = model.objects.select_for_update().filter(pk=pk).first()
+        if locked is None or (getattr(locked, field_name).name or '') != (image.name or ''):
+            _delete_files(data)
+            return False
+        old = getattr(locked, attr)
+        setattr(locked, attr, data)
+        # Signal handlers invalidate the cached payloads showing the image
+        locked.save(update_fields=[attr])
+    _delete_files(old)
+    return True
+
+
+class ImageRenditionsField(serializers.Field):
+    """
+    Rendition URLs for the image in `image_field`: `{size: {width, height,
+    webp, jpeg}, 'srcset': {webp, jpeg}}`, or None until they are rendered.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.image_field = image_field
+
+    def _url(self, path):
+        url = default_storage.url(path)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def to_representation(self, instance):
+        data = current_renditions(instance, self.image_field)
+        if not data:
+            return None
+        representation = {}
+        for name, entry in data['sizes'].items():
+            representation[name] = {
+                'width': entry['width'],
+                'height': entry['height'],
+                **{key: self._url(entry[key]) for key in FORMAT_KEYS},
+            }
+        by_width = {entry['width']: entry for entry in representation.values()}
+        representation['srcset'] = {
+            key: ', '.join(f"{by_width[width][key]} {width}w" for width in sorted(by_width))
+            for key in FORMAT_KEYS
+        }
+        return representation
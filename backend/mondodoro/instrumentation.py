@@ -0,0 +1,290 @@
+"""
+Per-request SQL and Stripe instrumentation.
+
+`RequestInstrumentationMiddleware` records, for each request, the number of
+queries, total database time, repeated query fingerprints (the usual sign
+of an N+1) and time spent in Stripe API calls. The numbers are returned in
+a `Server-Timing` header, logged as structured fields on the
+`mondodoro.requests` logger (printed as key=value pairs by
+`RequestLogFormatter`) and exported as Prometheus histograms (see
+`mondodoro.metrics`).
+
+Views declare their expected cost with `@query_budget(...)`. Going over
+budget logs a warning, or raises `QueryBudgetExceeded` when
+QUERY_BUDGET_STRICT is on (the test suite enables it in conftest.py).
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+
+import stripe
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import observe_request, observe_stripe_call
+
+logger = logging.getLogger('mondodoro.requests')
+
+# Fields the middleware passes as `extra`, in the order they are printed
+REQUEST_LOG_FIELDS = (
+    'view', 'status', 'duration_ms', 'db_queries', 'db_ms', 'db_duplicates', 'stripe_calls', 'stripe_ms',
+)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RequestLogFormatter(logging.Formatter):
+    """Append the request fields of a record to its message as key=value pairs."""
+
+    def formatMessage(self, record):
+        message = super().formatMessage(record)
+        fields = ' '.join(
+            f'{name}={getattr(record, name)}' for name in REQUEST_LOG_FIELDS if hasattr(record, name)
+        )
+        return f'{message} {fields}' if fields else message
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.fingerprints = Counter()
+        self.stripe_calls = 0
+        self.stripe_time = 0.0
+
+    @property
+    def duplicates(self):
+        """Fingerprints executed more than once, most repeated first."""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+    @property
+    def duplicate_queries(self):
+        return sum(count - 1 for _, count in self.duplicates)
+
+
+def current_metrics():
+    """Metrics for the request being served, or None outside a request."""
+    return _current.get()
+
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+_LIMIT = re.compile(r'\b(LIMIT|OFFSET) \d+')
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Normalize a SQL statement so the same query with different arguments matches."""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _LIMIT.sub(r'\1 ?', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+        metrics.fingerprints[fingerprint(sql)] += 1
+
+
+def _install_query_recorder(sender=None, connection=None, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install_query_recording():
+    """
+    Record queries on every database connection.
+
+    The wrapper stays installed and is a no-op outside a request. Installing
+    it per connection rather than around each request also covers the
+    threads that run async views' ORM calls.
+    """
+    for connection in connections.all():
+        _install_query_recorder(connection=connection)
+    connection_created.connect(_install_query_recorder, dispatch_uid='mondodoro.instrumentation')
+
+
+def _timed_stripe_call(func):
+    @wraps(func)
+    def wrapper(method, url, *args, **kwargs):
+        metrics = _current.get()
+        start = time.perf_counter()
+        status = error = None
+        try:
+            result = func(method, url, *args, **kwargs)
+            status = result[1]
+            return result
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            observe_stripe_call(method, url, elapsed, status=status, error=error)
+            if metrics is not None:
+                metrics.stripe_calls += 1
+                metrics.stripe_time += elapsed
+    return wrapper
+
+
+def install_stripe_timing():
+    """Wrap the shared Stripe HTTP client so API calls are timed per request."""
+    client = stripe.default_http_client or stripe.new_default_http_client(
+        verify_ssl_certs=stripe.verify_ssl_certs,
+        proxy=stripe.proxy,
+    )
+    if not getattr(client, '_mondodoro_timed', False):
+        client.request_with_retries = _timed_stripe_call(client.request_with_retries)
+        client.request_stream_with_retries = _timed_stripe_call(client.request_stream_with_retries)
+        client._mondodoro_timed = True
+    stripe.default_http_client = client
+
+
+class QueryBudget:
+    def __init__(self, queries=None, db_ms=None, duplicates=None):
+        self.queries = queries
+        self.db_ms = db_ms
+        self.duplicates = duplicates
+
+    def violations(self, metrics):
+        found = []
+        if self.queries is not None and metrics.queries > self.queries:
+            found.append(f'{metrics.queries} queries (budget {self.queries})')
+        if self.db_ms is not None and metrics.db_time * 1000 > self.db_ms:
+            found.append(f'{metrics.db_time * 1000:.1f} ms in the database (budget {self.db_ms} ms)')
+        if self.duplicates is not None and metrics.duplicate_queries > self.duplicates:
+            found.append(f'{metrics.duplicate_queries} repeated queries (budget {self.duplicates})')
+        return found
+
+
+def query_budget(queries=None, db_ms=None, duplicates=None):
+    """
+    Declare the database budget of a view.
+
+    Apply it outermost (above `@api_view`/`@csrf_exempt`), or to a
+    class-based view class.
+
+    The budget is checked when the view returns, so it does not cover the
+    queries a StreamingHttpResponse runs while its body is sent; leave
+    streaming views (CSV exports, ICS feed) without one.
+    """
+    budget = QueryBudget(queries=queries, db_ms=db_ms, duplicates=duplicates)
+
+    def decorator(view):
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+def _view_budget(view_func):
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        budget = getattr(getattr(view_func, 'view_class', None), 'query_budget', None)
+    return budget
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else None
+
+
+class RequestInstrumentationMiddleware:
+    """Collect per-request query and Stripe metrics; enforce view query budgets."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        install_query_recording()
+        install_stripe_timing()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REQUEST_INSTRUMENTATION:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_INSTRUMENTATION:
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    def _finish(self, request, response, metrics):
+        duration = time.perf_counter() - metrics.started
+        total_ms = duration * 1000
+        if settings.SERVER_TIMING_ENABLED:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+                f'dupes;desc="{metrics.duplicate_queries} repeated"',
+                f'stripe;dur={metrics.stripe_time * 1000:.1f};desc="{metrics.stripe_calls} calls"',
+                f'total;dur={total_ms:.1f}',
+            ])
+
+        view = _view_name(request)
+        observe_request(view, request.method, response.status_code, duration, metrics.db_time, metrics.queries)
+        logger.info(
+            "%s %s %s", request.method, request.path, response.status_code,
+            extra={
+                'view': view,
+                'status': response.status_code,
+                'duration_ms': round(total_ms, 1),
+                'db_queries': metrics.queries,
+                'db_ms': round(metrics.db_time * 1000, 1),
+                'db_duplicates': metrics.duplicate_queries,
+                'stripe_calls': metrics.stripe_calls,
+                'stripe_ms': round(metrics.stripe_time * 1000, 1),
+            },
+        )
+
+        budget = getattr(request, '_query_budget', None)
+        if budget is not None:
+            self._check_budget(view or request.path, budget, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = _view_budget(view_func)
+
+    def _check_budget(self, view, budget, metrics):
+        violations = budget.violations(metrics)
+        if not violations:
+            return
+        message = f"Query budget exceeded in {view}: {'; '.join(violations)}"
+        repeated = '\n'.join(f'  {count}× {sql}' for sql, count in metrics.duplicates[:5])
+        if repeated:
+            message += f"\nMost repeated queries:\n{repeated}"
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message, extra={'view': view, 'db_queries': metrics.queries})
@@ -0,0 +1,168 @@
+"""
+Prometheus metrics.
+
+Request latency and database time are recorded by
+`RequestInstrumentationMiddleware`, Stripe calls by the wrapped Stripe HTTP
+client, cache lookups by the caching helpers and webhook lag by the webhook
+views. Queue depths are read from the database when `/metrics` is scraped.
+
+Under gunicorn, gunicorn.conf.py sets PROMETHEUS_MULTIPROC_DIR before the
+workers start: each worker then writes its samples to files in that
+directory and `metrics_view` sums them, so any worker can answer a scrape.
+"""
+import hmac
+import os
+import re
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    'mondodoro_http_request_duration_seconds',
+    'Time to serve a request, by view and status code',
+    ['view', 'method', 'status'],
+)
+REQUEST_DB_TIME = Histogram(
+    'mondodoro_http_request_db_seconds',
+    'Database time spent per request',
+    ['view'],
+)
+REQUEST_DB_QUERIES = Histogram(
+    'mondodoro_http_request_db_queries',
+    'Queries executed per request',
+    ['view'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+CACHE_REQUESTS = Counter(
+    'mondodoro_cache_requests',
+    'Response and token cache lookups by result (hit/miss)',
+    ['cache', 'result'],
+)
+STRIPE_LATENCY = Histogram(
+    'mondodoro_stripe_request_duration_seconds',
+    'Stripe API call latency, by endpoint',
+    ['endpoint'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 80),
+)
+STRIPE_ERRORS = Counter(
+    'mondodoro_stripe_errors',
+    'Failed Stripe API calls, by endpoint and HTTP status or exception',
+    ['endpoint', 'kind'],
+)
+STRIPE_IN_FLIGHT = Gauge(
+    'mondodoro_stripe_calls_in_flight',
+    'Stripe API calls currently running',
+    multiprocess_mode='livesum',
+)
+STRIPE_BULKHEAD_REJECTIONS = Counter(
+    'mondodoro_stripe_bulkhead_rejections',
+    'Requests refused because every Stripe call slot was busy',
+)
+WEBHOOK_LAG = Histogram(
+    'mondodoro_webhook_processing_lag_seconds',
+    'Time from Stripe creating an event to our processing it',
+    ['endpoint', 'type'],
+    buckets=(1, 2, 5, 10, 30, 60, 300, 900, 3600, 21600),
+)
+
+UNMATCHED_VIEW = 'unmatched'
+
+# Object ids in Stripe URLs (/v1/accounts/acct_123) would explode label cardinality
+_STRIPE_ID = re.compile(r'/(?:[a-z]+_)+[A-Za-z0-9]*[A-Z0-9][A-Za-z0-9]*(?=/|$)')
+
+
+def stripe_endpoint(url):
+    path = re.sub(r'^[a-z]+://[^/]+', '', url).split('?', 1)[0]
+    return _STRIPE_ID.sub('/{id}', path)
+
+
+def observe_request(view, method, status, duration, db_time, queries):
+    view = view or UNMATCHED_VIEW
+    REQUEST_LATENCY.labels(view, method, str(status)).observe(duration)
+    REQUEST_DB_TIME.labels(view).observe(db_time)
+    REQUEST_DB_QUERIES.labels(view).observe(queries)
+
+
+def observe_stripe_call(method, url, duration, status=None, error=None):
+    endpoint = f'{method.upper()} {stripe_endpoint(url)}'
+    STRIPE_LATENCY.labels(endpoint).observe(duration)
+    if error is not None:
+        STRIPE_ERRORS.labels(endpoint, type(error).__name__).inc()
+    elif status is not None and status >= 400:
+        STRIPE_ERRORS.labels(endpoint, str(status)).inc()
+
+
+def record_cache_lookup(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def observe_webhook_lag(endpoint, event):
+    created = event.get('created')
+    if created:
+        lag = timezone.now().timestamp() - created
+        WEBHOOK_LAG.labels(endpoint, event.get('type', '')).observe(max(lag, 0))
+
+
+class QueueCollector:
+    """Depth and age of the oldest item of the database-backed queues, read at scrape time."""
+
+    def collect(self):
+        from apps.notifications.models import OutboundEmail
+        from apps.payments.models import WebhookEvent
+
+        queues = {
+            'stripe_webhooks': WebhookEvent.objects.filter(processed=False),
+            'outbound_email': OutboundEmail.objects.filter(
+                status__in=[OutboundEmail.Status.PENDING, OutboundEmail.Status.SENDING],
+            ),
+        }
+        depth = GaugeMetricFamily(
+            'mondodoro_queue_depth', 'Items waiting to be processed', labels=['queue'],
+        )
+        age = GaugeMetricFamily(
+            'mondodoro_queue_oldest_age_seconds', 'Age of the oldest waiting item', labels=['queue'],
+        )
+        now = timezone.now()
+        for name, queryset in queues.items():
+            depth.add_metric([name], queryset.count())
+            oldest = queryset.order_by('created_at').values_list('created_at', flat=True).first()
+            age.add_metric([name], (now - oldest).total_seconds() if oldest else 0)
+        yield depth
+        yield age
+
+
+def render_metrics():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    queues = CollectorRegistry()
+    queues.register(QueueCollector())
+    return generate_latest(registry) + generate_latest(queues)
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, protected by METRICS_TOKEN outside DEBUG."""
+    token = settings.METRICS_TOKEN
+    if not token:
+        # Fail closed: without a token only development servers expose metrics
+        if not settings.DEBUG:
+            raise Http404
+    else:
+        supplied = request.META.get('HTTP_AUTHORIZATION', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return HttpResponse(status=403)
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
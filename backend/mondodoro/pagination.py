@@ -0,0 +1,208 @@
+"""
+Pagination that avoids exact COUNT(*) on large tables.
+
+`EstimatedCountPaginator` reads the row count from planner statistics on
+PostgreSQL and falls back to a capped count elsewhere. Small results (below
+PAGINATION_COUNT_THRESHOLD) are always counted exactly, and callers can ask
+for an exact count with `?exact_count=1`.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+EXACT_COUNT_PARAM = 'exact_count'
+
+
+def wants_exact_count(params):
+    return params.get(EXACT_COUNT_PARAM, '').lower() in ('1', 'true', 'yes')
+
+
+def _postgres_estimate(queryset):
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            # Unfiltered: the table's row estimate maintained by ANALYZE/autovacuum
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+        else:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    value = row[0]
+    if isinstance(value, (str, list)):
+        plan = json.loads(value) if isinstance(value, str) else value
+        value = plan[0]['Plan']['Plan Rows']
+    # reltuples is -1 for tables that have never been analyzed
+    return int(value) if value is not None and value >= 0 else None
+
+
+def estimated_count(queryset, threshold=None):
+    """
+    Return `(count, is_estimate)` for `queryset`.
+
+    Counts below `threshold` are exact. Above it, PostgreSQL returns the
+    planner estimate; other databases stop counting at the threshold.
+    """
+    threshold = threshold or settings.PAGINATION_COUNT_THRESHOLD
+    if connections[queryset.db].vendor == 'postgresql':
+        estimate = _postgres_estimate(queryset.order_by())
+        if estimate is not None and estimate >= threshold:
+            return estimate, True
+        return queryset.count(), False
+
+    capped = queryset.order_by()[:threshold + 1].count()
+    if capped > threshold:
+        return threshold, True
+    return capped, False
+
+
+async def aestimated_count(queryset, threshold=None):
+    """Async version of `estimated_count()`."""
+    threshold = threshold or settings.PAGINATION_COUNT_THRESHOLD
+    if connections[queryset.db].vendor == 'postgresql':
+        estimate = await sync_to_async(_postgres_estimate)(queryset.order_by())
+        if estimate is not None and estimate >= threshold:
+            return estimate, True
+        return await queryset.acount(), False
+
+    capped = await queryset.order_by()[:threshold + 1].acount()
+    if capped > threshold:
+        return threshold, True
+    return capped, False
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose `count` comes from `estimated_count()` unless `exact` is set."""
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, exact=False):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.exact = exact
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if self.exact or not hasattr(self.object_list, 'query'):
+            return Paginator.count.func(self)
+        count, self.count_is_estimate = estimated_count(self.object_list)
+        return count
+
+    def validate_number(self, number):
+        # With an estimated count the last page may lie beyond `num_pages`;
+        # serve whatever the slice returns instead of a 404.
+        self.count
+        if not self.count_is_estimate:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_estimate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+    def _get_page(self, *args, **kwargs):
+        return EstimatedPage(*args, **kwargs)
+
+
+class EstimatedPage(Page):
+
+    def has_next(self):
+        # Past an estimate, a full page is the only hint that more rows follow
+        if self.paginator.count_is_estimate:
+            return len(self.object_list) == self.paginator.per_page
+        return super().has_next()
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """DRF page-number pagination backed by EstimatedCountPaginator."""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.exact_count = wants_exact_count(request.query_params)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async `paginate_queryset()`: counts and fetches the page with the async ORM."""
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.exact_count = wants_exact_count(request.query_params)
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Fill in the cached count so the paginator never counts synchronously
+        if paginator.exact:
+            paginator.count = await queryset.acount()
+        else:
+            paginator.count, paginator.count_is_estimate = await aestimated_count(queryset)
+
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        self.request = request
+        return list(self.page)
+
+    def django_paginator_class(self, object_list, per_page):
+        return EstimatedCountPaginator(object_list, per_page, exact=self.exact_count)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_is_estimate': self.page.paginator.count_is_estimate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_estimate'] = {'type': 'boolean', 'example': False}
+        return response_schema
+
+
+class EstimatedCountAdminMixin:
+    """
+    ModelAdmin mixin for large tables: the changelist uses estimated counts
+    and skips the unfiltered "N total" count. Add `?exact_count=1` to the
+    changelist URL for exact numbers.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def changelist_view(self, request, extra_context=None):
+        # The changelist rejects unknown query parameters, so strip ours first
+        request.exact_count = wants_exact_count(request.GET)
+        if EXACT_COUNT_PARAM in request.GET:
+            params = request.GET.copy()
+            del params[EXACT_COUNT_PARAM]
+            request.GET = params
+        return super().changelist_view(request, extra_context)
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            exact=getattr(request, 'exact_count', False),
+        )
@@ -0,0 +1,71 @@
+"""
+Fire-and-forget Celery publishing from request handlers.
+
+`publish_on_commit(task, *args)` hands the task to a daemon thread once the
+current transaction commits, so the request never waits on the broker. The
+thread publishes with `retry=False`, and CELERY_BROKER_CONNECTION_TIMEOUT
+and CELERY_BROKER_TRANSPORT_OPTIONS keep an unreachable broker from holding
+it for long. Tasks published this way should set `ignore_result=True`:
+otherwise publishing also connects to the result backend, which retries on
+its own.
+
+A kick that cannot be published is logged and dropped, as are kicks beyond
+TASK_PUBLISH_BACKLOG while the broker is slow. Callers need a fallback:
+beat drains the email outbox every EMAIL_OUTBOX_INTERVAL, and images left
+without renditions keep serving the original until `manage.py
+render_image_renditions` renders them.
+"""
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_state = {'pid': None, 'queue': None}
+
+
+def _run(jobs):
+    while True:
+        task, args = jobs.get()
+        try:
+            task.apply_async(args, retry=False)
+        except Exception as e:
+            logger.warning("Could not enqueue %s%r: %s", task.name, args, e)
+        finally:
+            jobs.task_done()
+
+
+def _jobs():
+    """This process's job queue; gunicorn forks workers, and threads do not survive a fork."""
+    pid = os.getpid()
+    if _state['pid'] != pid:
+        with _lock:
+            if _state['pid'] != pid:
+                jobs = queue.Queue(maxsize=settings.TASK_PUBLISH_BACKLOG)
+                threading.Thread(target=_run, args=(jobs,), name='task-publisher', daemon=True).start()
+                _state['queue'], _state['pid'] = jobs, pid
+    return _state['queue']
+
+
+def publish(task, *args):
+    """Queue `task(*args)` for the publisher thread; never blocks."""
+    try:
+        _jobs().put_nowait((task, args))
+    except queue.Full:
+        logger.warning("Task publish backlog full, dropping %s%r", task.name, args)
+
+
+def publish_on_commit(task, *args):
+    """Publish `task(*args)` once the current transaction commits."""
+    transaction.on_commit(lambda: publish(task, *args))
+
+
+def flush():
+    """Wait until every queued publish has been attempted (tests, shutdown hooks)."""
+    if _state['pid'] == os.getpid():
+        _state['queue'].join()
@@ -0,0 +1,75 @@
+"""
+orjson-backed JSON renderer and parser for DRF.
+
+Drop-in replacements for DRF's `JSONRenderer` and `JSONParser`, producing
+and accepting the same JSON. orjson handles str/int/float/bool/None, lists,
+dicts and UUIDs natively; dates, times, Decimals, lazy translations and
+anything else go through DRF's own encoder, so their formatting matches
+(`...Z` for UTC datetimes, raw Decimals as numbers; serializer fields
+already turn Decimals into strings).
+
+Anything orjson cannot represent (integers over 64 bits, pretty-printing
+for the browsable API or `; indent=`, non-UTF-8 request bodies) falls back
+to the stdlib implementation. The one difference left: NaN and infinite
+floats render as null where DRF's strict encoder raises. Without orjson
+installed both classes behave exactly like DRF's.
+"""
+import re
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import json
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_encode_default = JSONEncoder().default
+# orjson reads integers beyond 64 bits as floats; leave bodies that may hold one to the stdlib
+_LONG_DIGIT_RUN = re.compile(rb'\d{19}')
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_encode_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as DRF, keeping the output a strict JavaScript subset
+        for raw, escaped in _LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if orjson is None or not self.strict or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if not _LONG_DIGIT_RUN.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        # Let the stdlib decide, and word the error like DRF does
+        try:
+            return json.loads(body.decode(encoding), parse_constant=json.strict_constant)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,162 @@
+"""
+Read replica routing.
+
+With DATABASE_REPLICA_URL set, the `replica` alias serves reads that can
+tolerate a little replication lag, so public traffic and reports stay off
+the primary that takes checkout writes:
+
+- Views marked `@replica_reads` read from the replica on GET/HEAD requests.
+- Background jobs wrap their reporting queries in `with use_replica():`.
+
+All writes go to the primary. A client that wrote something reads from the
+primary for DB_REPLICA_PIN_SECONDS afterwards, so it sees its own writes.
+Clients are recognised by a cookie and, for API token requests (which
+usually carry no cookies), by their token. Without a replica everything
+reads from the primary.
+"""
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_DB_ALIAS = 'replica'
+PIN_COOKIE = 'mondodoro_primary'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class RoutingState:
+    def __init__(self, replica=False):
+        self.replica = replica
+        self.wrote = False
+
+
+_current = ContextVar('db_routing', default=None)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def use_replica():
+    """Route reads made inside the block to the replica, if one is configured."""
+    token = _current.set(RoutingState(replica=replica_configured()))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def replica_reads(view):
+    """
+    Let GET/HEAD requests to `view` read from the replica.
+
+    Apply it outermost (above `@api_view`/`@csrf_exempt`), or to a
+    class-based view class.
+    """
+    view.replica_reads = True
+    return view
+
+
+def _view_reads_replica(view_func):
+    return getattr(view_func, 'replica_reads', False) or getattr(
+        getattr(view_func, 'view_class', None), 'replica_reads', False
+    )
+
+
+class ReplicaRouter:
+    """Reads go to the replica where `use_replica()` or `@replica_reads` allow it; writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is not None and state.replica:
+            return REPLICA_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DB_ALIAS
+
+
+def _token_pin_key(request):
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    return 'db-primary-pin:' + hashlib.sha256(authorization.encode()).hexdigest()
+
+
+def is_pinned_to_primary(request):
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    key = _token_pin_key(request)
+    return key is not None and cache.get(key) is not None
+
+
+class ReplicaRoutingMiddleware:
+    """Turn on replica reads for `@replica_reads` views; pin clients to the primary after a write."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_configured():
+            return self.get_response(request)
+
+        state = RoutingState()
+        request._db_routing = state
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, state)
+
+    async def __acall__(self, request):
+        if not replica_configured():
+            return await self.get_response(request)
+
+        state = RoutingState()
+        request._db_routing = state
+        token = _current.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, state)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = getattr(request, '_db_routing', None)
+        if state is None or request.method not in SAFE_METHODS or not _view_reads_replica(view_func):
+            return
+        state.replica = not is_pinned_to_primary(request)
+
+    def _finish(self, request, response, state):
+        if state.wrote:
+            seconds = settings.DB_REPLICA_PIN_SECONDS
+            response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+            key = _token_pin_key(request)
+            if key is not None:
+                cache.set(key, 1, seconds)
+        return response
@@ -13,10 +13,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import os
 from pathlib import Path
 from decouple import config, Csv
-try:
-    import dj_database_url
-except ImportError:
-    dj_database_url = None
+
+from mondodoro.db import database_config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,6 +36,8 @@ STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY', default='')
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='')
 STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET', default='')
 STRIPE_EVENTS_WEBHOOK_SECRET = config('STRIPE_EVENTS_WEBHOOK_SECRET', default='')
+# Override the Stripe API host, e.g. the fake server used by load tests (benchmarks.fake_stripe)
+STRIPE_API_BASE = config('STRIPE_API_BASE', default='')
 BASE_URL = config('BASE_URL', default='https://www.listdreams.it')
 FRONTEND_URL = config('FRONTEND_URL', default='https://www.listdreams.it')
 
@@ -49,6 +49,17 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='ListDreams <noreply@listdreams.it>')
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
+
+# Email outbox: messages are queued and sent by the send_outbox Celery task.
+# Failed sends are retried after EMAIL_OUTBOX_RETRY_BACKOFF seconds, doubling
+# on each attempt, up to EMAIL_OUTBOX_MAX_ATTEMPTS.
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=6, cast=int)
+EMAIL_OUTBOX_RETRY_BACKOFF = config('EMAIL_OUTBOX_RETRY_BACKOFF', default=60, cast=int)
+
+# Jewelers get one activity digest (contributions, bookings) per window
+NOTIFICATIONS_DIGEST_MINUTES = config('NOTIFICATIONS_DIGEST_MINUTES', default=60, cast=int)
 
 
 # Application definition
@@ -73,9 +84,14 @@ INSTALLED_APPS = [
     "apps.gift_lists.apps.GiftListsConfig",
     "apps.payments.apps.PaymentsConfig",
     "apps.events.apps.EventsConfig",
+    "apps.notifications.apps.NotificationsConfig",
+    "apps.analytics.apps.AnalyticsConfig",
 ]
 
 MIDDLEWARE = [
+    "mondodoro.instrumentation.RequestInstrumentationMiddleware",
+    "mondodoro.compression.CompressionMiddleware",
+    "mondodoro.routers.ReplicaRoutingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -87,6 +103,48 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# WhiteNoise is sync-only: under ASGI it would move every request onto a
+# thread. Turn it off there and let nginx serve /static/.
+SERVE_STATIC = config('SERVE_STATIC', default=True, cast=bool)
+if not SERVE_STATIC:
+    MIDDLEWARE.remove("whitenoise.middleware.WhiteNoiseMiddleware")
+
+# Route the public gift list, public event and gallery endpoints to their
+# async variants (mondodoro/async_views.py). Meant for the ASGI serving mode.
+ASYNC_PUBLIC_VIEWS = config('ASYNC_PUBLIC_VIEWS', default=False, cast=bool)
+
+# gzip/brotli for API responses of at least API_COMPRESSION_MIN_SIZE bytes
+# (mondodoro/compression.py). Off by default: nginx already gzips them, outside
+# the Python workers. Enable when serving without a compressing proxy.
+API_COMPRESSION = config('API_COMPRESSION', default=False, cast=bool)
+API_COMPRESSION_PATHS = config('API_COMPRESSION_PATHS', default='/api/', cast=Csv())
+API_COMPRESSION_MIN_SIZE = config('API_COMPRESSION_MIN_SIZE', default=1024, cast=int)
+
+# Public list/event/gallery responses (mondodoro/http_cache.py): seconds
+# shared caches such as the nginx micro-cache may reuse them, and the upper
+# bound on how long a version-stamped ETag outlives changes no signal sees.
+PUBLIC_CACHE_S_MAXAGE = config('PUBLIC_CACHE_S_MAXAGE', default=2, cast=int)
+PUBLIC_CACHE_VERSION_TTL = config('PUBLIC_CACHE_VERSION_TTL', default=60, cast=int)
+
+# Per-request query/Stripe metrics (Server-Timing header + mondodoro.requests log).
+# Views over their @query_budget log a warning, or raise when strict (tests).
+REQUEST_INSTRUMENTATION = config('REQUEST_INSTRUMENTATION', default=True, cast=bool)
+SERVER_TIMING_ENABLED = config('SERVER_TIMING_ENABLED', default=True, cast=bool)
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=False, cast=bool)
+
+# Bulkhead for request-path Stripe calls (apps/payments/bulkhead.py): concurrent
+# calls across all workers, kept below GUNICORN_WORKERS x GUNICORN_THREADS;
+# seconds a request waits for a free slot before answering 503; seconds a
+# slot outlives a worker killed mid-call (above stripe-python's 80 s timeout).
+STRIPE_MAX_CONCURRENT_CALLS = config('STRIPE_MAX_CONCURRENT_CALLS', default=2, cast=int)
+STRIPE_BULKHEAD_WAIT = config('STRIPE_BULKHEAD_WAIT', default=2.0, cast=float)
+STRIPE_BULKHEAD_LEASE = config('STRIPE_BULKHEAD_LEASE', default=90, cast=int)
+
+# Prometheus scrape endpoint (/metrics). Scrapers must send
+# "Authorization: Bearer <token>"; without a token /metrics answers 404
+# unless DEBUG is on. nginx does not route /metrics publicly either.
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
 ROOT_URLCONF = "mondodoro.urls"
 
 TEMPLATES = [
@@ -111,47 +169,47 @@ WSGI_APPLICATION = "mondodoro.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-if dj_database_url:
-    DATABASES = {
-        'default': dj_database_url.config(
-            default=config('DATABASE_URL', default='sqlite:///' + str(BASE_DIR / 'db.sqlite3'))
-        )
-    }
-else:
-    # Fallback database configuration
-    DATABASE_URL = config('DATABASE_URL', default='sqlite:///' + str(BASE_DIR / 'db.sqlite3'))
-    if 'postgresql://' in DATABASE_URL:
-        # Parse PostgreSQL URL manually
-        import re
-        match = re.match(r'postgresql://([^:]+):([^@]+)@([^:]+):(\d+)/(.+)', DATABASE_URL)
-        if match:
-            user, password, host, port, name = match.groups()
-            DATABASES = {
-                'default': {
-                    'ENGINE': 'django.db.backends.postgresql',
-                    'NAME': name,
-                    'USER': user,
-                    'PASSWORD': password,
-                    'HOST': host,
-                    'PORT': port,
-                }
-            }
-        else:
-            # Default SQLite
-            DATABASES = {
-                'default': {
-                    'ENGINE': 'django.db.backends.sqlite3',
-                    'NAME': BASE_DIR / 'db.sqlite3',
-                }
-            }
-    else:
-        # Default SQLite
-        DATABASES = {
-            'default': {
-                'ENGINE': 'django.db.backends.sqlite3',
-                'NAME': BASE_DIR / 'db.sqlite3',
-            }
-        }
+# Connections persist for DB_CONN_MAX_AGE seconds (0 = reconnect on every
+# request, required under ASGI) and are health-checked before reuse.
+# DB_POOLER=pgbouncer adapts to PgBouncer transaction pooling (mondodoro/db.py).
+DATABASES = {
+    'default': database_config(
+        config('DATABASE_URL', default='sqlite:///' + str(BASE_DIR / 'db.sqlite3')),
+        conn_max_age=config('DB_CONN_MAX_AGE', default=60, cast=int),
+        health_checks=config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        pooler=config('DB_POOLER', default=''),
+        connect_timeout=config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+    )
+}
+
+# Optional read replica for public pages, exports and reporting jobs
+# (mondodoro/routers.py). Clients that wrote read from the primary for
+# DB_REPLICA_PIN_SECONDS afterwards; keep it above the usual replication lag.
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = database_config(
+        DATABASE_REPLICA_URL,
+        conn_max_age=DATABASES['default']['CONN_MAX_AGE'],
+        health_checks=DATABASES['default']['CONN_HEALTH_CHECKS'],
+        pooler=config('DB_POOLER', default=''),
+        connect_timeout=config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['mondodoro.routers.ReplicaRouter']
+DB_REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=15, cast=int)
+
+
+# API token authentication
+# Tokens expire AUTH_TOKEN_TTL_HOURS after issue, counted from login, not last
+# use (0 = never, the default). Enabling it logs out every token older than
+# the TTL at once (see deploy-guide.md). Token->user lookups are cached per
+# process for AUTH_TOKEN_LOCAL_CACHE_TTL seconds and in the shared cache for
+# AUTH_TOKEN_CACHE_TTL seconds.
+AUTH_TOKEN_TTL_HOURS = config('AUTH_TOKEN_TTL_HOURS', default=0, cast=int)
+AUTH_TOKEN_CACHE_TTL = config('AUTH_TOKEN_CACHE_TTL', default=300, cast=int)
+AUTH_TOKEN_LOCAL_CACHE_TTL = config('AUTH_TOKEN_LOCAL_CACHE_TTL', default=5, cast=int)
+AUTH_TOKEN_LOCAL_CACHE_SIZE = config('AUTH_TOKEN_LOCAL_CACHE_SIZE', default=1024, cast=int)
+AUTH_TOKEN_LAST_USED_INTERVAL = config('AUTH_TOKEN_LAST_USED_INTERVAL', default=300, cast=int)
 
 
 # Authentication backends
@@ -202,24 +260,60 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Outside development, collectstatic writes content-hashed copies plus .gz
+# and .br variants and a manifest that {% static %} resolves through. Hashed
+# URLs are served with "immutable" far-future caching by WhiteNoise and by
+# nginx (nginx/mondodoro.conf). Needs collectstatic to run with the same setting.
+STATIC_COMPRESSED_MANIFEST = config('STATIC_COMPRESSED_MANIFEST', default=not DEBUG, cast=bool)
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "whitenoise.storage.CompressedManifestStaticFilesStorage" if STATIC_COMPRESSED_MANIFEST
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        ),
+    },
+}
+
 # Media files
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploaded covers, item images and avatars: checked in the request against
+# these limits, then resized into renditions by a worker (mondodoro/images.py)
+IMAGE_UPLOAD_MAX_BYTES = config('IMAGE_UPLOAD_MAX_BYTES', default=15 * 1024 * 1024, cast=int)
+IMAGE_MAX_PIXELS = config('IMAGE_MAX_PIXELS', default=50_000_000, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Django REST Framework
+# List counts above this many rows are estimated (planner statistics on
+# PostgreSQL, a capped count elsewhere) unless ?exact_count=1 is passed
+PAGINATION_COUNT_THRESHOLD = config('PAGINATION_COUNT_THRESHOLD', default=10000, cast=int)
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'apps.accounts.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # orjson-backed drop-ins for DRF's JSON renderer/parser (mondodoro/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'mondodoro.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'mondodoro.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'mondodoro.pagination.EstimatedCountPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_FILTER_BACKENDS': [
@@ -277,6 +371,39 @@ SPECTACULAR_SETTINGS = {
 # Celery Configuration
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = config('REDIS_URL', default='redis://localhost:6379/0')
+CELERY_TIMEZONE = 'Europe/Rome'
+# Requests kick tasks from a background thread (mondodoro/publisher.py); with
+# the broker down, a publish gives up after this many seconds instead of
+# retrying. At most TASK_PUBLISH_BACKLOG kicks wait per process.
+CELERY_BROKER_CONNECTION_TIMEOUT = config('CELERY_BROKER_CONNECTION_TIMEOUT', default=2, cast=float)
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'max_retries': 0,
+    'socket_connect_timeout': CELERY_BROKER_CONNECTION_TIMEOUT,
+}
+TASK_PUBLISH_BACKLOG = config('TASK_PUBLISH_BACKLOG', default=100, cast=int)
+CELERY_BEAT_SCHEDULE = {
+    'events-process-waitlist': {
+        'task': 'apps.events.tasks.process_waitlist',
+        'schedule': config('EVENTS_WAITLIST_INTERVAL', default=60, cast=int),
+    },
+    'notifications-send-outbox': {
+        'task': 'apps.notifications.tasks.send_outbox',
+        'schedule': config('EMAIL_OUTBOX_INTERVAL', default=30, cast=int),
+    },
+    'analytics-rollup-daily-stats': {
+        'task': 'apps.analytics.tasks.rollup_daily_stats',
+        'schedule': config('ANALYTICS_ROLLUP_INTERVAL', default=900, cast=int),
+    },
+    'notifications-send-digests': {
+        'task': 'apps.notifications.tasks.send_digests',
+        # Runs often; the task itself waits for a full digest window
+        'schedule': 300,
+    },
+}
+
+# Platform KPI rollup (apps.analytics.tasks.rollup_daily_stats, scheduled
+# above): each run recomputes this many past days besides today
+ANALYTICS_ROLLUP_LOOKBACK_DAYS = config('ANALYTICS_ROLLUP_LOOKBACK_DAYS', default=2, cast=int)
 
 # Time Zone
 TIME_ZONE = 'Europe/Rome'
@@ -289,10 +416,20 @@ LANGUAGE_CODE = 'it-it'
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        # "GET /api/... 200 view=... duration_ms=... db_queries=..." (mondodoro/instrumentation.py)
+        'request_fields': {
+            '()': 'mondodoro.instrumentation.RequestLogFormatter',
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
         },
+        'requests_console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'request_fields',
+        },
     },
     'root': {
         'handlers': ['console'],
@@ -304,6 +441,22 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'mondodoro.requests': {
+            'handlers': ['requests_console'],
+            'level': config('REQUEST_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+        # factory-boy and Faker log every value they generate at DEBUG
+        'factory': {
+            'level': 'WARNING',
+        },
+        'faker': {
+            'level': 'WARNING',
+        },
+        # Pillow logs every plugin import and EXIF tag at DEBUG (image worker)
+        'PIL': {
+            'level': 'WARNING',
+        },
     },
 }
 
@@ -337,15 +490,35 @@ X_FRAME_OPTIONS = 'DENY'
 
 # Prevent host header attacks
 
-# Rate limiting cache backend
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+# Cache backend (rate limiting, public payload caches)
+# Per-process memory by default; set CACHE_URL (e.g. redis://redis:6379/1) so
+# every gunicorn worker shares the cache and sees invalidations.
+CACHE_URL = config('CACHE_URL', default='')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+        }
+    }
+
+# Max age (seconds) of the cached public event payload
+EVENTS_PUBLIC_CACHE_TTL = config('EVENTS_PUBLIC_CACHE_TTL', default=15, cast=int)
+
+# Minutes a promoted waitlist guest has to complete the booking
+EVENTS_WAITLIST_HOLD_MINUTES = config('EVENTS_WAITLIST_HOLD_MINUTES', default=30, cast=int)
+
+# How far back (days) the jeweler ICS feed lists past events
+EVENTS_CALENDAR_PAST_DAYS = config('EVENTS_CALENDAR_PAST_DAYS', default=90, cast=int)
 
 # Ratelimit settings
 RATELIMIT_USE_CACHE = 'default'
-RATELIMIT_ENABLE = True
+RATELIMIT_ENABLE = config('RATELIMIT_ENABLE', default=True, cast=bool)
 RATELIMIT_VIEW = 'django_ratelimit.views.ratelimited'
@@ -0,0 +1,583 @@
+"""
+Tests for project-level infrastructure: pagination, request instrumentation,
+Prometheus metrics, database configuration and routing, JSON rendering,
+response compression and public HTTP caching.
+"""
+import gzip
+import io
+import logging
+import uuid
+import zlib
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+import brotli
+from asgiref.sync import async_to_sync
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.paginator import EmptyPage, PageNotAnInteger
+from django.db import router
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from prometheus_client import REGISTRY
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.models import User
+from apps.events.models import Event
+from apps.payments.models import WebhookEvent
+from .compression import CompressionMiddleware, choose_encoding
+from .db import database_config
+from .http_cache import VERSION_KEY, bump_versions, public_cache
+from .instrumentation import (
+    QueryBudgetExceeded, RequestInstrumentationMiddleware, _timed_stripe_call,
+    current_metrics, fingerprint, query_budget,
+)
+from .metrics import stripe_endpoint
+from .pagination import EstimatedCountPaginator, estimated_count
+from .renderers import FastJSONParser, FastJSONRenderer
+from .routers import PIN_COOKIE, ReplicaRoutingMiddleware, replica_reads, use_replica
+
+
+def make_user(email, role='jeweler', password='TestPass123!'):
+    return User.objects.create_user(
+        username=email.split('@')[0],
+        email=email,
+        password=password,
+        first_name='Test',
+        last_name='User',
+        role=role,
+        business_name='Gioielleria Test' if role == 'jeweler' else None,
+    )
+
+
+def auth_client(user):
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+def make_webhook_events(count):
+    WebhookEvent.objects.bulk_create([
+        WebhookEvent(stripe_event_id=f'evt_{i}', event_type='payment_intent.succeeded', data={})
+        for i in range(count)
+    ])
+
+
+@override_settings(PAGINATION_COUNT_THRESHOLD=5)
+class EstimatedCountTests(TestCase):
+
+    def test_small_results_are_exact(self):
+        make_webhook_events(3)
+        self.assertEqual(estimated_count(WebhookEvent.objects.all()), (3, False))
+
+    def test_large_results_are_capped(self):
+        make_webhook_events(12)
+        self.assertEqual(estimated_count(WebhookEvent.objects.all()), (5, True))
+
+    def test_paginator_exact_mode(self):
+        make_webhook_events(12)
+        paginator = EstimatedCountPaginator(WebhookEvent.objects.order_by('id'), 4, exact=True)
+        self.assertEqual(paginator.count, 12)
+        self.assertFalse(paginator.count_is_estimate)
+
+    def test_pages_past_estimate_are_served(self):
+        make_webhook_events(10)
+        paginator = EstimatedCountPaginator(WebhookEvent.objects.order_by('id'), 4)
+        self.assertEqual(paginator.num_pages, 2)
+        page = paginator.page(3)
+        self.assertEqual(len(page.object_list), 2)
+        self.assertFalse(page.has_next())
+        self.assertTrue(paginator.page(2).has_next())
+
+    def test_invalid_page_numbers_past_estimate(self):
+        make_webhook_events(10)
+        paginator = EstimatedCountPaginator(WebhookEvent.objects.order_by('id'), 4)
+        for number in ('abc', '1.5', 1.5, None):
+            with self.subTest(number=number):
+                with self.assertRaises(PageNotAnInteger):
+                    paginator.page(number)
+        self.assertTrue(paginator.count_is_estimate)
+        for number in (0, '-1'):
+            with self.subTest(number=number):
+                with self.assertRaises(EmptyPage):
+                    paginator.page(number)
+
+
+@override_settings(PAGINATION_COUNT_THRESHOLD=5)
+class EstimatedCountPaginationApiTests(TestCase):
+
+    def setUp(self):
+        self.jeweler = make_user('pagination@test.com')
+        self.client = auth_client(self.jeweler)
+        for i in range(8):
+            Event.objects.create(
+                jeweler=self.jeweler,
+                title=f'Evento {i}',
+                date=date.today() + timedelta(days=i),
+                status=Event.Status.ACTIVE,
+            )
+
+    def test_list_reports_estimate(self):
+        response = self.client.get('/api/events/')
+        self.assertEqual(response.data['count'], 5)
+        self.assertTrue(response.data['count_is_estimate'])
+
+    def test_exact_count_on_request(self):
+        response = self.client.get('/api/events/?exact_count=1')
+        self.assertEqual(response.data['count'], 8)
+        self.assertFalse(response.data['count_is_estimate'])
+
+    def test_invalid_page_is_not_found(self):
+        for page in ('abc', '1.5', '0'):
+            with self.subTest(page=page):
+                response = self.client.get(f'/api/events/?page={page}')
+                self.assertEqual(response.status_code, 404)
+
+
+@override_settings(PAGINATION_COUNT_THRESHOLD=5)
+class EstimatedCountAdminTests(TestCase):
+
+    def setUp(self):
+        admin = User.objects.create_superuser(
+            username='admin@test.com', email='admin@test.com', password='TestPass123!',
+            first_name='Admin', last_name='User',
+        )
+        self.client.force_login(admin)
+        self.url = reverse('admin:payments_webhookevent_changelist')
+        make_webhook_events(12)
+
+    def test_changelist_uses_estimate(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 5)
+
+    def test_exact_count_param_is_accepted(self):
+        response = self.client.get(self.url, {'exact_count': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 12)
+
+
+class FingerprintTests(TestCase):
+
+    def test_in_lists_and_limits_collapse(self):
+        a = fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 21')
+        b = fingerprint('SELECT  *\nFROM t WHERE id IN (%s) LIMIT 100')
+        self.assertEqual(a, b)
+        self.assertEqual(a, 'SELECT * FROM t WHERE id IN (...) LIMIT ?')
+
+
+class RequestInstrumentationTests(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def _run(self, view):
+        middleware = RequestInstrumentationMiddleware(lambda request: view(request))
+        request = self.factory.get('/api/test/')
+        middleware.process_view(request, view, (), {})
+        return middleware(request)
+
+    def _querying_view(self, count):
+        def view(request):
+            for _ in range(count):
+                list(User.objects.filter(pk=1))
+            return HttpResponse('ok')
+        return view
+
+    def test_server_timing_header(self):
+        response = self._run(self._querying_view(3))
+        header = response['Server-Timing']
+        self.assertIn('desc="3 queries"', header)
+        self.assertIn('desc="2 repeated"', header)
+        self.assertIn('total;dur=', header)
+
+    def test_structured_log_fields(self):
+        with self.assertLogs('mondodoro.requests', level='INFO') as logs:
+            self._run(self._querying_view(2))
+        record = logs.records[0]
+        self.assertEqual(record.db_queries, 2)
+        self.assertEqual(record.db_duplicates, 1)
+        self.assertEqual(record.status, 200)
+
+    def test_log_handler_prints_fields(self):
+        with self.assertLogs('mondodoro.requests', level='INFO') as logs:
+            self._run(self._querying_view(2))
+        # Format with the handler LOGGING installs on the logger
+        handler, = logging.getLogger('mondodoro.requests').handlers
+        line = handler.format(logs.records[0])
+        self.assertRegex(line, r'^GET \S+ 200 view=\S+ status=200 duration_ms=[\d.]+ db_queries=2 ')
+        self.assertIn(' db_duplicates=1 stripe_calls=0 stripe_ms=0.0', line)
+
+    def test_over_budget_raises_when_strict(self):
+        view = query_budget(queries=1)(self._querying_view(3))
+        with self.assertRaisesMessage(QueryBudgetExceeded, '3 queries (budget 1)'):
+            self._run(view)
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_over_budget_logs_warning(self):
+        view = query_budget(duplicates=0)(self._querying_view(2))
+        with self.assertLogs('mondodoro.requests', level='WARNING') as logs:
+            response = self._run(view)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('1 repeated queries (budget 0)', logs.output[-1])
+
+    def test_within_budget(self):
+        view = query_budget(queries=3, duplicates=2)(self._querying_view(3))
+        self.assertEqual(self._run(view).status_code, 200)
+
+    def test_stripe_calls_are_timed(self):
+        fake_request = _timed_stripe_call(lambda *args: ('{}', 200, {}))
+
+        def view(request):
+            fake_request('get', 'https://api.stripe.com/v1/accounts', {})
+            fake_request('get', 'https://api.stripe.com/v1/accounts', {})
+            self.assertEqual(current_metrics().stripe_calls, 2)
+            return HttpResponse('ok')
+
+        response = self._run(view)
+        self.assertIn('desc="2 calls"', response['Server-Timing'])
+
+    @override_settings(REQUEST_INSTRUMENTATION=False)
+    def test_disabled(self):
+        response = self._run(self._querying_view(1))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_budgets_apply_to_api_views(self):
+        user = make_user('budget@example.com')
+        response = auth_client(user).get(reverse('accounts:me'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Server-Timing', response)
+
+
+class MetricsTests(TestCase):
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_requests_are_observed_per_view_and_status(self):
+        user = make_user('metrics@example.com')
+        labels = {'view': 'accounts:me', 'method': 'GET', 'status': '200'}
+        before = self.sample('mondodoro_http_request_duration_seconds_count', **labels)
+        auth_client(user).get(reverse('accounts:me'))
+        self.assertEqual(self.sample('mondodoro_http_request_duration_seconds_count', **labels), before + 1)
+        self.assertGreater(self.sample('mondodoro_http_request_db_queries_sum', view='accounts:me'), 0)
+
+    def test_stripe_latency_and_errors(self):
+        endpoint = 'POST /v1/accounts/{id}/login_links'
+        failing = _timed_stripe_call(lambda *args: ('{}', 402, {}))
+        before = self.sample('mondodoro_stripe_errors_total', endpoint=endpoint, kind='402')
+        failing('post', 'https://api.stripe.com/v1/accounts/acct_1Abc/login_links', {})
+        self.assertEqual(self.sample('mondodoro_stripe_errors_total', endpoint=endpoint, kind='402'), before + 1)
+        self.assertGreater(self.sample('mondodoro_stripe_request_duration_seconds_count', endpoint=endpoint), 0)
+
+    def test_stripe_endpoint_drops_object_ids(self):
+        self.assertEqual(
+            stripe_endpoint('https://api.stripe.com/v1/checkout/sessions/cs_test_a1B2?expand[]=x'),
+            '/v1/checkout/sessions/{id}',
+        )
+        self.assertEqual(stripe_endpoint('https://api.stripe.com/v1/payment_intents'), '/v1/payment_intents')
+
+    def test_public_event_cache_lookups(self):
+        from apps.events.cache import get_public_event_payload
+        misses = self.sample('mondodoro_cache_requests_total', cache='public_event', result='miss')
+        get_public_event_payload(999999)
+        self.assertEqual(self.sample('mondodoro_cache_requests_total', cache='public_event', result='miss'), misses + 1)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_endpoint_exposes_queue_depth(self):
+        WebhookEvent.objects.create(stripe_event_id='evt_pending', event_type='account.updated', data={})
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('mondodoro_queue_depth{queue="stripe_webhooks"} 1.0', body)
+        self.assertIn('mondodoro_http_request_duration_seconds_bucket', body)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_endpoint_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_endpoint_hidden_without_token(self):
+        with override_settings(DEBUG=False):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+class DatabaseConfigTests(TestCase):
+
+    def test_postgres_url(self):
+        db = database_config('postgresql://user:pw@db:5432/mondodoro', conn_max_age=60, connect_timeout=5)
+        self.assertEqual(db['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((db['NAME'], db['HOST'], db['PORT']), ('mondodoro', 'db', 5432))
+        self.assertEqual(db['CONN_MAX_AGE'], 60)
+        self.assertTrue(db['CONN_HEALTH_CHECKS'])
+        self.assertEqual(db['OPTIONS']['connect_timeout'], 5)
+        self.assertNotIn('DISABLE_SERVER_SIDE_CURSORS', db)
+
+    def test_pgbouncer_disables_server_side_cursors(self):
+        db = database_config('postgresql://user:pw@pgbouncer:6432/mondodoro', pooler='pgbouncer')
+        self.assertTrue(db['DISABLE_SERVER_SIDE_CURSORS'])
+
+    def test_sqlite_url(self):
+        db = database_config('sqlite:////tmp/mondodoro.sqlite3', connect_timeout=5)
+        self.assertEqual(db['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(db['NAME'], '/tmp/mondodoro.sqlite3')
+        self.assertNotIn('connect_timeout', db.get('OPTIONS', {}))
+
+    def test_rejects_invalid_pooler(self):
+        with self.assertRaises(ImproperlyConfigured):
+            database_config('postgresql://db/mondodoro', pooler='pgpool')
+        with self.assertRaises(ImproperlyConfigured):
+            database_config('sqlite:////tmp/mondodoro.sqlite3', pooler='pgbouncer')
+
+
+@replica_reads
+def replica_probe_view(request):
+    return HttpResponse(Event.objects.all().db)
+
+
+def writing_view(request):
+    User.objects.filter(pk=0).update(first_name='x')
+    return HttpResponse(Event.objects.all().db)
+
+
+class ReplicaRoutingTests(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        cache.clear()
+
+    def serve(self, view, method='get', **extra):
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+        middleware = ReplicaRoutingMiddleware(get_response)
+        return middleware(getattr(self.factory, method)('/probe', **extra))
+
+    def test_primary_only_without_replica(self):
+        with use_replica():
+            self.assertEqual(Event.objects.all().db, 'default')
+        response = self.serve(writing_view, 'post')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    @mock.patch('mondodoro.routers.replica_configured', return_value=True)
+    def test_use_replica_routes_reads_only(self, _):
+        self.assertEqual(Event.objects.all().db, 'default')
+        with use_replica():
+            self.assertEqual(Event.objects.all().db, 'replica')
+            self.assertEqual(router.db_for_write(Event), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'events'))
+
+    @mock.patch('mondodoro.routers.replica_configured', return_value=True)
+    def test_marked_views_read_from_replica_on_get(self, _):
+        self.assertEqual(self.serve(replica_probe_view).content, b'replica')
+        self.assertEqual(self.serve(replica_probe_view, 'post').content, b'default')
+        self.assertEqual(self.serve(writing_view).content, b'default')
+
+    @mock.patch('mondodoro.routers.replica_configured', return_value=True)
+    def test_write_pins_cookie_client_to_primary(self, _):
+        response = self.serve(writing_view, 'post')
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 15)
+        self.factory.cookies[PIN_COOKIE] = '1'
+        self.assertEqual(self.serve(replica_probe_view).content, b'default')
+
+    @mock.patch('mondodoro.routers.replica_configured', return_value=True)
+    def test_write_pins_token_client_to_primary(self, _):
+        self.serve(writing_view, 'post', HTTP_AUTHORIZATION='Token abc')
+        self.assertEqual(self.serve(replica_probe_view, HTTP_AUTHORIZATION='Token abc').content, b'default')
+        self.assertEqual(self.serve(replica_probe_view, HTTP_AUTHORIZATION='Token other').content, b'replica')
+
+
+class FastJSONTests(TestCase):
+
+    def assertRendersLikeDRF(self, data, media_type=None):
+        expected = JSONRenderer().render(data, media_type)
+        self.assertEqual(FastJSONRenderer().render(data, media_type), expected)
+
+    def test_output_matches_drf(self):
+        self.assertRendersLikeDRF({
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'amount': Decimal('50.10'),
+            'amount_str': '50.10',
+            'utc': datetime(2024, 6, 1, 12, 30, 5, 123456, tzinfo=dt_timezone.utc),
+            'offset': datetime(2024, 6, 1, 12, 30, tzinfo=dt_timezone(timedelta(hours=2))),
+            'naive': datetime(2024, 6, 1, 12, 30),
+            'date': date(2024, 6, 1),
+            'time': time(18, 45, 0, 500),
+            'duration': timedelta(minutes=90),
+            'label': gettext_lazy('Annulla'),
+            'text': 'Caffè \u2028 ☕',
+            'counts': {1: 'uno', 2: 'due'},
+            'nested': [{'ok': True, 'none': None, 'ratio': 0.1}, (1, 2)],
+        })
+
+    def test_falls_back_where_orjson_cannot(self):
+        self.assertRendersLikeDRF({'big': 2 ** 70})
+        self.assertRendersLikeDRF({'a': [1, 2]}, 'application/json; indent=4')
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_api_responses_match_drf(self):
+        from apps.analytics.rollups import rollup_platform_stats
+        admin = make_user('admin@example.com', role='superadmin')
+        admin.is_superuser = True
+        admin.save()
+        make_user('orafo@example.com')
+        rollup_platform_stats()
+        client = auth_client(admin)
+        response = client.get('/api/analytics/kpi/summary/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_parser_matches_drf(self):
+        body = '{"amount": "50.00", "name": "Caffè", "n": 123456789012345678901234, "x": [1.5, null]}'.encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+    def test_parser_errors_match_drf(self):
+        for body in (b'{"amount": ', b'{"amount": NaN}'):
+            with self.assertRaises(ParseError) as fast, self.subTest(body=body):
+                FastJSONParser().parse(io.BytesIO(body))
+            with self.assertRaises(ParseError) as drf:
+                JSONParser().parse(io.BytesIO(body))
+            self.assertEqual(str(fast.exception), str(drf.exception))
+
+
+BIG_JSON = b'{"contributions": [' + b','.join(b'{"amount": "50.00", "name": "Ospite"}' for _ in range(100)) + b']}'
+
+
+@override_settings(API_COMPRESSION=True, API_COMPRESSION_MIN_SIZE=1024)
+class CompressionTests(TestCase):
+
+    def serve(self, response, path='/api/gift-lists/', accept='gzip, deflate, br'):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json_response(self, body=BIG_JSON):
+        response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = '"abc"'
+        return response
+
+    def test_choose_encoding(self):
+        self.assertEqual(choose_encoding('gzip, deflate, br'), 'br')
+        self.assertEqual(choose_encoding('gzip;q=1.0, br;q=0'), 'gzip')
+        self.assertEqual(choose_encoding('br;q=0.5, gzip'), 'gzip')
+        self.assertEqual(choose_encoding('*'), 'br')
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertIsNone(choose_encoding(''))
+        with mock.patch('mondodoro.compression.brotli', None):
+            self.assertEqual(choose_encoding('br, gzip'), 'gzip')
+
+    def test_gzip(self):
+        response = self.serve(self.json_response(), accept='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), BIG_JSON)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_brotli(self):
+        response = self.serve(self.json_response())
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), BIG_JSON)
+
+    def test_left_alone(self):
+        for response, path, accept in (
+            (self.json_response(b'{"ok": true}'), '/api/gift-lists/', 'gzip'),
+            (self.json_response(), '/admin/', 'gzip'),
+            (HttpResponse(BIG_JSON, content_type='image/png'), '/api/gift-lists/', 'gzip'),
+            (self.json_response(), '/api/gift-lists/', 'identity'),
+        ):
+            with self.subTest(path=path, accept=accept, content_type=response['Content-Type']):
+                self.assertFalse(self.serve(response, path, accept).has_header('Content-Encoding'))
+        with override_settings(API_COMPRESSION=False):
+            self.assertFalse(self.serve(self.json_response()).has_header('Content-Encoding'))
+
+    def test_streaming_is_compressed_chunk_by_chunk(self):
+        rows = [f'riga {i};Ospite;50.00\n'.encode() * 20 for i in range(5)]
+        response = self.serve(StreamingHttpResponse(iter(rows), content_type='text/csv'), accept='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = list(response.streaming_content)
+        # Every row can be decoded as soon as its chunk arrives
+        for row, chunk in zip(rows, chunks):
+            self.assertEqual(decompressor.decompress(chunk), row)
+        self.assertEqual(decompressor.decompress(b''.join(chunks[len(rows):])) + decompressor.flush(), b'')
+
+    def test_async_streaming(self):
+        async def rows():
+            for i in range(3):
+                yield f'riga {i}\n'.encode() * 100
+
+        response = self.serve(StreamingHttpResponse(rows(), content_type='text/csv'))
+
+        async def consume():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(brotli.decompress(async_to_sync(consume)()), b''.join(
+            f'riga {i}\n'.encode() * 100 for i in range(3)
+        ))
+
+
+class PublicCacheDecoratorTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def test_async_view(self):
+        @public_cache(lambda pk: [f'thing:{pk}'])
+        async def view(request, pk):
+            self.calls += 1
+            return HttpResponse('{}', content_type='application/json')
+
+        serve = async_to_sync(view)
+        etag = serve(AsyncRequestFactory().get('/api/thing/1/'), pk=1)['ETag']
+        response = serve(AsyncRequestFactory().get('/api/thing/1/', headers={'If-None-Match': etag}), pk=1)
+        self.assertEqual((response.status_code, self.calls), (304, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_versions('thing:1')
+        response = serve(AsyncRequestFactory().get('/api/thing/1/', headers={'If-None-Match': etag}), pk=1)
+        self.assertEqual((response.status_code, self.calls), (200, 2))
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_only_successful_responses_are_public(self):
+        @public_cache(lambda: ['thing'])
+        def view(request):
+            return HttpResponse(status=404)
+
+        response = view(RequestFactory().get('/api/thing/'))
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Cache-Control'))
+
+    def test_missing_resource_keeps_no_version(self):
+        @public_cache(lambda pk: [f'thing:{pk}'])
+        def view(request, pk):
+            return HttpResponse(status=404)
+
+        view(RequestFactory().get('/api/thing/404/'), pk=404)
+        self.assertIsNone(cache.get(VERSION_KEY.format(scope='thing:404')))
+
+    def test_wildcard_if_none_match_runs_the_view(self):
+        @public_cache(lambda pk: [f'thing:{pk}'])
+        def view(request, pk):
+            self.calls += 1
+            return HttpResponse(status=404 if pk == 'missing' else 200)
+
+        for pk, expected in (('missing', 404), ('1', 200)):
+            with self.subTest(pk=pk):
+                response = view(RequestFactory().get(f'/api/thing/{pk}/', headers={'If-None-Match': '*'}), pk=pk)
+                self.assertEqual(response.status_code, expected)
+        self.assertEqual(self.calls, 2)
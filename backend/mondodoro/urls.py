@@ -20,6 +20,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from .metrics import metrics_view
+
 # Customize admin site
 admin.site.site_header = "Mondodoro Administration"
 admin.site.site_title = "Mondodoro Admin"
@@ -39,6 +41,10 @@ urlpatterns = [
     path('api/gift-lists/', include('apps.gift_lists.urls')),
     path('api/payments/', include('apps.payments.urls')),
     path('api/events/', include('apps.events.urls')),
+    path('api/analytics/', include('apps.analytics.urls')),
+
+    # Prometheus scrape endpoint
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Serve media files in development